@@ -292,4 +292,5 @@ def main(stdscr):
             time.sleep(2)
             break
 
-curses.wrapper(main)
+if __name__ == "__main__":
+    curses.wrapper(main)
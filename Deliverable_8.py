@@ -2,6 +2,11 @@ import random
 import curses
 import time
 
+from rogue.bsp import split
+from rogue.freecells import FreeCellIndex
+from rogue.items import Inventory, ItemCatalog
+from rogue.render import DirtyRenderer
+
 # Constants
 DUNGEON_WIDTH = 20
 DUNGEON_HEIGHT = 10
@@ -21,8 +26,28 @@ MONSTER_TYPES = {
 ITEM_TYPES = ['potion_heal', 'weapon_sword', 'armor_shield', 'scroll_identity', 'food_ration', 'magic_ring', 'gold_coin']
 POTION_TYPES = ['potion_heal', 'potion_attack', 'potion_defense']
 SCROLL_TYPES = ['scroll_heal', 'scroll_attack', 'scroll_defense']
+# Item kinds: category, and the stat a use adds to with its message
+ITEM_TABLE = {
+    'potion_heal': {'category': 'potion', 'effect': ('health', 20), 'message': "You used a healing potion! Health restored."},
+    'potion_attack': {'category': 'potion', 'effect': ('attack_damage', 5), 'message': "You used an attack potion! Attack increased."},
+    'potion_defense': {'category': 'potion', 'effect': ('defense', 5), 'message': "You used a defense potion! Defense increased."},
+    'scroll_heal': {'category': 'scroll', 'effect': ('health', 30), 'message': "You used a healing scroll! Health restored."},
+    'scroll_attack': {'category': 'scroll', 'effect': ('attack_damage', 10), 'message': "You used an attack scroll! Attack increased."},
+    'scroll_defense': {'category': 'scroll', 'effect': ('defense', 10), 'message': "You used a defense scroll! Defense increased."},
+    'scroll_identity': {'category': 'scroll'},
+    'weapon_sword': {'category': 'weapon'},
+    'armor_shield': {'category': 'armor'},
+    'food_ration': {'category': 'food'},
+    'magic_ring': {'category': 'ring'},
+    'gold_coin': {'category': 'treasure'},
+}
+ITEMS = ItemCatalog(ITEM_TABLE)  # Names compiled to integer ids
 MAX_INVENTORY = 10
+ITEM_KEYS = '1234567890'  # Keys for inventory slots 1 to 10, the tenth on 0
 LEVEL_UP_EXP = 100  # Experience required to level up
+# Room layout: 'bsp' partitions the map and always finishes with four rooms,
+# 'random' retries random placements until each room fits
+DUNGEON_GENERATOR = 'bsp'
 
 # Player stats
 class Player:
@@ -34,14 +59,11 @@ class Player:
         self.defense = PLAYER_DEFENSE
         self.level = 1
         self.exp = 0
-        self.inventory = []
+        self.inventory = Inventory(ITEMS, MAX_INVENTORY)  # Stacks of identical items, one per slot
         self.max_health = PLAYER_HEALTH
 
     def pick_up_item(self, item):
-        if len(self.inventory) < MAX_INVENTORY:
-            self.inventory.append(item)
-            return True
-        return False
+        return self.inventory.add(item.kind)
 
     def gain_exp(self, amount):
         self.exp += amount
@@ -56,48 +78,28 @@ class Player:
         self.attack_damage += 5  # Increase attack damage on level-up
         self.defense += 2  # Increase defense on level-up
 
-    def use_item(self, index, stdscr):
-        item = self.inventory[index]
-        if item.name.startswith("potion"):
-            if item.name == 'potion_heal':
-                self.health += 20
-                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, "You used a healing potion! Health restored.")
-            elif item.name == 'potion_attack':
-                self.attack_damage += 5
-                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, "You used an attack potion! Attack increased.")
-            elif item.name == 'potion_defense':
-                self.defense += 5
-                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, "You used a defense potion! Defense increased.")
-        elif item.name.startswith("scroll"):
-            if item.name == 'scroll_heal':
-                self.health += 30
-                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, "You used a healing scroll! Health restored.")
-            elif item.name == 'scroll_attack':
-                self.attack_damage += 10
-                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, "You used an attack scroll! Attack increased.")
-            elif item.name == 'scroll_defense':
-                self.defense += 10
-                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, "You used a defense scroll! Defense increased.")
-        # Remove the item after use
-        self.inventory.remove(item)
+    def use_item(self, slot):
+        """Use one item from an inventory slot and return the message describing it."""
+        return self.inventory.use(slot, self)
 
     def open_inventory(self, stdscr):
         while True:
             stdscr.clear()
             stdscr.addstr(0, 0, "Inventory:")
+            bottom = 0  # Stacks keep their slot, so the list can have gaps
             if not self.inventory:
                 stdscr.addstr(1, 0, "Your inventory is empty.")
-            else:
-                for index, item in enumerate(self.inventory, start=1):
-                    stdscr.addstr(index, 0, f"{index}. {item.name}")
-            stdscr.addstr(len(self.inventory) + 2, 0, "Press the number of an item to select it, or 'i' to close...")
+            for slot, name, count in self.inventory:
+                bottom = slot + 1
+                stdscr.addstr(bottom, 0, f"{ITEM_KEYS[slot]}. {name}" + (f" x{count}" if count > 1 else ''))
+            stdscr.addstr(bottom + 2, 0, "Press the number of an item to select it, or 'i' to close...")
             stdscr.refresh()
             key = stdscr.getch()
+            selected_index = ITEM_KEYS.find(chr(key)) if 0 <= key < 256 else -1
             if key == ord('i'):
                 break
-            elif key in range(ord('1'), ord('1') + len(self.inventory)):
-                selected_index = key - ord('1')
-                self.use_item(selected_index, stdscr)
+            elif 0 <= selected_index < MAX_INVENTORY and self.inventory.kinds[selected_index] is not None:
+                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, self.use_item(selected_index))
 
 # Monster class
 class Monster:
@@ -118,6 +120,7 @@ class Item:
     def __init__(self, item_type, x, y):
         self.type = item_type
         self.name = item_type
+        self.kind = ITEMS.ids[item_type]
         self.x = x
         self.y = y
 
@@ -136,40 +139,62 @@ class Room:
 
 # Dungeon class
 class Dungeon:
-    def __init__(self):
+    def __init__(self, generator=DUNGEON_GENERATOR):
         self.grid = [['#' for _ in range(DUNGEON_WIDTH)] for _ in range(DUNGEON_HEIGHT)]  # Set walls initially
         self.rooms = []
         self.monsters = []
         self.items = []
+        self.generator = generator
+        self.generation_stats = None  # Rooms, retries and time taken by the 'bsp' generator
         self.generate_dungeon()
 
     def generate_dungeon(self):
-        for _ in range(4):  # Four rooms
-            while True:
-                w = random.randint(ROOM_MIN_SIZE, ROOM_MAX_SIZE)
-                h = random.randint(ROOM_MIN_SIZE, ROOM_MAX_SIZE)
-
-                # Ensure the room size fits within the dungeon grid.
-                max_x = DUNGEON_WIDTH - w - 1
-                max_y = DUNGEON_HEIGHT - h - 1
-
-                if max_x > 0 and max_y > 0:
-                    x = random.randint(1, max_x)
-                    y = random.randint(1, max_y)
-                    new_room = Room(x, y, w, h)
-
-                    if self.is_valid_room(new_room):
-                        self.create_room(new_room)
-                        if self.rooms:
-                            prev_center = self.rooms[-1].center()
-                            new_center = new_room.center()
-                            self.create_hallway(prev_center, new_center)
-                        self.rooms.append(new_room)
-                        break
-                        
+        if self.generator == 'bsp':
+            self.generate_bsp_rooms()
+        else:
+            for _ in range(4):  # Four rooms
+                while True:
+                    w = random.randint(ROOM_MIN_SIZE, ROOM_MAX_SIZE)
+                    h = random.randint(ROOM_MIN_SIZE, ROOM_MAX_SIZE)
+
+                    # Ensure the room size fits within the dungeon grid.
+                    max_x = DUNGEON_WIDTH - w - 1
+                    max_y = DUNGEON_HEIGHT - h - 1
+
+                    if max_x > 0 and max_y > 0:
+                        x = random.randint(1, max_x)
+                        y = random.randint(1, max_y)
+                        new_room = Room(x, y, w, h)
+
+                        if self.is_valid_room(new_room):
+                            self.create_room(new_room)
+                            if self.rooms:
+                                prev_center = self.rooms[-1].center()
+                                new_center = new_room.center()
+                                self.create_hallway(prev_center, new_center)
+                            self.rooms.append(new_room)
+                            break
+
+        # Index the open spaces (hallways) once the layout is carved
+        self.free = FreeCellIndex(['#'])
+        for y in range(1, DUNGEON_HEIGHT - 1):
+            for x in range(1, DUNGEON_WIDTH - 1):
+                self.free.release(x, y, self.grid[y][x])
         self.spawn_monsters()
         self.spawn_items()
 
+    def generate_bsp_rooms(self):
+        """Lay out four rooms by binary space partition, joined by hallways."""
+        # One cell under ROOM_MIN_SIZE so four rooms fit side by side in the grid
+        rooms, links, self.generation_stats = split(1, 1, DUNGEON_WIDTH - 2, DUNGEON_HEIGHT - 2, 4, random,
+                                                    ROOM_MIN_SIZE - 1, ROOM_MAX_SIZE)
+        for x, y, w, h in rooms:
+            room = Room(x, y, w, h)
+            self.create_room(room)
+            self.rooms.append(room)
+        for a, b in links:
+            self.create_hallway(self.rooms[a].center(), self.rooms[b].center())
+
     def is_valid_room(self, room):
         """Ensure that rooms don't overlap and walls are respected."""
         for y in range(room.y, room.y + room.height):
@@ -181,20 +206,14 @@ class Dungeon:
     def spawn_monsters(self):
         for _ in range(5):
             monster_type = random.choice(list(MONSTER_TYPES.keys()))
-            while True:
-                mx, my = random.randint(1, DUNGEON_WIDTH - 2), random.randint(1, DUNGEON_HEIGHT - 2)
-                if self.grid[my][mx] == '#':  # Check only open spaces (hallways)
-                    self.monsters.append(Monster(monster_type, mx, my))
-                    break
+            mx, my = self.free.take('#', random)  # Only open spaces (hallways); raises NoFreeCellError when none are left
+            self.monsters.append(Monster(monster_type, mx, my))
 
     def spawn_items(self):
         for _ in range(5):  # Let's spawn 5 items
             item_type = random.choice(ITEM_TYPES)
-            while True:
-                ix, iy = random.randint(1, DUNGEON_WIDTH - 2), random.randint(1, DUNGEON_HEIGHT - 2)
-                if self.grid[iy][ix] == '#':  # Check only open spaces (hallways)
-                    self.items.append(Item(item_type, ix, iy))
-                    break
+            ix, iy = self.free.take('#', random)  # Only open spaces (hallways); raises NoFreeCellError when none are left
+            self.items.append(Item(item_type, ix, iy))
 
     def create_room(self, room):
         for y in range(room.y, room.y + room.height):
@@ -219,25 +238,12 @@ class Dungeon:
         for y in range(min(y1, y2), max(y1, y2) + 1):
             self.grid[y][x] = '#'  # Hallway floor
 
-    def render(self, stdscr, player):
-        stdscr.clear()
-        for y in range(DUNGEON_HEIGHT):
-            line = ''
-            for x in range(DUNGEON_WIDTH):
-                if (x, y) == (player.x, player.y):
-                    line += '@'
-                else:
-                    if self.grid[y][x] == '#':  # Hallway floor
-                        line += '#'
-                    elif self.grid[y][x] == '.':  # Empty space (open floor)
-                        line += '.'
-                    elif self.grid[y][x] == '+':  # Doors
-                        line += '+'
-                    elif self.grid[y][x] == '|':  # Walls
-                        line += '|'
-            stdscr.addstr(y, 0, line)
-        stdscr.addstr(DUNGEON_HEIGHT, 0, f"Level: {player.level} Health: {player.health} Attack: {player.attack_damage} Defense: {player.defense} EXP: {player.exp}/{LEVEL_UP_EXP}")
-        stdscr.refresh()
+    def render(self, renderer, player):
+        rows = [''.join(row) for row in self.grid]
+        line = rows[player.y]
+        rows[player.y] = line[:player.x] + '@' + line[player.x + 1:]
+        rows.append(f"Level: {player.level} Health: {player.health} Attack: {player.attack_damage} Defense: {player.defense} EXP: {player.exp}/{LEVEL_UP_EXP}")
+        renderer.draw(rows)
 
     def handle_combat(self, player):
         for monster in self.monsters:
@@ -263,17 +269,20 @@ def show_help(stdscr):
 def main(stdscr):
     player = Player()
     dungeon = Dungeon()
+    renderer = DirtyRenderer(stdscr)
 
     while True:
-        dungeon.render(stdscr, player)
+        dungeon.render(renderer, player)
         key = stdscr.getch()
 
         if key == ord('q'):
             break
         elif key == ord('i'):
             player.open_inventory(stdscr)
+            renderer.invalidate()
         elif key == ord('h'):
             show_help(stdscr)
+            renderer.invalidate()
 
         # Handle movement (WASD or Arrow keys)
         if key == curses.KEY_UP and player.y > 0:
@@ -292,4 +301,5 @@ def main(stdscr):
             time.sleep(2)
             break
 
-curses.wrapper(main)
+if __name__ == "__main__":
+    curses.wrapper(main)
@@ -1,8 +1,15 @@
 import random
 import os
-import time
+import sys
 import curses  # Importing curses to handle terminal input better
 
+from rogue.combat import fight_odds
+from rogue.floors import FloorStore
+from rogue.flowfield import FlowField
+from rogue.freecells import FreeCellIndex
+from rogue.loop import InputLoop, TICK_RATE
+from rogue.profiler import profiler
+
 # Constants for the dungeon dimensions
 DUNGEON_WIDTH = 20
 DUNGEON_HEIGHT = 10
@@ -21,6 +28,9 @@ PLAYER_HEALTH = 100
 MONSTER_HEALTH = 30
 MONSTER_ATTACK = 10
 MONSTER_DEFENSE = 5
+HIT_CHANCE = 0.8  # Chance for any attack to land
+COMBAT_ROUND_DELAY = 0.5  # Seconds between combat rounds on screen
+CHASE_RADIUS = 8  # Monsters this many steps from the player come after them
 
 # Direction map for player movement (h/j/k/l for movement)
 DIRECTION_MAP = {
@@ -98,7 +108,8 @@ def eat_ration(player):
     print(f"You eat the food ration! Your current health is {player.health}.")
 
 class Floor:
-    def __init__(self):
+    def __init__(self, rng=random):
+        self.rng = rng  # Anything with the random module's API, e.g. a seeded random.Random
         self.grid = [[EMPTY for _ in range(DUNGEON_WIDTH)] for _ in range(DUNGEON_HEIGHT)]
         self.rooms = []
         self.items = []
@@ -109,37 +120,36 @@ class Floor:
     # Generate the floor layout (rooms, corridors, monsters, etc.)
     def generate(self):
         self.generate_rooms_and_corridors()
+        self.index_free_cells()
         self.place_stairs()
         self.place_items()
         self.place_monsters()
 
+    def index_free_cells(self):
+        """Index the empty squares inside the border once rooms are carved."""
+        self.free = FreeCellIndex([EMPTY])
+        for y in range(1, DUNGEON_HEIGHT - 1):
+            for x in range(1, DUNGEON_WIDTH - 1):
+                self.free.release(x, y, self.grid[y][x])
+
     def place_stairs(self):
         """Place stairs up and down on the floor."""
         # Place stairs up
-        while True:
-            x = random.randint(1, DUNGEON_WIDTH - 2)
-            y = random.randint(1, DUNGEON_HEIGHT - 2)
-            if self.grid[y][x] == EMPTY:
-                self.stairs_up = (x, y)
-                self.grid[y][x] = STAIRS_UP
-                break
+        x, y = self.free.take(EMPTY, self.rng)
+        self.stairs_up = (x, y)
+        self.grid[y][x] = STAIRS_UP
 
         # Place stairs down
-        while True:
-            x = random.randint(1, DUNGEON_WIDTH - 2)
-            y = random.randint(1, DUNGEON_HEIGHT - 2)
-            if self.grid[y][x] == EMPTY:
-                self.stairs_down = (x, y)
-                self.grid[y][x] = STAIRS_DOWN
-                break
+        x, y = self.free.take(EMPTY, self.rng)
+        self.stairs_down = (x, y)
+        self.grid[y][x] = STAIRS_DOWN
+
+    def is_passable(self, x, y):
+        return 0 <= x < DUNGEON_WIDTH and 0 <= y < DUNGEON_HEIGHT and self.grid[y][x] != WALL
 
     def get_spawn_point(self):
         """Return a random empty square (.) on the floor to spawn the player."""
-        while True:
-            x = random.randint(1, DUNGEON_WIDTH - 2)
-            y = random.randint(1, DUNGEON_HEIGHT - 2)
-            if self.grid[y][x] == EMPTY:  # Ensure the square is empty
-                return x, y
+        return self.free.choice(EMPTY, self.rng)  # Raises NoFreeCellError if the floor has none
 
     def print_floor(self, player, stdscr):
         """Print the current floor layout including rooms, items, monsters, etc."""
@@ -162,10 +172,10 @@ class Floor:
     def generate_rooms_and_corridors(self):
         """Randomly generate rooms and corridors (simplified version)."""
         for _ in range(4):  # Add 4 rooms instead of 3 for more open space
-            room_width = random.randint(4, 7)
-            room_height = random.randint(4, 7)
-            x = random.randint(1, DUNGEON_WIDTH - room_width - 1)
-            y = random.randint(1, DUNGEON_HEIGHT - room_height - 1)
+            room_width = self.rng.randint(4, 7)
+            room_height = self.rng.randint(4, 7)
+            x = self.rng.randint(1, DUNGEON_WIDTH - room_width - 1)
+            y = self.rng.randint(1, DUNGEON_HEIGHT - room_height - 1)
 
             # Fill the room with empty space
             for i in range(x, x + room_width):
@@ -191,39 +201,110 @@ class Floor:
         ]
 
         for item_type, name, effect in item_list:
-            x = random.randint(1, DUNGEON_WIDTH - 2)
-            y = random.randint(1, DUNGEON_HEIGHT - 2)
-            if self.grid[y][x] == EMPTY:  # Only place items in empty spaces
-                self.items.append(Item(x, y, item_type, name, effect))
-                self.grid[y][x] = ITEM
+            x, y = self.free.take(EMPTY, self.rng)  # Only place items in empty spaces
+            self.items.append(Item(x, y, item_type, name, effect))
+            self.grid[y][x] = ITEM
 
     def place_monsters(self):
         """Place random monsters in the dungeon."""
         for _ in range(2):  # Add 2 monsters instead of 3
-            x = random.randint(1, DUNGEON_WIDTH - 2)
-            y = random.randint(1, DUNGEON_HEIGHT - 2)
-            if self.grid[y][x] == EMPTY:  # Only place monsters in empty spaces
-                self.monsters.append(Monster(x, y))
+            x, y = self.free.take(EMPTY, self.rng)  # Only empty spaces, and never two monsters on one
+            self.monsters.append(Monster(x, y))
+
+class Combat:
+    """A fight between the player and one monster, played one round per step()."""
+    def __init__(self, player, monster, attack_successful):
+        self.player = player
+        self.monster = monster
+        self.attack_successful = attack_successful
+        self.rounds = 0
+        self.odds = fight_odds(player.health, player.attack_damage, player.defense,
+                               monster.health, monster.attack_damage, monster.defense,
+                               HIT_CHANCE, HIT_CHANCE)
+
+    def is_over(self):
+        return self.player.health <= 0 or self.monster.health <= 0 or self.is_stalemate()
+
+    def is_stalemate(self):
+        """Neither side can hurt the other, so the fight would never end."""
+        return (self.player.attack_damage <= self.monster.defense
+                and self.monster.attack_damage <= self.player.defense)
+
+    def step(self):
+        """Fight one round and return the messages describing it."""
+        player = self.player
+        monster = self.monster
+        messages = []
+        if self.is_stalemate():
+            return ["Neither of you can hurt the other. You back away."]
+        self.rounds += 1
+
+        # Player attacks
+        if self.attack_successful(player.attack_damage, monster):
+            damage = max(0, player.attack_damage - monster.defense)
+            monster.health -= damage
+            messages.append(f"You hit the monster for {damage} damage! Monster health: {monster.health}")
+        else:
+            messages.append("Your attack misses the monster.")
+
+        # Monster attacks if still alive
+        if monster.health > 0:
+            if self.attack_successful(monster.attack_damage, player):
+                damage = max(0, monster.attack_damage - player.defense)
+                player.health -= damage
+                messages.append(f"The monster hits you for {damage} damage! Your health: {player.health}")
+            else:
+                messages.append("The monster's attack misses you.")
+
+        if player.health <= 0:
+            messages.append("You have been defeated by the monster!")
+        elif monster.health <= 0:
+            messages.append("You have defeated the monster!")
+        return messages
 
 class Dungeon:
-    def __init__(self, num_floors=3):
-        self.floors = [Floor() for _ in range(num_floors)]  # Create multiple floors
+    def __init__(self, num_floors=3, seed=None):
+        self.num_floors = num_floors
+        # Floors are generated from their own seed on first visit and cached
+        self.floors = FloorStore(random.randrange(2 ** 32) if seed is None else seed, self.create_floor)
         self.current_floor = 0
-        self.create_floor(self.current_floor)
+        self.floors.get(self.current_floor)
+        self.combat = None  # The fight in progress, if any
+        self.flow = FlowField(CHASE_RADIUS)  # Paths toward the player, shared by every monster
 
-    def create_floor(self, floor_index):
+    def create_floor(self, floor_index, rng):
         """Generate a floor with rooms, corridors, items, and monsters."""
-        self.floors[floor_index].generate()
+        with profiler.span('generate'):
+            floor = Floor(rng)
+            floor.generate()
+        return floor
+
+    def move_player_up(self, player):
+        """Climb back to the previous floor, exactly as it was left."""
+        if self.current_floor > 0:
+            self.current_floor -= 1
+            player.x, player.y = self.floors[self.current_floor].get_spawn_point()
+
+    def move_player_down(self, player):
+        """Descend to the next floor, generating it on the first visit."""
+        if self.current_floor < self.num_floors - 1:
+            self.current_floor += 1
+            player.x, player.y = self.floors[self.current_floor].get_spawn_point()
 
     def update(self, player):
         """Update the dungeon: move monsters, check for combat, handle other updates."""
         floor = self.floors[self.current_floor]
 
         # Update monster movements and check for combat
+        steps = self.flow.toward(player.x, player.y, floor.is_passable)
         for monster in floor.monsters:
-            # Example: Monsters could move towards the player or randomly
-            self.move_monster(monster)
-            if (monster.x, monster.y) == (player.x, player.y):
+            # Monsters close enough to the player chase them, the rest wander
+            step = steps.get((monster.x, monster.y))
+            if step is None:
+                self.move_monster(monster)
+            else:
+                monster.x, monster.y = step
+            if (monster.x, monster.y) == (player.x, player.y) and self.combat is None:
                 self.handle_combat(player, monster)
 
         # Check if player steps on stairs up or down
@@ -233,36 +314,25 @@ class Dungeon:
             self.move_player_down(player)
 
     def handle_combat(self, player, monster):
-        """Handle combat between the player and a monster."""
-        while player.health > 0 and monster.health > 0:
-            # Player attacks
-            if self.attack_successful(player.attack_damage, monster):
-                damage = max(0, player.attack_damage - monster.defense)
-                monster.health -= damage
-                print(f"You hit the monster for {damage} damage! Monster health: {monster.health}")
-            else:
-                print("Your attack misses the monster.")
-
-            # Monster attacks if still alive
-            if monster.health > 0:
-                if self.attack_successful(monster.attack_damage, player):
-                    damage = max(0, monster.attack_damage - player.defense)
-                    player.health -= damage
-                    print(f"The monster hits you for {damage} damage! Your health: {player.health}")
-                else:
-                    print("The monster's attack misses you.")
+        """Start a fight between the player and a monster.
 
-            # Pause for the next round of combat
-            time.sleep(1)
+        The fight is not resolved here: the main loop advances it one round
+        at a time with Combat.step(), so the game keeps drawing and reading
+        keys while it plays out.
+        """
+        self.combat = Combat(player, monster, self.attack_successful)
+        return self.combat
 
-        if player.health <= 0:
-            print("You have been defeated by the monster!")
-        elif monster.health <= 0:
-            print("You have defeated the monster!")
+    def end_combat(self):
+        """Clear the finished fight, removing the monster if it was slain."""
+        floor = self.floors[self.current_floor]
+        if self.combat.monster.health <= 0 and self.combat.monster in floor.monsters:
+            floor.monsters.remove(self.combat.monster)
+        self.combat = None
 
     def attack_successful(self, attack, target):
         """Determine if an attack is successful."""
-        return random.random() < 0.8  # 80% chance to hit for simplicity
+        return random.random() < HIT_CHANCE  # 80% chance to hit for simplicity
 
     def print_dungeon(self, player, stdscr):
         """Print the current floor with the player, monsters, and items."""
@@ -324,27 +394,72 @@ class Player:
             item.use(self)
             self.inventory.remove(item)
 
-def main(stdscr):
+def main(stdscr, tick_rate=TICK_RATE):
     # Initialize the screen and game objects
     curses.curs_set(0)  # Hide the cursor
-    stdscr.nodelay(1)  # Non-blocking input
-    stdscr.timeout(100)  # Refresh every 100ms
 
     player = Player()
     dungeon = Dungeon()
+    # Blocks until a key or a timed update instead of repainting every 100ms
+    loop = InputLoop(stdscr)
+    combat_task = None
+    messages = []
+
+    def next_round():
+        """Play one round of the current fight; scheduled every COMBAT_ROUND_DELAY."""
+        nonlocal combat_task
+        with profiler.span('combat'):
+            messages[:] = dungeon.combat.step()
+        if dungeon.combat.is_over():
+            combat_task.cancel()
+            combat_task = None
+            dungeon.end_combat()
+
+    def tick():
+        """Timed update: monsters move, and a fight starts if one reaches the player."""
+        nonlocal combat_task
+        if dungeon.combat is not None:
+            return  # Everything waits while a fight is on
+        with profiler.span('monsters'):
+            dungeon.update(player)
+        if dungeon.combat is not None and combat_task is None:
+            messages[:] = [f"A monster attacks! Your chance of winning: {dungeon.combat.odds.win:.0%}"]
+            combat_task = loop.every(COMBAT_ROUND_DELAY, next_round)
+
+    loop.every(1 / tick_rate, tick)
 
     while player.health > 0:
-        # Print the current dungeon state
-        stdscr.clear()
-        dungeon.print_dungeon(player, stdscr)
-        stdscr.addstr(DUNGEON_HEIGHT, 0, f"Health: {player.health}  Inventory: {len(player.inventory)} items")
-        stdscr.refresh()
+        # Print the current dungeon state, only if something changed since the last frame
+        if loop.dirty:
+            with profiler.span('render'):
+                stdscr.erase()
+                dungeon.print_dungeon(player, stdscr)
+                status = f"Health: {player.health}  Inventory: {len(player.inventory)} items"
+                timings = profiler.status()  # Phase timings, once switched on with 'p'
+                if timings:
+                    status += '  ' + timings
+                stdscr.addstr(DUNGEON_HEIGHT, 0, status[:stdscr.getmaxyx()[1] - 1])
+                for row, message in enumerate(messages, start=DUNGEON_HEIGHT + 1):
+                    stdscr.addstr(row, 0, message)
+                stdscr.refresh()
+            loop.drew()
 
-        # Get user input
-        key = stdscr.getch()
+        # Get user input, or wake up for the next timed update
+        key = loop.next_key()
 
         if key == ord('q'):
             break  # Quit the game
+        elif key == ord('p'):
+            profiler.toggle()  # Per-phase timings on the status line
+            continue
+        elif key == ord('C'):
+            profiler.toggle_cprofile()  # Press again to write the capture to a file
+            continue
+        elif key == ord('M'):
+            profiler.toggle_tracemalloc()
+            continue
+        elif dungeon.combat is not None or player.health <= 0:
+            continue  # No moving while a fight is on; its rounds come from the scheduler
         elif key == ord('h'):
             move = 'h'
         elif key == ord('j'):
@@ -357,29 +472,35 @@ def main(stdscr):
             move = None
 
         if move:
-            dx, dy = DIRECTION_MAP.get(move, (0, 0))
-            if player.is_move_valid(dx, dy, dungeon.floors[dungeon.current_floor]):
-                player.x += dx
-                player.y += dy
-            else:
-                stdscr.addstr(DUNGEON_HEIGHT + 1, 0, "You can't move in that direction.")
+            with profiler.span('input'):
+                dx, dy = DIRECTION_MAP.get(move, (0, 0))
+                if player.is_move_valid(dx, dy, dungeon.floors[dungeon.current_floor]):
+                    player.x += dx
+                    player.y += dy
+                    messages.clear()
+                else:
+                    messages[:] = ["You can't move in that direction."]
+
+            # Allow player to interact with items and monsters
+            if (player.x, player.y) in [(item.x, item.y) for item in dungeon.floors[dungeon.current_floor].items]:
+                stdscr.addstr(DUNGEON_HEIGHT + 1, 0, "You find an item. Do you want to pick it up? (y/n) ")
                 stdscr.refresh()
+                stdscr.timeout(-1)  # Wait for the answer
+                pick_up_choice = stdscr.getch()
+                if pick_up_choice in (ord('y'), ord('Y')):
+                    item = next(i for i in dungeon.floors[dungeon.current_floor].items if (i.x, i.y) == (player.x, player.y))
+                    player.pick_up_item(item)
+                    dungeon.floors[dungeon.current_floor].items.remove(item)
 
-        # Allow player to interact with items and monsters
-        if (player.x, player.y) in [(item.x, item.y) for item in dungeon.floors[dungeon.current_floor].items]:
-            stdscr.addstr(DUNGEON_HEIGHT + 1, 0, "You find an item. Do you want to pick it up? (y/n) ")
-            stdscr.refresh()
-            pick_up_choice = stdscr.getch()
-            if chr(pick_up_choice).lower() == 'y':
-                item = next(i for i in dungeon.floors[dungeon.current_floor].items if (i.x, i.y) == (player.x, player.y))
-                player.pick_up_item(item)
-                dungeon.floors[dungeon.current_floor].items.remove(item)
-
-        # Update dungeon (monster movements, combat, etc.)
-        dungeon.update(player)
-        
     stdscr.addstr(DUNGEON_HEIGHT + 2, 0, "Game Over!")
     stdscr.refresh()
+    stdscr.timeout(-1)
     stdscr.getch()
-
-curses.wrapper(main)
+    return loop.stats
+
+if __name__ == "__main__":
+    # Optional argument: timed updates per second, e.g. 2 for slower monsters
+    tick_rate = float(sys.argv[1]) if len(sys.argv) > 1 else TICK_RATE
+    print(curses.wrapper(main, tick_rate).report())
+    if profiler.spans:
+        print(profiler.report())
@@ -1,7 +1,18 @@
 import random
 import os
+import sys
 import time
 import curses
+from concurrent.futures import ThreadPoolExecutor
+
+from rogue.connectivity import connect
+from rogue.floors import FloorStore
+from rogue.flowfield import FlowField
+from rogue.items import Inventory, ItemCatalog
+from rogue.loop import InputLoop, TICK_RATE
+from rogue.entities import EntityStore
+from rogue.features import FeatureIndex
+from rogue.profiler import profiler
 
 # Constants for the dungeon dimensions
 DUNGEON_WIDTH = 40
@@ -9,6 +20,8 @@ DUNGEON_HEIGHT = 20
 ROOM_MIN_SIZE = 5  # Minimum room size
 ROOM_MAX_SIZE = 10  # Maximum room size
 HALLWAY_WIDTH = 5  # Width of the hallway
+NUM_ROOMS = 4
+REPAIR_CONNECTIVITY = True  # Put doors in walls until every part of a floor can be reached
 
 # Symbols for the grid
 WALL = '|'
@@ -27,6 +40,11 @@ SCROLL_ATTACK = 'F'
 SCROLL_DEFENSE = 'G'
 STAIRS_UP = '>'  # Upward stairs
 STAIRS_DOWN = '<'  # Downward stairs
+WALKABLE = (EMPTY, DOOR_CLOSED, DOOR_OPEN, STAIRS_UP, STAIRS_DOWN)  # Every tile but WALL
+
+# Entities drawn on top of the grid, highest priority first
+RENDER_ORDER = (MONSTER, ITEM, POTION_HEAL, SCROLL_HEAL, STAIRS_UP, STAIRS_DOWN)
+DRAW_RANK = {ord(tag): rank for rank, tag in enumerate(RENDER_ORDER)}  # Item tag column value -> priority
 
 # Player stats
 PLAYER_HEALTH = 100
@@ -54,6 +72,10 @@ DIRECTION_MAP = {
     curses.KEY_RIGHT: (1, 0),  # Right arrow
 }
 
+# Steps a wandering monster can take, built once rather than on every move
+MONSTER_STEPS = ((-1, 0), (0, 1), (0, -1), (1, 0))
+CHASE_RADIUS = 10  # Monsters this many steps from the player come after them
+
 # Item types
 ITEM_TYPES = ['potion_heal', 'weapon_sword', 'armor_shield', 'scroll_identity', 'food_ration', 'magic_ring', 'gold_coin']
 
@@ -61,46 +83,34 @@ ITEM_TYPES = ['potion_heal', 'weapon_sword', 'armor_shield', 'scroll_identity',
 POTION_TYPES = ['potion_heal', 'potion_attack', 'potion_defense']
 SCROLL_TYPES = ['scroll_heal', 'scroll_attack', 'scroll_defense']
 
+# Item kinds: category, map glyph, and the stat a use adds to with its message
+ITEM_TABLE = {
+    'potion_heal': {'category': 'potion', 'glyph': POTION_HEAL, 'effect': ('health', 20), 'message': "You used a healing potion! Health restored."},
+    'potion_attack': {'category': 'potion', 'glyph': POTION_ATTACK, 'effect': ('attack_damage', 5), 'message': "You used an attack potion! Attack increased."},
+    'potion_defense': {'category': 'potion', 'glyph': POTION_DEFENSE, 'effect': ('defense', 5), 'message': "You used a defense potion! Defense increased."},
+    'scroll_heal': {'category': 'scroll', 'glyph': SCROLL_HEAL, 'effect': ('health', 30), 'message': "You used a healing scroll! Health restored."},
+    'scroll_attack': {'category': 'scroll', 'glyph': SCROLL_ATTACK, 'effect': ('attack_damage', 10), 'message': "You used an attack scroll! Attack increased."},
+    'scroll_defense': {'category': 'scroll', 'glyph': SCROLL_DEFENSE, 'effect': ('defense', 10), 'message': "You used a defense scroll! Defense increased."},
+    'scroll_identity': {'category': 'scroll', 'glyph': ITEM},
+    'weapon_sword': {'category': 'weapon', 'glyph': ITEM},
+    'armor_shield': {'category': 'armor', 'glyph': ITEM},
+    'food_ration': {'category': 'food', 'glyph': ITEM},
+    'magic_ring': {'category': 'ring', 'glyph': ITEM},
+    'gold_coin': {'category': 'treasure', 'glyph': ITEM},
+}
+ITEMS = ItemCatalog(ITEM_TABLE)  # Names compiled to integer ids
+
 # Player inventory size
 MAX_INVENTORY = 10
+ITEM_KEYS = '1234567890'  # Keys for inventory slots 1 to 10, the tenth on 0
+
+# Build the floors above and below in the background while the player explores
+PREFETCH_FLOORS = True
 
-class Item:
-    def __init__(self, name, x, y):
-        self.name = name
-        self.x = x
-        self.y = y
-        if name == 'potion_heal':
-            self.symbol = POTION_HEAL
-        elif name == 'potion_attack':
-            self.symbol = POTION_ATTACK
-        elif name == 'potion_defense':
-            self.symbol = POTION_DEFENSE
-        elif name == 'scroll_heal':
-            self.symbol = SCROLL_HEAL
-        elif name == 'scroll_attack':
-            self.symbol = SCROLL_ATTACK
-        elif name == 'scroll_defense':
-            self.symbol = SCROLL_DEFENSE
-        else:
-            self.symbol = ITEM
-
-class Monster:
-    def __init__(self, monster_type, x, y):
-        self.type = monster_type
-        self.health = MONSTER_TYPES[monster_type]['health']
-        self.attack = MONSTER_TYPES[monster_type]['attack']
-        self.defense = MONSTER_TYPES[monster_type]['defense']
-        self.x = x
-        self.y = y
-
-    def move_randomly(self):
-        dx, dy = random.choice(list(DIRECTION_MAP.values()))
-        self.x = max(1, min(DUNGEON_WIDTH - 2, self.x + dx))
-        self.y = max(1, min(DUNGEON_HEIGHT - 2, self.y + dy))
-
-    def attack_player(self, player):
-        damage = max(0, self.attack - player.defense)
-        player.health -= damage
+# Columns of the floor's entity stores; an item's kind is its id in ITEMS
+MONSTER_KINDS = list(MONSTER_TYPES)
+MONSTER_COLUMNS = ('x', 'y', 'health', 'attack', 'defense')
+ITEM_COLUMNS = ('x', 'y', 'tag')  # tag: ord() of ITEM, POTION_HEAL or SCROLL_HEAL
 
 class Player:
     def __init__(self):
@@ -109,88 +119,92 @@ class Player:
         self.health = PLAYER_HEALTH
         self.attack_damage = PLAYER_ATTACK
         self.defense = PLAYER_DEFENSE
-        self.inventory = []
-
-    def pick_up_item(self, item):
-        if len(self.inventory) < MAX_INVENTORY:
-            self.inventory.append(item)
-            return True
-        return False
-
-    def use_item(self, index, stdscr):
-        item = self.inventory[index]
-        if item.name.startswith("potion"):
-            if item.name == 'potion_heal':
-                self.health += 20
-                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, "You used a healing potion! Health restored.")
-            elif item.name == 'potion_attack':
-                self.attack_damage += 5
-                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, "You used an attack potion! Attack increased.")
-            elif item.name == 'potion_defense':
-                self.defense += 5
-                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, "You used a defense potion! Defense increased.")
-        elif item.name.startswith("scroll"):
-            if item.name == 'scroll_heal':
-                self.health += 30
-                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, "You used a healing scroll! Health restored.")
-            elif item.name == 'scroll_attack':
-                self.attack_damage += 10
-                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, "You used an attack scroll! Attack increased.")
-            elif item.name == 'scroll_defense':
-                self.defense += 10
-                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, "You used a defense scroll! Defense increased.")
-        # Remove the item after use
-        self.inventory.remove(item)
+        self.inventory = Inventory(ITEMS, MAX_INVENTORY)  # Stacks of identical items, one per slot
+
+    def pick_up_item(self, item_id):
+        return self.inventory.add(item_id)
+
+    def use_item(self, slot):
+        """Use one item from an inventory slot and return the message describing it."""
+        return self.inventory.use(slot, self)
 
     def open_inventory(self, stdscr):
         while True:
             stdscr.clear()
             stdscr.addstr(0, 0, "Inventory:")
+            bottom = 0  # Stacks keep their slot, so the list can have gaps
             if not self.inventory:
                 stdscr.addstr(1, 0, "Your inventory is empty.")
-            else:
-                for index, item in enumerate(self.inventory, start=1):
-                    stdscr.addstr(index, 0, f"{index}. {item.name}")
-            stdscr.addstr(len(self.inventory) + 2, 0, "Press the number of an item to select it, or 'i' to close...")
+            for slot, name, count in self.inventory:
+                bottom = slot + 1
+                stdscr.addstr(bottom, 0, f"{ITEM_KEYS[slot]}. {ITEMS.glyphs[self.inventory.kinds[slot]]} {name}" + (f" x{count}" if count > 1 else ''))
+            stdscr.addstr(bottom + 2, 0, "Press the number of an item to select it, or 'i' to close...")
             stdscr.refresh()
             key = stdscr.getch()
+            selected_index = ITEM_KEYS.find(chr(key)) if 0 <= key < 256 else -1
             if key == ord('i'):
                 break
-            elif key in range(ord('1'), ord('1') + len(self.inventory)):
-                selected_index = key - ord('1')
-                self.use_item(selected_index, stdscr)
+            elif 0 <= selected_index < MAX_INVENTORY and self.inventory.kinds[selected_index] is not None:
+                stdscr.addstr(DUNGEON_HEIGHT + 2, 0, self.use_item(selected_index))
                 break
 
 class Floor:
-    def __init__(self, floor_number=0):
+    def __init__(self, floor_number=0, rng=random):
+        self.rng = rng  # Anything with the random module's API, e.g. a seeded random.Random
         self.grid = [[EMPTY for _ in range(DUNGEON_WIDTH)] for _ in range(DUNGEON_HEIGHT)]
-        self.monsters = [Monster(random.choice(list(MONSTER_TYPES.keys())), random.randint(1, DUNGEON_WIDTH-2), random.randint(1, DUNGEON_HEIGHT-2)) for _ in range(5)]
-        self.items = [Item(random.choice(ITEM_TYPES), random.randint(1, DUNGEON_WIDTH-2), random.randint(1, DUNGEON_HEIGHT-2)) for _ in range(5)]
-        self.traps = [Item('trap', random.randint(1, DUNGEON_WIDTH-2), random.randint(1, DUNGEON_HEIGHT-2)) for _ in range(3)]
-        self.potions = [Item(random.choice(POTION_TYPES), random.randint(1, DUNGEON_WIDTH-2), random.randint(1, DUNGEON_HEIGHT-2)) for _ in range(2)]
-        self.scrolls = [Item(random.choice(SCROLL_TYPES), random.randint(1, DUNGEON_WIDTH-2), random.randint(1, DUNGEON_HEIGHT-2)) for _ in range(2)]
+        # Monsters and items live in columns rather than one object each; the
+        # tag column keeps apart the items, potions and scrolls
+        self.monsters = EntityStore(MONSTER_KINDS, MONSTER_COLUMNS, typecode='h')
+        self.items = EntityStore(ITEMS.names, ITEM_COLUMNS, indexed=True, typecode='h')
+        # Traps, doors and stairs by cell, so a step needs one lookup to find them
+        self.features = FeatureIndex()
+        for _ in range(5):
+            self.add_monster(self.rng.choice(MONSTER_KINDS), self.rng.randint(1, DUNGEON_WIDTH-2), self.rng.randint(1, DUNGEON_HEIGHT-2))
+        for _ in range(5):
+            self.add_item(self.rng.choice(ITEM_TYPES), self.rng.randint(1, DUNGEON_WIDTH-2), self.rng.randint(1, DUNGEON_HEIGHT-2))
+        for _ in range(3):
+            self.features.add(TRAP, self.rng.randint(1, DUNGEON_WIDTH-2), self.rng.randint(1, DUNGEON_HEIGHT-2))
+        for _ in range(2):
+            self.add_item(self.rng.choice(POTION_TYPES), self.rng.randint(1, DUNGEON_WIDTH-2), self.rng.randint(1, DUNGEON_HEIGHT-2), POTION_HEAL)
+        for _ in range(2):
+            self.add_item(self.rng.choice(SCROLL_TYPES), self.rng.randint(1, DUNGEON_WIDTH-2), self.rng.randint(1, DUNGEON_HEIGHT-2), SCROLL_HEAL)
+        self.rooms = []
         self.stairs_up = None
         self.stairs_down = None
         self.door = None
         self.hallway = None  # Track if the player is in the hallway
         self.floor_number = floor_number
         self.room_doors = []  # Track the doors
+        self.flow = FlowField(CHASE_RADIUS)  # Paths toward the player, shared by every monster
         
         # Create rooms and hallways
         self.create_rooms_and_hallways()
+        # Doors are written all over generation, and later rooms wall some of
+        # them over, so they are indexed from the finished grid
+        self.features.scan(self.grid, (DOOR_CLOSED, DOOR_OPEN))
+
+        self.place_stairs()
+
+    def add_monster(self, monster_type, x, y):
+        stats = MONSTER_TYPES[monster_type]
+        return self.monsters.add(monster_type, x=x, y=y, health=stats['health'],
+                                 attack=stats['attack'], defense=stats['defense'])
+
+    def add_item(self, name, x, y, tag=ITEM):
+        return self.items.add(name, x=x, y=y, tag=ord(tag))
 
     def create_rooms_and_hallways(self):
         # Randomize room positions and sizes
-        num_rooms = 4
         rooms = []
-        for _ in range(num_rooms):
-            room_width = random.randint(ROOM_MIN_SIZE, ROOM_MAX_SIZE)
-            room_height = random.randint(ROOM_MIN_SIZE, ROOM_MAX_SIZE)
-            x1 = random.randint(1, DUNGEON_WIDTH - room_width - 1)
-            y1 = random.randint(1, DUNGEON_HEIGHT - room_height - 1)
+        for _ in range(NUM_ROOMS):
+            room_width = self.rng.randint(ROOM_MIN_SIZE, ROOM_MAX_SIZE)
+            room_height = self.rng.randint(ROOM_MIN_SIZE, ROOM_MAX_SIZE)
+            x1 = self.rng.randint(1, DUNGEON_WIDTH - room_width - 1)
+            y1 = self.rng.randint(1, DUNGEON_HEIGHT - room_height - 1)
             x2 = x1 + room_width
             y2 = y1 + room_height
             rooms.append((x1, y1, x2, y2))
+            self.rooms.append((x1, y1, x2, y2))
 
             # Fill room with empty spaces and walls
             for y in range(y1, y2):
@@ -208,21 +222,23 @@ class Floor:
 
         # Create hallways between rooms
         self.create_hallways_between_rooms(rooms)
+        if REPAIR_CONNECTIVITY:
+            self.connect_regions()
 
     def add_random_door(self, x1, y1, x2, y2):
         # Pick a random wall and place a door
-        wall_choice = random.choice(['top', 'bottom', 'left', 'right'])
+        wall_choice = self.rng.choice(['top', 'bottom', 'left', 'right'])
         if wall_choice == 'top':
-            x = random.randint(x1 + 1, x2 - 2)
+            x = self.rng.randint(x1 + 1, x2 - 2)
             self.grid[y1][x] = DOOR_CLOSED
         elif wall_choice == 'bottom':
-            x = random.randint(x1 + 1, x2 - 2)
+            x = self.rng.randint(x1 + 1, x2 - 2)
             self.grid[y2-1][x] = DOOR_CLOSED
         elif wall_choice == 'left':
-            y = random.randint(y1 + 1, y2 - 2)
+            y = self.rng.randint(y1 + 1, y2 - 2)
             self.grid[y][x1] = DOOR_CLOSED
         elif wall_choice == 'right':
-            y = random.randint(y1 + 1, y2 - 2)
+            y = self.rng.randint(y1 + 1, y2 - 2)
             self.grid[y][x2-1] = DOOR_CLOSED
 
     def create_hallways_between_rooms(self, rooms):
@@ -247,100 +263,167 @@ class Floor:
             for x in range(min(x1, x2), max(x1, x2) + 1):
                 self.grid[y1][x] = EMPTY
 
+    def connect_regions(self):
+        # Rooms placed over each other can wall a room or a corner of the
+        # floor off, door and all; open the fewest wall cells that join
+        # everything back up. No random numbers, so the rest of the floor
+        # comes out as it would have
+        for x, y in connect(self.grid, WALKABLE, (WALL,)):
+            self.grid[y][x] = DOOR_CLOSED
+
+    def is_passable(self, x, y):
+        return 0 < x < DUNGEON_WIDTH - 1 and 0 < y < DUNGEON_HEIGHT - 1 and self.grid[y][x] != WALL
+
     def update(self, player):
-        for monster in self.monsters:
-            monster.move_randomly()
-            if (monster.x, monster.y) == (player.x, player.y):
-                monster.attack_player(player)
+        # One search toward the player serves every monster close enough to chase
+        steps = self.flow.toward(player.x, player.y, self.is_passable)
+        # Those it does not reach wander; both happen in one pass over the position columns
+        self.monsters.move(steps, self.is_passable, MONSTER_STEPS, random)
+        attack = self.monsters.columns['attack']
+        for row in self.monsters.at(player.x, player.y):
+            player.health -= max(0, attack[row] - player.defense)
+
+    def pick_up_items(self, player):
+        """Pick up every item on the player's cell that fits in the inventory."""
+        row = self.items.first_at(player.x, player.y, tag=ord(ITEM))
+        while row is not None and player.pick_up_item(self.items.kind[row]):
+            self.items.remove(row)
+            row = self.items.first_at(player.x, player.y, tag=ord(ITEM))
+
+    def stairs_at(self, x, y):
+        """Return STAIRS_UP or STAIRS_DOWN if (x, y) holds stairs, else None."""
+        kind = self.features.kind_at(x, y)
+        return kind if kind == STAIRS_UP or kind == STAIRS_DOWN else None
 
     def place_stairs(self):
         if self.rooms:
-            up_room = random.choice(self.rooms)
-            down_room = random.choice(self.rooms)
-            self.stairs_up = (random.randint(up_room[0] + 1, up_room[2] - 2), random.randint(up_room[1] + 1, up_room[3] - 2))
-            self.stairs_down = (random.randint(down_room[0] + 1, down_room[2] - 2), random.randint(down_room[1] + 1, down_room[3] - 2))
+            up_room = self.rng.choice(self.rooms)
+            down_room = self.rng.choice(self.rooms)
+            self.stairs_up = (self.rng.randint(up_room[0] + 1, up_room[2] - 2), self.rng.randint(up_room[1] + 1, up_room[3] - 2))
+            self.stairs_down = (self.rng.randint(down_room[0] + 1, down_room[2] - 2), self.rng.randint(down_room[1] + 1, down_room[3] - 2))
             self.grid[self.stairs_up[1]][self.stairs_up[0]] = STAIRS_UP
             self.grid[self.stairs_down[1]][self.stairs_down[0]] = STAIRS_DOWN
+            self.features.add(STAIRS_DOWN, *self.stairs_down)
+            self.features.add(STAIRS_UP, *self.stairs_up)  # Up wins when both land on one cell, as it always has
 
     def print_dungeon(self, player, stdscr):
-        for y in range(DUNGEON_HEIGHT):
-            line = ''
-            for x in range(DUNGEON_WIDTH):
-                if (x, y) == (player.x, player.y):
-                    line += PLAYER
-                elif any((monster.x, monster.y) == (x, y) for monster in self.monsters):
-                    line += MONSTER
-                elif any((item.x, item.y) == (x, y) for item in self.items):
-                    line += ITEM
-                elif any((item.x, item.y) == (x, y) for item in self.potions):
-                    line += POTION_HEAL
-                elif any((item.x, item.y) == (x, y) for item in self.scrolls):
-                    line += SCROLL_HEAL
-                elif self.grid[y][x] == DOOR_CLOSED:
-                    line += DOOR_CLOSED
-                elif self.grid[y][x] == DOOR_OPEN:
-                    line += DOOR_OPEN
-                elif self.grid[y][x] == STAIRS_UP:
-                    line += STAIRS_UP
-                elif self.grid[y][x] == STAIRS_DOWN:
-                    line += STAIRS_DOWN
-                elif self.grid[y][x] == TRAP:
-                    line += TRAP
-                else:
-                    line += self.grid[y][x]
-            stdscr.addstr(y, 0, line)
+        # Start from the bare grid (stairs included) and stamp entities on top,
+        # keeping the highest priority one on each cell
+        lines = [row[:] for row in self.grid]
+        items = self.items
+        xs, ys, tags = items.x, items.y, items.columns['tag']
+        drawn = {}  # (x, y) -> rank of the item drawn there
+        for row in items.rows():
+            rank = DRAW_RANK.get(tags[row])
+            cell = (xs[row], ys[row])
+            if rank is not None and rank < drawn.get(cell, len(RENDER_ORDER)):
+                drawn[cell] = rank
+                lines[cell[1]][cell[0]] = RENDER_ORDER[rank]
+        xs, ys = self.monsters.x, self.monsters.y
+        for row in self.monsters.rows():
+            lines[ys[row]][xs[row]] = MONSTER
+        lines[player.y][player.x] = PLAYER
+        for y, line in enumerate(lines):
+            stdscr.addstr(y, 0, ''.join(line))
 
     def enter_hallway(self, player):
         self.hallway = True  # Track hallway state
         player.x = DUNGEON_WIDTH // 2
         player.y = DUNGEON_HEIGHT // 2
 
-def main(stdscr):
+def main(stdscr, tick_rate=TICK_RATE):
     curses.curs_set(0)  # Hide cursor
-    stdscr.nodelay(1)  # Non-blocking input
-    stdscr.timeout(100)  # Update every 100ms
+    # Blocks until a key or a timed update instead of repainting every 100ms
+    loop = InputLoop(stdscr)
 
     player = Player()
-    dungeon = Floor()
+    # Floors are generated from their own seed on first visit and cached, so
+    # taking the stairs back returns to the same level
+    def new_floor(number, rng):
+        with profiler.span('generate'):
+            return Floor(floor_number=number, rng=rng)
+
+    # One worker thread builds the neighbouring floors while we wait for keys;
+    # each floor has its own seed, so it comes out the same whenever it's built
+    executor = ThreadPoolExecutor(1, thread_name_prefix='floors') if PREFETCH_FLOORS else None
+    floors = FloorStore(random.randrange(2 ** 32), new_floor, executor=executor)
+    dungeon = floors.get(0)
+    floors.prefetch(1, -1)
+
+    def tick():
+        """Timed update: monsters move and attack."""
+        with profiler.span('monsters'):
+            dungeon.update(player)
+
+    loop.every(1 / tick_rate, tick)
 
     while True:
-        stdscr.clear()
-        dungeon.print_dungeon(player, stdscr)
-        stdscr.addstr(DUNGEON_HEIGHT, 0, f"Health: {player.health} Attack: {player.attack_damage} Defense: {player.defense} Inventory: {len(player.inventory)}")
-        stdscr.addstr(DUNGEON_HEIGHT + 1, 0, "Press 'i' to view inventory, arrow keys to move.")
-        stdscr.refresh()
-
-        key = stdscr.getch()
+        if loop.dirty:
+            with profiler.span('render'):
+                stdscr.erase()
+                dungeon.print_dungeon(player, stdscr)
+                status = f"Health: {player.health} Attack: {player.attack_damage} Defense: {player.defense} Inventory: {len(player.inventory)}"
+                timings = profiler.status()  # Phase timings, once switched on with 'p'
+                if timings:
+                    status += '  ' + timings
+                stdscr.addstr(DUNGEON_HEIGHT, 0, status[:stdscr.getmaxyx()[1] - 1])
+                stdscr.addstr(DUNGEON_HEIGHT + 1, 0, "Press 'i' to view inventory, arrow keys to move.")
+                stdscr.refresh()
+            loop.drew()
+
+        key = loop.next_key()
 
         if key == ord('i'):
+            stdscr.timeout(-1)  # The inventory waits for a key
             player.open_inventory(stdscr)
         elif key == ord('q'):
             break
-
-        dx, dy = DIRECTION_MAP.get(key, (0, 0))
-        new_x = player.x + dx
-        new_y = player.y + dy
-        if 0 < new_x < DUNGEON_WIDTH-1 and 0 < new_y < DUNGEON_HEIGHT-1:
-            if dungeon.grid[new_y][new_x] != WALL:
-                player.x = new_x
-                player.y = new_y
-
-        # Interact with door (if adjacent)
-        if dungeon.grid[player.y][player.x] == DOOR_OPEN:
-            dungeon.enter_hallway(player)
-            
-  # Check for items and pick them up automatically
-        for item in dungeon.items[:]:
-            if (player.x, player.y) == (item.x, item.y):
-                if player.pick_up_item(item):
-                    dungeon.items.remove(item)
-
-        # Check for stairs
-        if (player.x, player.y) == dungeon.stairs_up:
-            dungeon = Floor(floor_number=dungeon.floor_number + 1)  # Transition to the next floor
-        elif (player.x, player.y) == dungeon.stairs_down:
-            dungeon = Floor(floor_number=dungeon.floor_number - 1)  # Transition to the previous floor
-
-        dungeon.update(player)
-
-curses.wrapper(main)
+        elif key == ord('p'):
+            profiler.toggle()  # Per-phase timings on the status line
+            continue
+        elif key == ord('C'):
+            profiler.toggle_cprofile()  # Press again to write the capture to a file
+            continue
+        elif key == ord('M'):
+            profiler.toggle_tracemalloc()
+            continue
+        elif key not in DIRECTION_MAP:
+            continue  # A timed update or an unused key; nothing for the player to do
+
+        with profiler.span('input'):
+            dx, dy = DIRECTION_MAP.get(key, (0, 0))
+            new_x = player.x + dx
+            new_y = player.y + dy
+            if 0 < new_x < DUNGEON_WIDTH-1 and 0 < new_y < DUNGEON_HEIGHT-1:
+                if dungeon.grid[new_y][new_x] != WALL:
+                    player.x = new_x
+                    player.y = new_y
+
+            # Interact with door (if adjacent)
+            if dungeon.features.kind_at(player.x, player.y) == DOOR_OPEN:
+                dungeon.enter_hallway(player)
+
+            # Check for items and pick them up automatically
+            dungeon.pick_up_items(player)
+
+            # Check for stairs
+            stairs = dungeon.stairs_at(player.x, player.y)
+            if stairs == STAIRS_UP:
+                dungeon = floors.get(dungeon.floor_number + 1)  # Transition to the next floor
+            elif stairs == STAIRS_DOWN:
+                dungeon = floors.get(dungeon.floor_number - 1)  # Transition to the previous floor
+            if stairs is not None:
+                floors.prefetch(dungeon.floor_number + 1, dungeon.floor_number - 1)
+
+    if executor is not None:
+        executor.shutdown(cancel_futures=True)
+    return loop.stats, floors
+
+if __name__ == "__main__":
+    # Optional argument: timed updates per second, e.g. 2 for slower monsters
+    tick_rate = float(sys.argv[1]) if len(sys.argv) > 1 else TICK_RATE
+    stats, floors = curses.wrapper(main, tick_rate)
+    print(stats.report())
+    print(floors.report())
+    if profiler.spans:
+        print(profiler.report())
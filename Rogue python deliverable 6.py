@@ -343,4 +343,5 @@ def main(stdscr):
 
         dungeon.update(player)
 
-curses.wrapper(main)
+if __name__ == "__main__":
+    curses.wrapper(main)
@@ -1,9 +1,16 @@
 import random
 import sys
 
+from rogue.ansi import FrameWriter
+from rogue.connectivity import connect
+from rogue.features import FeatureIndex
+
 # Constants for the dungeon size
 DUNGEON_WIDTH = 30
 DUNGEON_HEIGHT = 15
+MIN_ROOMS = 5
+MAX_ROOMS = 7
+REPAIR_CONNECTIVITY = True  # Dig until every room can be reached
 
 # Player and monster stats
 PLAYER_HEALTH = 100
@@ -25,15 +32,19 @@ MONSTER = 'M'
 STAIRS_UP = '<'
 STAIRS_DOWN = '>'
 
+# The terminal; it remembers the last frame so each turn only sends what changed
+SCREEN = FrameWriter()
+
 class Dungeon:
     def __init__(self):
         self.grid = [[WALL for _ in range(DUNGEON_WIDTH)] for _ in range(DUNGEON_HEIGHT)]
         self.rooms = []
+        self.features = FeatureIndex()  # Stairs by cell, so checking under the player is one lookup
         self.generate_dungeon()
 
     def generate_dungeon(self):
         """Randomly generate rooms, hallways, and stairs."""
-        num_rooms = random.randint(5, 7)
+        num_rooms = random.randint(MIN_ROOMS, MAX_ROOMS)
         for _ in range(num_rooms):
             room_width = random.randint(4, 6)
             room_height = random.randint(4, 6)
@@ -45,6 +56,11 @@ class Dungeon:
         for i in range(1, len(self.rooms)):
             self.add_hallway(self.rooms[i-1], self.rooms[i])
 
+        # The hallways often miss; dig the fewest cells that join every room up
+        if REPAIR_CONNECTIVITY:
+            for x, y in connect(self.grid, (EMPTY,), (WALL,)):
+                self.grid[y][x] = EMPTY
+
         # Add stairs (up and down)
         self.add_stairs()
 
@@ -85,6 +101,7 @@ class Dungeon:
             y = random.randint(1, DUNGEON_HEIGHT - 2)
             if self.grid[y][x] == EMPTY and not stairs_up_placed:
                 self.grid[y][x] = STAIRS_UP
+                self.features.add(STAIRS_UP, x, y)
                 stairs_up_placed = True
                 break
 
@@ -93,20 +110,22 @@ class Dungeon:
             y = random.randint(1, DUNGEON_HEIGHT - 2)
             if self.grid[y][x] == EMPTY and not stairs_down_placed:
                 self.grid[y][x] = STAIRS_DOWN
+                self.features.add(STAIRS_DOWN, x, y)
                 stairs_down_placed = True
                 break
 
-    def print_dungeon(self, player_x, player_y, monsters):
+    def print_dungeon(self, player_x, player_y, monsters, screen=SCREEN):
         """Print the dungeon grid with player and monsters."""
-        for y in range(DUNGEON_HEIGHT):
-            for x in range(DUNGEON_WIDTH):
-                if (x, y) == (player_x, player_y):
-                    print(PLAYER, end='')
-                elif any((monster.x, monster.y) == (x, y) for monster in monsters):
-                    print(MONSTER, end='')
-                else:
-                    print(self.grid[y][x], end='')
-            print()
+        # Copy the grid into the screen's rows, stamp the monsters and then
+        # the player on top, and send the difference from the last frame
+        rows = screen.frame(DUNGEON_WIDTH, DUNGEON_HEIGHT)
+        for row, cells in zip(rows, self.grid):
+            row[:] = ''.join(cells).encode()
+        for monster in monsters:
+            rows[monster.y][monster.x] = ord(MONSTER)
+        if 0 <= player_x < DUNGEON_WIDTH and 0 <= player_y < DUNGEON_HEIGHT:  # Nothing stops the player walking off the map
+            rows[player_y][player_x] = ord(PLAYER)
+        screen.flush()
 
 
 class Player:
@@ -176,21 +195,17 @@ class Game:
 
     def check_for_stairs(self):
         """Check if the player is on the stairs."""
-        for y in range(DUNGEON_HEIGHT):
-            for x in range(DUNGEON_WIDTH):
-                if self.dungeon.grid[y][x] == STAIRS_UP and (x, y) == (self.player.x, self.player.y):
-                    print("You found the stairs up!")
-                    self.dungeon = Dungeon()  # Generate a new dungeon
-                    self.player.x, self.player.y = 1, 1  # Reset player position
-                    self.spawn_monsters()  # Spawn new monsters
-                    return True
-                elif self.dungeon.grid[y][x] == STAIRS_DOWN and (x, y) == (self.player.x, self.player.y):
-                    print("You found the stairs down!")
-                    self.dungeon = Dungeon()  # Generate a new dungeon
-                    self.player.x, self.player.y = 1, 1  # Reset player position
-                    self.spawn_monsters()  # Spawn new monsters
-                    return True
-        return False
+        stairs = self.dungeon.features.kind_at(self.player.x, self.player.y)
+        if stairs == STAIRS_UP:
+            print("You found the stairs up!")
+        elif stairs == STAIRS_DOWN:
+            print("You found the stairs down!")
+        else:
+            return False
+        self.dungeon = Dungeon()  # Generate a new dungeon
+        self.player.x, self.player.y = 1, 1  # Reset player position
+        self.spawn_monsters()  # Spawn new monsters
+        return True
 
     def play_turn(self):
         """Play one turn of the game."""
@@ -211,8 +226,11 @@ class Game:
 def main():
     game = Game()
 
-    while True:
-        game.play_turn()
+    try:
+        while True:
+            game.play_turn()
+    finally:
+        SCREEN.close()  # Also after dying, which exits from inside the turn
 
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+"""Connected floors in one pass against generating until one comes out connected.
+
+Deliverable 5 and deliverables 2:3 are generated at growing sizes, with
+one room per ROOM_AREA cells, once with REPAIR_CONNECTIVITY turned off
+to see how often a floor comes out in pieces and what the union-find
+check and the corridor repair cost on it, and once with it on to time
+whole generations. Retrying instead would take 1 / (share of connected
+floors) generations on average, which is what the last column shows;
+"never" means no floor of that size came out connected.
+
+Usage: python benchmarks/bench_connectivity.py [floors]
+"""
+import importlib.util
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from rogue.connectivity import connect, regions
+
+FLOORS = 40  # At the smallest size; fewer as they get bigger
+SIZES = [(40, 20), (200, 100), (1000, 500), (2000, 1000)]
+ROOM_AREA = 200  # Cells per room on the bigger maps
+
+
+def load(script, name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, script))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def deliverable5(size, rooms, seed):
+    game = VARIANTS['deliverable 5'][0]
+    game.DUNGEON_WIDTH, game.DUNGEON_HEIGHT = size
+    game.NUM_ROOMS = rooms
+    return game.Floor(rng=random.Random(seed)).grid
+
+
+def deliverables23(size, rooms, seed):
+    game = VARIANTS['deliverables 2:3'][0]
+    game.DUNGEON_WIDTH, game.DUNGEON_HEIGHT = size
+    game.MIN_ROOMS = game.MAX_ROOMS = rooms
+    random.seed(seed)  # It uses the random module's own generator
+    return game.Dungeon().grid
+
+
+d5 = load("Rogue python deliverable 5.py", 'deliverable5')
+d23 = load("Rogue python deliverables 2:3.py", 'deliverables23')
+VARIANTS = {  # name: (module, build(size, rooms, seed) -> grid, open tiles, tiles that may be dug, tile dug to)
+    'deliverable 5': (d5, deliverable5, d5.WALKABLE, (d5.WALL,), d5.DOOR_CLOSED),
+    'deliverables 2:3': (d23, deliverables23, (d23.EMPTY, d23.STAIRS_UP, d23.STAIRS_DOWN), (d23.WALL,), d23.EMPTY),
+}
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    floors = int(sys.argv[1]) if len(sys.argv) > 1 else FLOORS
+    print(f"{'variant':17} {'size':>10} {'rooms':>5} {'in pieces':>9} {'check':>9} {'repair':>9} {'dug':>5} "
+          f"{'generate':>9} {'retrying':>9}")
+    for name, (game, build, open_tiles, dig_tiles, dug_tile) in VARIANTS.items():
+        for size in SIZES:
+            rooms = max(game.NUM_ROOMS if game is d5 else game.MIN_ROOMS, size[0] * size[1] // ROOM_AREA)
+            count = max(2, floors * SIZES[0][0] * SIZES[0][1] // (size[0] * size[1]) or 0)
+            pieces = check = repair = dug = generate = 0.0
+            for seed in range(count):
+                game.REPAIR_CONNECTIVITY = False
+                grid = build(size, rooms, seed)
+                separate, seconds = timed(regions, grid, open_tiles)
+                check += seconds
+                cells, seconds = timed(connect, grid, open_tiles, dig_tiles)
+                if separate > 1:
+                    pieces += 1
+                    repair += seconds
+                    dug += len(cells)
+                for x, y in cells:
+                    grid[y][x] = dug_tile
+                assert regions(grid, open_tiles) == 1, f"{name} {size} seed {seed} still in pieces"
+
+                game.REPAIR_CONNECTIVITY = True
+                repaired, seconds = timed(build, size, rooms, seed)
+                generate += seconds
+                assert regions(repaired, open_tiles) == 1, f"{name} {size} seed {seed} in pieces in the game"
+            connected = count - pieces
+            retrying = f"{1000 * generate / connected:7.1f}ms" if connected else 'never'
+            print(f"{name:17} {size[0]:>5}x{size[1]:<4} {rooms:>5} {100 * pieces / count:>8.0f}% "
+                  f"{1000 * check / count:>7.2f}ms {1000 * repair / max(1, pieces):>7.2f}ms "
+                  f"{dug / max(1, pieces):>5.1f} {1000 * generate / count:>7.1f}ms {retrying:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Turns per second of the headless engine, with no terminal attached.
+
+Most of a turn goes to the monsters: whenever the player has moved and a
+monster is within CHASE_RADIUS, the flow field toward them is searched
+again, and every monster that moves is re-filed in the spatial index.
+On one core of the machine the backlog was built on this runs about
+25,000-29,000 turns/s; with NUM_MONSTERS = 0 the same commands run about
+236,000 turns/s.
+
+Usage: python benchmarks/bench_engine.py [turns] [seed]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rogue import engine
+
+COMMANDS = (engine.LEFT, engine.RIGHT, engine.UP, engine.DOWN, engine.WAIT)
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    picks = random.Random(seed)
+    commands = [picks.choice(COMMANDS) for _ in range(turns)]
+
+    games = 0
+    state = engine.new_game(seed)
+    step = engine.step
+    start = time.perf_counter()
+    for command in commands:
+        if state.over:
+            games += 1
+            state = engine.new_game(seed + games)
+        step(state, command)
+    elapsed = time.perf_counter() - start
+
+    print(f"{turns} turns in {elapsed:.3f}s: {turns / elapsed:,.0f} turns/s ({games} games restarted)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Monsters as objects against monsters as rogue.entities columns.
+
+ObjectMonster is the one-object-per-monster layout deliverable 5 used
+before its floor moved to an EntityStore. Both hold the same monsters and
+run the same systems: one movement pass (half the monsters on a flow
+field, the rest wandering), a hit on every monster and a sweep of the
+dead. Memory is what tracemalloc sees allocated per monster.
+
+Usage: python benchmarks/bench_entities.py [monsters]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rogue.entities import EntityStore
+
+MONSTERS = 100000
+MAP_SIZE = 1000
+REPEATS = 5
+MONSTER_TYPES = {
+    'Goblin': {'health': 20, 'attack': 5, 'defense': 2},
+    'Orc': {'health': 40, 'attack': 15, 'defense': 5},
+    'Troll': {'health': 60, 'attack': 20, 'defense': 10},
+    'Dragon': {'health': 100, 'attack': 30, 'defense': 20},
+    'Skeleton': {'health': 25, 'attack': 8, 'defense': 3}
+}
+STEPS = ((-1, 0), (0, 1), (0, -1), (1, 0))
+HIT = 25
+
+
+class ObjectMonster:
+    def __init__(self, monster_type, x, y):
+        self.type = monster_type
+        self.health = MONSTER_TYPES[monster_type]['health']
+        self.attack = MONSTER_TYPES[monster_type]['attack']
+        self.defense = MONSTER_TYPES[monster_type]['defense']
+        self.x = x
+        self.y = y
+
+
+def passable(x, y):
+    return 0 < x < MAP_SIZE - 1 and 0 < y < MAP_SIZE - 1
+
+
+def spawns(count):
+    rng = random.Random(1)
+    kinds = list(MONSTER_TYPES)
+    return [(rng.choice(kinds), rng.randint(1, MAP_SIZE - 2), rng.randint(1, MAP_SIZE - 2)) for _ in range(count)]
+
+
+def build_objects(spawned):
+    return [ObjectMonster(kind, x, y) for kind, x, y in spawned]
+
+
+def build_store(spawned):
+    store = EntityStore(MONSTER_TYPES, ('x', 'y', 'health', 'attack', 'defense'), typecode='h')
+    for kind, x, y in spawned:
+        stats = MONSTER_TYPES[kind]
+        store.add(kind, x=x, y=y, health=stats['health'], attack=stats['attack'], defense=stats['defense'])
+    return store
+
+
+def allocated(build, spawned):
+    """Bytes allocated by build(spawned), and what it built."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build(spawned)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, built
+
+
+def move_objects(monsters, steps, rng):
+    for monster in monsters:
+        step = steps.get((monster.x, monster.y))
+        if step is not None:
+            monster.x, monster.y = step
+        else:
+            dx, dy = rng.choice(STEPS)
+            if passable(monster.x + dx, monster.y + dy):
+                monster.x += dx
+                monster.y += dy
+
+
+def hit_objects(monsters):
+    for monster in monsters:
+        monster.health -= max(0, HIT - monster.defense)
+    return [monster for monster in monsters if monster.health > 0]
+
+
+def hit_store(store):
+    store.damage(store.rows(), HIT)
+    return store.sweep()
+
+
+def best(run, setup=lambda: None):
+    """Fastest of REPEATS runs of run(setup()), not counting setup."""
+    times = []
+    for _ in range(REPEATS):
+        argument = setup()
+        start = time.perf_counter()
+        run(argument)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else MONSTERS
+    spawned = spawns(count)
+    steps = {(x, y): (x + 1, y) for _, x, y in spawned[::2]}  # A flow field reaching half of them
+    object_bytes, objects = allocated(build_objects, spawned)
+    store_bytes, store = allocated(build_store, spawned)
+
+    object_move = best(lambda rng: move_objects(objects, steps, rng), lambda: random.Random(1))
+    store_move = best(lambda rng: store.move(steps, passable, STEPS, rng), lambda: random.Random(1))
+    object_hit = best(hit_objects, lambda: build_objects(spawned))  # Fresh monsters each time, since hits kill
+    store_hit = best(hit_store, lambda: build_store(spawned))
+
+    print(f"{count:,} monsters, best of {REPEATS}")
+    print(f"{'':10} {'bytes/monster':>14} {'move':>10} {'hit+sweep':>10}")
+    print(f"{'objects':10} {object_bytes / count:>14.1f} {1000 * object_move:>8.1f}ms {1000 * object_hit:>8.1f}ms")
+    print(f"{'columns':10} {store_bytes / count:>14.1f} {1000 * store_move:>8.1f}ms {1000 * store_hit:>8.1f}ms")
+    print(f"columns use {object_bytes / store_bytes:.1f}x less memory ({store.nbytes() / count:.1f} bytes/monster in the arrays)")
+
+
+if __name__ == "__main__":
+    main()
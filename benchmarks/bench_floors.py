@@ -0,0 +1,70 @@
+"""Memory use of a long run with lazily generated, cached floors.
+
+Descends through many floors with the headless engine, reporting traced
+memory and the size of the packed floors as it goes, then climbs back up
+and checks that every floor comes back exactly as it was left.
+
+Usage: python benchmarks/bench_floors.py [floors]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rogue import engine
+
+seen = {}  # depth -> snapshot() of the floor when the player left it
+
+
+def snapshot(floor):
+    """Hash what must survive a round trip (monsters keep wandering, so not their positions)."""
+    tiles = tuple(''.join(row) for row in floor.grid)
+    items = tuple((item.name, item.x, item.y) for item in floor.items)
+    monsters = tuple((monster.type, monster.health) for monster in floor.monsters)
+    return hash((tiles, items, monsters))
+
+
+def take_stairs(state, stairs):
+    """Stand next to a staircase and step onto it, remembering the floor left behind."""
+    x, y = stairs
+    for dx, command in ((-1, engine.RIGHT), (1, engine.LEFT)):
+        if state.floor.is_walkable(x + dx, y):
+            break
+    state.player.x, state.player.y = x + dx, y
+    for monster in list(state.floor.occupancy.at(x, y)):
+        state.floor.remove_monster(monster)
+    # Monsters chase the player and strike as they come and go, so take every staircase at full health
+    state.player.health = state.player.max_health
+    seen[state.depth] = snapshot(state.floor)
+    engine.step(state, command)
+    if state.over:
+        print(f"the player died at depth {state.depth}; the run cannot go on")
+        sys.exit(1)
+
+
+def main():
+    floors = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    state = engine.new_game(1)
+    tracemalloc.start()
+    start = time.perf_counter()
+    print(f"{'depth':>6} {'traced bytes':>13} {'packed bytes':>13} {'live floors':>12}")
+    while state.depth < floors:
+        take_stairs(state, state.floor.stairs_down)
+        if state.depth % 50 == 0:
+            current, _ = tracemalloc.get_traced_memory()
+            print(f"{state.depth:>6} {current:>13,} {state.floors.packed_bytes():>13,} {len(state.floors.live):>12}")
+    while state.depth > 0:
+        take_stairs(state, state.floor.stairs_up)
+        if snapshot(state.floor) != seen[state.depth]:
+            print(f"depth {state.depth} changed after being restored")
+            sys.exit(1)
+    elapsed = time.perf_counter() - start
+    floors_store = state.floors
+    print(f"down {floors} floors and back in {elapsed:.2f}s: {floors_store.generated} generated, "
+          f"{floors_store.restored} restored, every floor identical on return")
+
+
+if __name__ == "__main__":
+    main()
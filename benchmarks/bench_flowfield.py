@@ -0,0 +1,76 @@
+"""Monster turns with a shared flow field, from 1,000 to 10,000 chasers.
+
+Every monster is dropped within reach of the player on a 1000x1000 large
+floor, and the field is forced to rebuild every turn (as if the player
+moved every turn), which is the worst case. The build column should stay
+flat as the monster count grows; only the cheap per-monster lookup and
+step grow with it. For comparison, the last column estimates what a
+separate search per monster would cost, from timing a sample of them.
+
+Usage: python benchmarks/bench_flowfield.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rogue import engine
+from rogue.chunks import LargeFloor
+from rogue.flowfield import FlowField
+
+MAP_SIZE = 1000
+RADIUS = 40
+MONSTER_COUNTS = [1000, 2000, 5000, 10000]
+TURNS = 50
+SAMPLE = 20  # Monsters timed with a search of their own
+
+
+def crowd(state, count, rng):
+    """Fill the floor around the player with count monsters."""
+    floor = state.floor
+    player = state.player
+    cells = [(x, y)
+             for y in range(player.y - RADIUS // 2, player.y + RADIUS // 2 + 1)
+             for x in range(player.x - RADIUS // 2, player.x + RADIUS // 2 + 1)
+             if floor.is_walkable(x, y) and (x, y) != (player.x, player.y)]
+    types = list(engine.MONSTER_TYPES)
+    for _ in range(count):
+        floor.add_monster(engine.Monster(rng.choice(types), *rng.choice(cells)))
+
+
+def main():
+    print(f"{'monsters':>9} {'chasing':>8} {'build':>9} {'turn':>9} {'per monster':>12} {'own searches':>13}")
+    for count in MONSTER_COUNTS:
+        state = engine.new_game(1, MAP_SIZE, MAP_SIZE, LargeFloor)
+        state.flow = FlowField(RADIUS)
+        state.player.health = 10 ** 9  # Nobody dies, so every turn moves every monster
+        crowd(state, count, random.Random(count))
+        floor = state.floor
+        player = state.player
+
+        start = time.perf_counter()
+        for _ in range(TURNS):
+            state.flow.build(player.x, player.y, floor.is_walkable)
+        build = (time.perf_counter() - start) / TURNS
+
+        start = time.perf_counter()
+        for _ in range(TURNS):
+            state.flow.key = None  # As if the player had moved
+            engine.step(state, engine.WAIT)
+        turn = (time.perf_counter() - start) / TURNS
+        chasing = sum(1 for monster in floor.monsters if (monster.x, monster.y) in state.flow.steps)
+
+        # A search of its own for each monster: time a sample and scale up
+        start = time.perf_counter()
+        for monster in floor.monsters[:SAMPLE]:
+            FlowField(RADIUS).build(monster.x, monster.y, floor.is_walkable)
+        own = (time.perf_counter() - start) / SAMPLE * chasing
+
+        print(f"{count:>9} {chasing:>8} {build * 1000:>7.2f}ms {turn * 1000:>7.2f}ms "
+              f"{(turn - build) / count * 1e6:>10.2f}us {own * 1000:>11.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Drawing deliverables 2:3's map a cell at a time against rogue.ansi.FrameWriter.
+
+The old print_dungeon() made a print() call per cell and an any() over
+the monsters for each one. The FrameWriter version fills reused row
+buffers, stamps the monsters, and writes only what changed since the
+last frame in one go. Both draw the same walk (the player and monsters
+take a random step each frame) into a stream that counts what reaches
+the operating system, buffered the way a terminal is (a write per line)
+and the way a pipe is (8 KiB blocks).
+
+Usage: python benchmarks/bench_frames.py [frames]
+"""
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from rogue.ansi import FrameWriter
+
+SCRIPT = "Rogue python deliverables 2:3.py"
+FRAMES = 100
+SIZES = [(30, 15), (80, 40), (200, 100)]
+MONSTERS = 20
+SEED = 1
+
+
+class CountingFile(io.RawIOBase):
+    """Stands in for the terminal or pipe, counting the writes that reach it."""
+
+    def __init__(self):
+        self.writes = 0
+        self.bytes = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.writes += 1
+        self.bytes += len(data)
+        return len(data)
+
+
+def stream(terminal):
+    raw = CountingFile()
+    return raw, io.TextIOWrapper(io.BufferedWriter(raw, 8192), line_buffering=terminal)
+
+
+def print_dungeon(game, dungeon, player_x, player_y, monsters):
+    """The old Dungeon.print_dungeon."""
+    for y in range(game.DUNGEON_HEIGHT):
+        for x in range(game.DUNGEON_WIDTH):
+            if (x, y) == (player_x, player_y):
+                print(game.PLAYER, end='')
+            elif any((monster.x, monster.y) == (x, y) for monster in monsters):
+                print(game.MONSTER, end='')
+            else:
+                print(dungeon.grid[y][x], end='')
+        print()
+
+
+def walk(game, frames):
+    """Player and monster positions for every frame."""
+    rng = random.Random(SEED)
+    width, height = game.DUNGEON_WIDTH, game.DUNGEON_HEIGHT
+    player = [width // 2, height // 2]
+    monsters = [[rng.randint(1, width - 2), rng.randint(1, height - 2)] for _ in range(MONSTERS)]
+    for _ in range(frames):
+        for position in [player] + monsters:
+            position[0] = max(1, min(width - 2, position[0] + rng.choice((-1, 0, 1))))
+            position[1] = max(1, min(height - 2, position[1] + rng.choice((-1, 0, 1))))
+        yield tuple(player), [game.Monster(x, y) for x, y in monsters]
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else FRAMES
+    spec = importlib.util.spec_from_file_location('deliverables23', os.path.join(ROOT, SCRIPT))
+    game = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(game)
+    print(f"{frames} frames, {MONSTERS} monsters")
+    print(f"{'size':>9} {'output':9} {'drawn by':12} {'per frame':>10} {'writes':>7} {'bytes':>7}")
+    for width, height in SIZES:
+        game.DUNGEON_WIDTH, game.DUNGEON_HEIGHT = width, height
+        random.seed(SEED)
+        dungeon = game.Dungeon()
+        steps = list(walk(game, frames))
+        for output, terminal in (('terminal', True), ('pipe', False)):
+            raw, text = stream(terminal)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(text):
+                for (x, y), monsters in steps:
+                    print_dungeon(game, dungeon, x, y, monsters)
+                    text.flush()  # The game then waits on input(), which flushes
+            cell = time.perf_counter() - start
+
+            screen_raw, screen_text = stream(terminal)
+            screen = FrameWriter(screen_text)
+            start = time.perf_counter()
+            for (x, y), monsters in steps:
+                dungeon.print_dungeon(x, y, monsters, screen)
+            framed = time.perf_counter() - start
+
+            for label, seconds, counted in (('print()', cell, raw), ('FrameWriter', framed, screen_raw)):
+                print(f"{width:>4}x{height:<4} {output:9} {label:12} {1e6 * seconds / frames:>8.1f}us "
+                      f"{counted.writes / frames:>7.1f} {counted.bytes / frames:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Floor generation latency: random room placement against BSP.
+
+Generates many floors with each layout and reports median, p99 and worst
+generation time together with room counts and retries, which is where the
+tail latency of retry-based placement shows up.
+
+Usage: python benchmarks/bench_generation.py [floors] [width] [height]
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rogue.bsp import BSPFloor
+from rogue.engine import Floor
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    floors = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    height = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    print(f"{floors} floors of {width}x{height}")
+    print(f"{'layout':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'min rooms':>10} {'max retries':>12}")
+    for floor_class in (Floor, BSPFloor):
+        stats = [floor_class(1, random.Random(seed), width, height).stats for seed in range(floors)]
+        times = sorted(stat.seconds * 1000 for stat in stats)
+        print(f"{floor_class.__name__:>8} {percentile(times, 0.5):>8.3f} {percentile(times, 0.99):>8.3f} "
+              f"{times[-1]:>8.3f} {min(stat.rooms for stat in stats):>10} {max(stat.retries for stat in stats):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Idle cost of the curses deliverables: CPU time and bytes sent to the terminal.
+
+Each game runs in a pseudo-terminal for a few seconds with nobody
+pressing keys, then quits. Monsters keep wandering at the tick rate, so
+some redrawing is expected, but a game that sits waiting for input
+should cost next to no CPU.
+
+Usage: python benchmarks/bench_idle.py [seconds] [tick_rate ...]
+"""
+import os
+import pty
+import re
+import select
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SCRIPTS = ["Rogue python deliverable 4.py", "Rogue python deliverable 5.py"]
+TICK_RATES = [10, 1]
+
+
+def run_idle(script, tick_rate, seconds):
+    """Run a script in a pty for a while; return (cpu seconds, bytes written, the loop report)."""
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.chdir(ROOT)
+        os.environ.setdefault('TERM', 'xterm')
+        os.execvp(sys.executable, [sys.executable, script, str(tick_rate)])
+    written = 0
+    output = b''
+    deadline = time.monotonic() + seconds
+    quitting = False
+    while True:
+        now = time.monotonic()
+        if now >= deadline and not quitting:
+            os.write(fd, b'q')  # Quit, then get past any "Game Over" prompt
+            os.write(fd, b'q')
+            quitting = True
+        ready, _, _ = select.select([fd], [], [], 0.1)
+        if ready:
+            try:
+                data = os.read(fd, 65536)
+            except OSError:
+                break
+            if not data:
+                break
+            written += len(data)
+            output = (output + data)[-4096:]
+    _, status, usage = os.wait4(pid, 0)
+    report = re.search(r'\d+ frames in .*% of wall time', output.decode('utf-8', 'replace'))
+    return usage.ru_utime + usage.ru_stime, written, report.group(0) if report else ''
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    tick_rates = [float(rate) for rate in sys.argv[2:]] or TICK_RATES
+    for script in SCRIPTS:
+        for tick_rate in tick_rates:
+            cpu, written, report = run_idle(script, tick_rate, seconds)
+            print(f"{script} at {tick_rate:g} ticks/s: CPU {cpu:.2f}s over {seconds:.0f}s idle "
+                  f"({100 * cpu / seconds:.1f}%), {written / seconds:,.0f} bytes/s to the terminal")
+            if report:
+                print(f"    {report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Picking up and using items: a plain list against rogue.items.
+
+The list is how Deliverable_8.py and deliverable 5 kept inventories
+before: append to pick up, and on use a chain of name comparisons then
+list.remove(). The Inventory stacks by kind in slots and dispatches on
+integer ids, so its cost should stay flat as the inventory and the item
+catalogue grow, while the list's use grows with the number of items held.
+
+Each round picks up one random item and uses it again, on top of an
+inventory already holding so many random items (stacked, for Inventory).
+
+Usage: python benchmarks/bench_items.py [rounds]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rogue.items import Inventory, ItemCatalog
+
+ROUNDS = 20000
+INVENTORY_SIZES = [10, 1000, 100000]
+CATALOGUE_SIZES = [12, 10000]
+EFFECTS = [('health', 20), ('attack_damage', 5), ('defense', 5), ('health', 30), ('attack_damage', 10), ('defense', 10)]
+
+
+class Player:
+    def __init__(self):
+        self.health = 100
+        self.attack_damage = 10
+        self.defense = 5
+
+
+class Item:
+    def __init__(self, name):
+        self.name = name
+
+
+def use_from_list(player, inventory, index):
+    """The old Player.use_item, effects cut down to the stat changes."""
+    item = inventory[index]
+    if item.name.startswith("potion"):
+        if item.name == 'potion_heal':
+            player.health += 20
+        elif item.name == 'potion_attack':
+            player.attack_damage += 5
+        elif item.name == 'potion_defense':
+            player.defense += 5
+    elif item.name.startswith("scroll"):
+        if item.name == 'scroll_heal':
+            player.health += 30
+        elif item.name == 'scroll_attack':
+            player.attack_damage += 10
+        elif item.name == 'scroll_defense':
+            player.defense += 10
+    inventory.remove(item)
+
+
+def catalogue(size):
+    """The six potions and scrolls, then plain items up to size kinds."""
+    table = {name: {'category': name.split('_')[0], 'effect': effect} for name, effect in zip(
+        ['potion_heal', 'potion_attack', 'potion_defense', 'scroll_heal', 'scroll_attack', 'scroll_defense'], EFFECTS)}
+    for number in range(size - len(table)):
+        table[f'thing_{number}'] = {'category': 'thing'}
+    return table
+
+
+def time_list(names, held, rounds):
+    player = Player()
+    inventory = [Item(name) for name in names[:held]]
+    picks = names[held:held + rounds]
+    start = time.perf_counter()
+    for name in picks:
+        inventory.append(Item(name))
+        use_from_list(player, inventory, len(inventory) - 1)
+    return (time.perf_counter() - start) / rounds
+
+
+def time_inventory(catalog, names, held, rounds):
+    player = Player()
+    inventory = Inventory(catalog, held + 1)
+    ids = [catalog.ids[name] for name in names]
+    for item_id in ids[:held]:
+        inventory.add(item_id)
+    start = time.perf_counter()
+    for item_id in ids[held:held + rounds]:
+        inventory.add(item_id)
+        inventory.use(inventory.slot_of[item_id], player)
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else ROUNDS
+    rng = random.Random(1)
+    print(f"{'kinds':>7} {'held':>7} {'list':>10} {'Inventory':>10}")
+    for size in CATALOGUE_SIZES:
+        catalog = ItemCatalog(catalogue(size))
+        for held in INVENTORY_SIZES:
+            names = [rng.choice(catalog.names) for _ in range(held + rounds)]
+            listed = time_list(names, held, min(rounds, 2000000 // held))  # The list gets slow; fewer rounds
+            stacked = time_inventory(catalog, names, held, rounds)
+            print(f"{size:>7} {held:>7} {1e6 * listed:>8.2f}us {1e6 * stacked:>8.2f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Large-map mode: generation, tile memory and per-turn cost by map size.
+
+Each turn is one engine.step() plus a frame drawn through an 80x24
+terminal's worth of Camera, which is what the curses front end does. The
+per-turn figure should stay flat as the map grows; the full-map render
+column shows what drawing everything would cost instead.
+
+Usage: python benchmarks/bench_large_map.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rogue import engine
+from rogue.chunks import LargeFloor
+from rogue.viewport import Camera
+
+SIZES = [(100, 100), (500, 500), (1000, 1000), (2000, 2000)]
+SCREEN = (79, 22)  # An 80x24 terminal minus the status and message rows
+TURNS = 5000
+COMMANDS = (engine.LEFT, engine.RIGHT, engine.UP, engine.DOWN, engine.WAIT)
+
+
+def main():
+    print(f"{'size':>10} {'rooms':>6} {'generate':>10} {'tile bytes':>12} {'cells':>12} "
+          f"{'turn':>8} {'full render':>12}")
+    for width, height in SIZES:
+        start = time.perf_counter()
+        state = engine.new_game(1, width, height, LargeFloor)
+        generated = time.perf_counter() - start
+
+        camera = Camera(*SCREEN)
+        rng = random.Random(1)
+        start = time.perf_counter()
+        for _ in range(TURNS):
+            if state.over:
+                state = engine.new_game(1, width, height, LargeFloor)
+            engine.step(state, rng.choice(COMMANDS))
+            engine.frame(state, camera)
+        turn = (time.perf_counter() - start) / TURNS
+
+        start = time.perf_counter()
+        engine.frame(state)
+        full = time.perf_counter() - start
+
+        size = f"{width}x{height}"
+        print(f"{size:>10} {len(state.floor.rooms):>6} {generated * 1000:>8.0f}ms "
+              f"{state.floor.grid.allocated_bytes():>12,} {width * height:>12,} "
+              f"{turn * 1e6:>6.0f}us {full * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
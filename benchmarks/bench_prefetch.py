@@ -0,0 +1,83 @@
+"""Stairs transitions in deliverable 5 with and without prefetching floors.
+
+A scripted player spends EXPLORE seconds on each floor (sleeping, as the
+game does while it waits for a key) and then takes the stairs up. Without
+an executor every new floor is generated on the spot; with one, the
+FloorStore builds the next floor in the background and the stairs just
+swap it in. The floors are checked to come out the same every way.
+
+Usage: python benchmarks/bench_prefetch.py [floors] [explore_seconds]
+"""
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from rogue.floors import FloorStore
+
+SCRIPT = "Rogue python deliverable 5.py"
+MODULE = 'deliverable5'
+FLOORS = 30
+EXPLORE = 0.02
+MAP_SIZE = (200, 100)  # Larger than the game's own 40x20, so generation is worth hiding
+SEED = 1
+
+
+def load():
+    """Import the game by path, registered so its floors can be pickled to and from worker processes."""
+    spec = importlib.util.spec_from_file_location(MODULE, os.path.join(ROOT, SCRIPT))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[MODULE] = module
+    spec.loader.exec_module(module)
+    module.DUNGEON_WIDTH, module.DUNGEON_HEIGHT = MAP_SIZE
+    return module
+
+
+game = load()
+
+
+def build(depth, rng):
+    return game.Floor(floor_number=depth, rng=rng)
+
+
+def climb(floors, count, explore):
+    """Walk up count floors; return the seconds each transition took and the grids seen."""
+    transitions = []
+    grids = [floors.get(0).grid]
+    floors.prefetch(1)
+    for depth in range(1, count + 1):
+        time.sleep(explore)
+        start = time.perf_counter()
+        floor = floors.get(depth)
+        transitions.append(time.perf_counter() - start)
+        floors.prefetch(depth + 1)
+        grids.append(floor.grid)
+    return transitions, grids
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else FLOORS
+    explore = float(sys.argv[2]) if len(sys.argv) > 2 else EXPLORE
+    print(f"{count} floors of {MAP_SIZE[0]}x{MAP_SIZE[1]}, {1000 * explore:.0f}ms exploring each")
+    reference = None
+    for label, executor in (('on the spot', None), ('thread', ThreadPoolExecutor(1)),
+                            ('process', ProcessPoolExecutor(1))):
+        floors = FloorStore(SEED, build, capacity=count + 1, executor=executor)
+        transitions, grids = climb(floors, count, explore)
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if reference is None:
+            reference = grids
+        assert grids == reference, f"{label} floors differ from the ones generated on the spot"
+        transitions.sort()
+        print(f"{label:12} transition median {1000 * transitions[len(transitions) // 2]:6.2f}ms  "
+              f"max {1000 * transitions[-1]:6.2f}ms")
+        print(f"{'':12} {floors.report()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Cost of rogue.profiler: engine turns with profiling off and on, and one span.
+
+With profiling off, engine.step() checks one flag and skips its spans,
+so off should match the engine's usual speed within noise.
+
+Usage: python benchmarks/bench_profiler.py [turns]
+"""
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rogue import engine
+from rogue.chunks import LargeFloor
+from rogue.profiler import profiler
+
+TURNS = 50000
+REPEATS = 5
+MOVES = [engine.LEFT, engine.RIGHT, engine.UP, engine.DOWN, engine.WAIT]
+
+
+def play(turns):
+    """Seconds for a scripted game of so many turns on a large map (so nobody dies early)."""
+    state = engine.new_game(1, 200, 200, LargeFloor)
+    script = random.Random(1)
+    commands = [script.choice(MOVES) for _ in range(turns)]
+    start = time.perf_counter()
+    for command in commands:
+        engine.step(state, command)
+    return time.perf_counter() - start
+
+
+def span_cost():
+    """Nanoseconds for one with profiler.span(...) block around nothing."""
+    def timed():
+        with profiler.span('bench'):
+            pass
+    return min(timeit.repeat(timed, number=100000, repeat=REPEATS)) / 100000 * 1e9
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else TURNS
+    off = min(play(turns) for _ in range(REPEATS))
+    off_span = span_cost()
+    profiler.toggle()
+    on = min(play(turns) for _ in range(REPEATS))
+    on_span = span_cost()
+    profiler.toggle()
+
+    print(f"{turns} turns, best of {REPEATS}")
+    print(f"profiling off  {turns / off:>9,.0f} turns/s   span {off_span:5.0f}ns")
+    print(f"profiling on   {turns / on:>9,.0f} turns/s   span {on_span:5.0f}ns   ({100 * (on / off - 1):+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
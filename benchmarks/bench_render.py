@@ -0,0 +1,102 @@
+"""Measure bytes sent to the terminal per turn by Deliverable_8's renderer.
+
+The game is driven through a pseudo-terminal so curses emits exactly what
+it would over SSH. Every byte the child process writes is counted, once
+with the old clear-and-repaint renderer and once with DirtyRenderer.
+
+Usage: python benchmarks/bench_render.py [turns]
+"""
+import curses
+import os
+import pty
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import Deliverable_8 as game
+from rogue.render import DirtyRenderer
+
+SCREEN_LINES = 24
+SCREEN_COLUMNS = 80
+
+
+def build_dungeon():
+    """Lay out a fixed two-room map so both runs draw the same frames."""
+    dungeon = game.Dungeon.__new__(game.Dungeon)
+    dungeon.grid = [['#' for _ in range(game.DUNGEON_WIDTH)] for _ in range(game.DUNGEON_HEIGHT)]
+    dungeon.rooms = [game.Room(1, 1, 6, 6), game.Room(12, 2, 6, 6)]
+    dungeon.monsters = []
+    dungeon.items = []
+    for room in dungeon.rooms:
+        dungeon.create_room(room)
+    dungeon.create_hallway(dungeon.rooms[0].center(), dungeon.rooms[1].center())
+    return dungeon
+
+
+def legacy_render(dungeon, stdscr, player):
+    """The renderer Deliverable_8 shipped with: clear and rebuild every row."""
+    stdscr.clear()
+    for y in range(game.DUNGEON_HEIGHT):
+        line = ''
+        for x in range(game.DUNGEON_WIDTH):
+            if (x, y) == (player.x, player.y):
+                line += '@'
+            else:
+                line += dungeon.grid[y][x]
+        stdscr.addstr(y, 0, line)
+    stdscr.addstr(game.DUNGEON_HEIGHT, 0, f"Level: {player.level} Health: {player.health} Attack: {player.attack_damage} Defense: {player.defense} EXP: {player.exp}/{game.LEVEL_UP_EXP}")
+    stdscr.refresh()
+
+
+def play(stdscr, mode, turns):
+    """Walk the player back and forth across the map for a number of turns."""
+    dungeon = build_dungeon()
+    player = game.Player()
+    renderer = DirtyRenderer(stdscr)
+    step = 1
+    for _ in range(turns + 1):
+        if mode == 'legacy':
+            legacy_render(dungeon, stdscr, player)
+        else:
+            dungeon.render(renderer, player)
+        if not 1 <= player.x + step < game.DUNGEON_WIDTH - 1:
+            step = -step
+        player.x += step
+
+
+def bytes_written(mode, turns):
+    """Run one session on a pseudo-terminal and count the bytes it emits."""
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.environ['TERM'] = os.environ.get('BENCH_TERM', 'xterm')
+        os.environ['LINES'] = str(SCREEN_LINES)
+        os.environ['COLUMNS'] = str(SCREEN_COLUMNS)
+        try:
+            curses.wrapper(play, mode, turns)
+        finally:
+            os._exit(0)
+    total = 0
+    while True:
+        try:
+            chunk = os.read(fd, 65536)
+        except OSError:
+            break
+        if not chunk:
+            break
+        total += len(chunk)
+    os.waitpid(pid, 0)
+    os.close(fd)
+    return total
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{'renderer':<10} {'total bytes':>12} {'bytes/turn':>11}")
+    for mode in ('legacy', 'dirty'):
+        baseline = bytes_written(mode, 0)
+        total = bytes_written(mode, turns)
+        print(f"{mode:<10} {total:>12} {(total - baseline) / turns:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
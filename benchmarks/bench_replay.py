@@ -0,0 +1,66 @@
+"""Record a long scripted game with rogue.replay, then replay and seek through it.
+
+The game is played on a large map so the player survives long enough to
+make seeking worth measuring. Replaying from the start costs time in
+proportion to the position; seeking from keyframes should cost about the
+same wherever it lands.
+
+Usage: python benchmarks/bench_replay.py [commands] [keyframe_interval]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rogue import engine
+from rogue.chunks import LargeFloor
+from rogue.replay import KEYFRAME_INTERVAL, Journal, Recorder, Replayer
+
+COMMANDS = 20000
+MAP_SIZE = 200
+SEEKS = 50
+MOVES = [engine.LEFT, engine.RIGHT, engine.UP, engine.DOWN, engine.WAIT]
+
+
+def main():
+    commands = int(sys.argv[1]) if len(sys.argv) > 1 else COMMANDS
+    interval = int(sys.argv[2]) if len(sys.argv) > 2 else KEYFRAME_INTERVAL
+    script = random.Random(1)
+    recorder = Recorder(1, MAP_SIZE, MAP_SIZE, LargeFloor)
+    start = time.perf_counter()
+    for _ in range(commands):
+        recorder.step((engine.USE, 0) if script.random() < 0.02 else script.choice(MOVES))
+    record_time = time.perf_counter() - start
+    data = recorder.journal.dumps()
+
+    replayer = Replayer(Journal.loads(data), interval)
+    start = time.perf_counter()
+    final = replayer.run()
+    replay_time = time.perf_counter() - start
+    assert engine.frame(final) == engine.frame(recorder.state), "replay diverged from the recording"
+
+    positions = [script.randrange(commands + 1) for _ in range(SEEKS)]
+    seek_times = []
+    for position in positions:
+        start = time.perf_counter()
+        replayer.state_at(position)
+        seek_times.append(time.perf_counter() - start)
+    cold = Replayer(Journal.loads(data), commands + 1)  # One keyframe only: every seek replays from the start
+    start = time.perf_counter()
+    for position in positions[:5]:
+        cold.state_at(position)
+    cold_time = (time.perf_counter() - start) / 5
+
+    print(f"{commands} commands on a {MAP_SIZE}x{MAP_SIZE} map, reached depth {final.depth}"
+          + (" (game over)" if final.over else ""))
+    print(f"journal     {len(data):>9,} bytes  recorded at {commands / record_time:,.0f} commands/s")
+    print(f"replay      {commands / replay_time:,.0f} commands/s, {len(replayer.keyframes)} keyframes "
+          f"every {interval} commands, {replayer.keyframe_bytes():,} bytes")
+    print(f"seek        mean {1000 * sum(seek_times) / SEEKS:.2f}ms  max {1000 * max(seek_times):.2f}ms  "
+          f"(from the start instead: mean {1000 * cold_time:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Save and load a 100-floor game with rogue.savefile.
+
+Loading only decodes the floor the player stands on; entering another
+floor decodes that one from the mapped file. For scale, the same game is
+also pickled whole and zlib-compressed.
+
+Usage: python benchmarks/bench_savefile.py [floors]
+"""
+import os
+import pickle
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rogue import engine, savefile
+
+FLOORS = 100
+REPEATS = 20
+
+
+def timed(function, repeats=REPEATS):
+    """Best time over a few runs, in milliseconds, and the last result."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+def main():
+    floors = int(sys.argv[1]) if len(sys.argv) > 1 else FLOORS
+    state = engine.new_game(1)
+    for depth in range(1, floors):
+        state.change_floor(depth)
+    state.change_floor(floors // 2)
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.sav')
+    save_ms, _ = timed(lambda: savefile.save(state, path))
+    load_ms, loaded = timed(lambda: savefile.load(path))
+    enter_ms, _ = timed(lambda: loaded.change_floor(floors - 1), repeats=1)
+    pickle_ms, blob = timed(lambda: zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL)))
+    unpickle_ms, _ = timed(lambda: pickle.loads(zlib.decompress(blob)))
+
+    print(f"{floors} floors of {state.width}x{state.height}")
+    print(f"save file   {os.path.getsize(path):>9,} bytes  save {save_ms:6.2f}ms  "
+          f"load {load_ms:6.2f}ms  enter a floor {enter_ms:5.2f}ms")
+    print(f"pickle+zlib {len(blob):>9,} bytes  save {pickle_ms:6.2f}ms  load {unpickle_ms:6.2f}ms")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Thousands of telnet sessions on one rogue.server process.
+
+The server runs in a child process on a Unix socket, as python -m rogue
+--serve-unix would. The benchmark first opens IDLE connections that only
+read their first screen, and takes the growth of the server's resident
+memory per connection. Then TYPISTS of them play random moves, one key at
+a time with a pause between (THINK_TIME on average), while FLOODERS send
+keys as fast as the socket takes them. Latency is from sending a key to
+the end of the screen it caused arriving back, measured on the typists,
+so a scheduler that let the flooders through first would show up here.
+The server's own report (key in to frame written) is printed at the end.
+
+Linux only: resident memory is read from /proc. On a machine with one
+core the benchmark's own clients compete with the server for it, which
+shows in the typists' latency but not in the server's.
+
+The figures depend on the machine and its load, so compare runs made on
+the same one. On the single core this was written on, the server's p99
+with the flooders was 20-45ms; elsewhere it has been over 200ms. The
+dropped count is mostly the flooders': each of their reads brings far
+more keys than the MAX_TYPEAHEAD a session may have waiting.
+
+Usage: python benchmarks/bench_server.py [idle [typists [seconds]]]
+"""
+import asyncio
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from rogue import engine
+from rogue.profiler import Histogram, format_duration
+from rogue.server import CLEAR_BELOW
+
+IDLE = 2000
+TYPISTS = 100
+FLOODERS = 5
+SECONDS = 10
+THINK_TIME = 0.05  # Mean pause between a typist's keys; 100 typists then send about 2000 a second
+MOVE_KEYS = b'hjkl.'
+FRAME_END = CLEAR_BELOW.encode()
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+
+def game_state_size(count=500):
+    """Bytes of one new default-size game, measured here rather than in the server."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    states = [engine.new_game(seed) for seed in range(count)]
+    size = (tracemalloc.get_traced_memory()[0] - before) / len(states)
+    tracemalloc.stop()
+    return size
+
+
+def resident(pid):
+    with open(f'/proc/{pid}/statm') as statm:
+        return int(statm.read().split()[1]) * PAGE_SIZE
+
+
+async def connect(path):
+    reader, writer = await asyncio.open_unix_connection(path, limit=1 << 20)
+    await reader.readuntil(FRAME_END)
+    return reader, writer
+
+
+async def type_keys(path, connection, until, latency, rng):
+    """Press a key, wait for its screen, think; start a new game when one ends."""
+    reader, writer = connection
+    while time.perf_counter() < until:
+        await asyncio.sleep(rng.expovariate(1 / THINK_TIME))
+        start = time.perf_counter_ns()
+        try:
+            writer.write(bytes([rng.choice(MOVE_KEYS)]))
+            await reader.readuntil(FRAME_END)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()  # Died, and the key after the last screen closed the session
+            reader, writer = await connect(path)
+            continue
+        latency.record(time.perf_counter_ns() - start)
+    writer.close()
+
+
+async def flood(path, connection, until, rng):
+    """Send bursts of keys without waiting for the screens, which are thrown away."""
+    reader, writer = connection
+    burst = bytes(rng.choice(MOVE_KEYS) for _ in range(4096))
+    while time.perf_counter() < until:
+        try:
+            while not reader.at_eof() and time.perf_counter() < until:
+                writer.write(burst)
+                await writer.drain()  # Waits whenever the server stops reading
+        except ConnectionError:
+            pass
+        writer.close()
+        reader, writer = await connect(path)
+    writer.close()
+
+
+async def bench(path, pid, idle, typists, seconds):
+    before = resident(pid)
+    start = time.perf_counter()
+    connections = []
+    for _ in range(idle):
+        connections.append(await connect(path))
+    opened = time.perf_counter() - start
+    per_session = (resident(pid) - before) / idle
+    print(f"idle       {idle} sessions opened in {opened:.2f}s, "
+          f"{per_session / 1024:,.1f} KiB of server memory each, of which the game state is "
+          f"{game_state_size() / 1024:,.1f} KiB")
+
+    until = time.perf_counter() + seconds
+    latency = Histogram()
+    rng = random.Random(1)
+    jobs = [type_keys(path, connection, until, latency, random.Random(rng.random()))
+            for connection in connections[:typists]]
+    jobs += [flood(path, connection, until, random.Random(rng.random()))
+             for connection in connections[typists:typists + FLOODERS]]
+    await asyncio.gather(*jobs)
+    p50, p99 = latency.percentiles(0.5, 0.99)
+    print(f"load       {typists} typists and {FLOODERS} flooders for {seconds}s: {latency.total:,} keys, "
+          f"latency p50 {format_duration(p50)}  p99 {format_duration(p99)}  max {format_duration(latency.max)}")
+    for reader, writer in connections[typists + FLOODERS:]:
+        writer.close()
+
+
+def main():
+    idle = int(sys.argv[1]) if len(sys.argv) > 1 else IDLE
+    typists = int(sys.argv[2]) if len(sys.argv) > 2 else TYPISTS
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else SECONDS
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'rogue.sock')
+        server = subprocess.Popen([sys.executable, '-m', 'rogue', '--serve-unix', path, '0'], cwd=ROOT,
+                                  stdout=subprocess.PIPE, text=True)
+        try:
+            server.stdout.readline()  # "Serving rogue on ..."
+            while not os.path.exists(path):
+                time.sleep(0.01)
+            asyncio.run(bench(path, server.pid, idle, typists, seconds))
+        finally:
+            server.send_signal(signal.SIGINT)
+            report = server.communicate()[0]
+    print(f"server     {report.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Many rogue.aio sessions on one event loop.
+
+Every session plays its own scripted game on its own map, with a short
+random pause between commands like a player typing, and renders a frame
+whenever something changed (at most every FRAME_INTERVAL). The same
+games are then played straight through engine.step() for comparison,
+which shows what the task machinery costs per turn. Latency is from
+submitting a command to the end of its turn, over all sessions.
+
+Usage: python benchmarks/bench_sessions.py [sessions [commands]]
+"""
+import asyncio
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rogue import engine
+from rogue.aio import Session
+from rogue.chunks import LargeFloor
+from rogue.profiler import Histogram, format_duration
+from rogue.viewport import Camera
+
+SESSIONS = 200
+COMMANDS = 60
+MAP_SIZE = 100  # Big enough that few players die early
+THINK_TIME = 0.05  # Mean pause between commands; 200 sessions then send about 4000 a second
+MOVES = [engine.LEFT, engine.RIGHT, engine.UP, engine.DOWN, engine.WAIT]
+
+
+def script(seed, count):
+    rng = random.Random(seed)
+    return [rng.choice(MOVES) for _ in range(count)]
+
+
+async def typed(commands, rng):
+    for command in commands:
+        await asyncio.sleep(rng.expovariate(1 / THINK_TIME))
+        yield command
+
+
+def render(session):
+    engine.frame(session.state, session.camera)
+    session.events.clear()
+
+
+def new_session(seed, commands):
+    session = Session(engine.new_game(seed, MAP_SIZE, MAP_SIZE, LargeFloor), render,
+                      typed(script(seed, commands), random.Random(seed)))
+    session.camera = Camera(79, 22)
+    return session
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else SESSIONS
+    commands = int(sys.argv[2]) if len(sys.argv) > 2 else COMMANDS
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    states = [engine.new_game(seed, MAP_SIZE, MAP_SIZE, LargeFloor) for seed in range(count)]
+    per_state = (tracemalloc.get_traced_memory()[0] - before) / count
+    del states
+    gc.collect()  # Game states hold reference cycles
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [new_session(seed, commands) for seed in range(count)]
+    per_session = (tracemalloc.get_traced_memory()[0] - before) / count
+    tracemalloc.stop()
+
+    async def play_all():
+        await asyncio.gather(*(session.run() for session in sessions))
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    asyncio.run(play_all())
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    turns = sum(session.state.turn for session in sessions)
+    latency = Histogram()
+    for session in sessions:
+        for index in range(session.latency.low, session.latency.high + 1):
+            latency.counts[index] += session.latency.counts[index]
+        latency.low = min(latency.low, session.latency.low)
+        latency.high = max(latency.high, session.latency.high)
+        latency.total += session.latency.total
+        latency.max = max(latency.max, session.latency.max)
+
+    start = time.perf_counter()
+    for seed in range(count):
+        state = engine.new_game(seed, MAP_SIZE, MAP_SIZE, LargeFloor)
+        for command in script(seed, commands):
+            engine.step(state, command)
+        assert engine.frame(state) == engine.frame(sessions[seed].state), f"session {seed} played differently"
+    direct = time.perf_counter() - start
+
+    p50, p99 = latency.percentiles(0.5, 0.99)
+    print(f"{count} sessions x {commands} commands on {MAP_SIZE}x{MAP_SIZE} maps, one event loop")
+    print(f"sessions   {turns:,} turns in {wall:.2f}s, CPU {cpu:.2f}s ({turns / cpu:,.0f} turns per CPU second), "
+          f"{sum(session.frames for session in sessions):,} frames")
+    print(f"latency    p50 {format_duration(p50)}  p99 {format_duration(p99)}  max {format_duration(latency.max)}")
+    print(f"memory     {per_session / 1024:,.1f} KiB per session, of which the game state is {per_state / 1024:,.1f} KiB")
+    print(f"direct     engine.step() plays the same games in {direct:.2f}s (setup and checks included)")
+
+
+if __name__ == "__main__":
+    main()
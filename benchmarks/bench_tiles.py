@@ -0,0 +1,44 @@
+"""Compare engine.Floor with the NumPy ArrayFloor on growing map sizes.
+
+Reports generation time, full-frame render time and the memory held by
+the tile grid itself.
+
+Usage: python benchmarks/bench_tiles.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rogue.engine import Floor
+from rogue.tiles import ArrayFloor
+
+SIZES = [(40, 20), (400, 200), (2000, 1000)]
+
+
+def grid_bytes(floor):
+    if isinstance(floor, ArrayFloor):
+        return floor.grid.nbytes
+    # One list per row plus a pointer per cell (the glyph strings are shared)
+    return sum(sys.getsizeof(row) for row in floor.grid) + sys.getsizeof(floor.grid)
+
+
+def main():
+    print(f"{'size':>10} {'engine':>10} {'generate':>10} {'render':>10} {'grid bytes':>12}")
+    for width, height in SIZES:
+        for floor_class in (Floor, ArrayFloor):
+            start = time.perf_counter()
+            floor = floor_class(1, random.Random(1), width, height)
+            generated = time.perf_counter() - start
+            start = time.perf_counter()
+            floor.rows()
+            rendered = time.perf_counter() - start
+            size = f"{width}x{height}"
+            print(f"{size:>10} {floor_class.__name__:>10} {generated * 1000:>8.1f}ms "
+                  f"{rendered * 1000:>8.1f}ms {grid_bytes(floor):>12,}")
+
+
+if __name__ == "__main__":
+    main()
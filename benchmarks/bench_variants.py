@@ -0,0 +1,447 @@
+"""Time every version of the game side by side and write the results as JSON.
+
+Each script is imported by path (their curses main() only runs when the
+script is run directly) and driven through its own classes: floor
+generation, drawing a full frame to a fake screen, one monster update,
+one fight and one item pickup. Every operation is timed at each version's
+own map size and at larger ones, with extra monsters and items added.
+
+Versions differ in what they have. 2:3 has no items and its monsters
+never move, so its update is the per-turn stairs scan. Deliverables 5 and
+6 fight inside the monster update, and 7 and 8 never move monsters.
+Anything a version lacks is left out of the results rather than faked.
+A version that fails or hangs on some map gets an error entry instead.
+
+Passing an earlier results file as the baseline prints the ratio for
+every timing the two files share, with slowdowns past REGRESSION_RATIO
+flagged.
+
+The results go to bench_variants.json beside this script unless another
+output file is given.
+
+Usage: python benchmarks/bench_variants.py [output.json [baseline.json]]
+"""
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import random
+import re
+import signal
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from rogue.bsp import split
+
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_variants.json')
+SEED = 1
+SIZES = [None, (80, 40), (200, 100)]  # None is the version's own map size
+EXTRA_ENTITIES = [0, 100]  # Monsters added, and as many items
+OPERATIONS = [('generate', None), ('render', None), ('update', None),
+              ('combat', 'before_combat'), ('pickup', 'before_pickup')]
+BUDGET = 0.1  # Seconds spent repeating each timing
+TIME_LIMIT = 2  # Seconds before giving up on an operation that hangs, e.g. retrying room placement forever
+MIN_RUNS = 3
+MAX_RUNS = 1000
+REGRESSION_RATIO = 1.25
+
+
+class FakeScreen:
+    """Stands in for the terminal and counts what is written to it.
+
+    It has the curses window calls the games make, draw() for
+    Deliverable_8's renderer and write() for the print()-based 2:3.
+    """
+
+    def __init__(self):
+        self.characters = 0
+
+    def addstr(self, y, x, text):
+        self.characters += len(text)
+
+    def write(self, text):
+        self.characters += len(text)
+
+    def draw(self, rows):
+        for y, row in enumerate(rows):
+            self.addstr(y, 0, row)
+
+    def clear(self):
+        pass
+
+    erase = refresh = flush = clear
+
+
+class GaveUp(Exception):
+    """Raised when an operation runs past TIME_LIMIT."""
+
+
+@contextlib.contextmanager
+def time_limit(seconds):
+    """Raise GaveUp in the block if it runs longer than seconds (Unix only)."""
+    def expire(signum, frame):
+        raise GaveUp(f"gave up after {seconds}s")
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def load(script):
+    """Import a game script by path without starting curses."""
+    name = 'variant_' + re.sub(r'\W', '_', script)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, script))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Variant:
+    """One version of the game at one map size, driven through its own classes."""
+
+    script = None
+    spawn_tiles = None  # Tiles the version itself places monsters and items on
+    update = combat = pickup = None  # Operations a version doesn't have
+
+    def __init__(self, game, width, height):
+        self.game = game
+        game.DUNGEON_WIDTH = width  # Every version reads its map size from these globals
+        game.DUNGEON_HEIGHT = height
+        random.seed(SEED)
+        self.rng = random.Random(SEED)
+        self.opponent = None
+        self.build()
+
+    def open_cell(self, tiles=None):
+        tiles = tiles or self.spawn_tiles
+        return self.rng.choice([(x, y) for y, row in enumerate(self.grid)
+                                for x, tile in enumerate(row) if tile in tiles])
+
+    def populate(self, count):
+        for _ in range(count):
+            self.add_monster(*self.open_cell())
+            if self.pickup is not None:
+                self.add_item(*self.open_cell())
+
+    def before_combat(self):
+        """Put a fresh monster on the player's cell, removing the last one."""
+        self.player.health = self.game.PLAYER_HEALTH
+        if self.opponent in self.monsters:
+            self.monsters.remove(self.opponent)
+        self.opponent = self.add_monster(self.player.x, self.player.y)
+
+    def before_pickup(self):
+        self.player.inventory.clear()
+        self.add_item(self.player.x, self.player.y)
+
+
+class Deliverables23(Variant):
+    script = "Rogue python deliverables 2:3.py"
+
+    def build(self):
+        game = self.game
+        game.input = lambda prompt: 'y'  # Answer the "attack the monster?" prompt
+        self.world = game.Game()
+        self.spawn_tiles = (game.EMPTY,)
+        self.player = self.world.player
+        self.player.x, self.player.y = self.open_cell()
+
+    @property
+    def grid(self):
+        return self.world.dungeon.grid
+
+    @property
+    def monsters(self):
+        return self.world.monsters
+
+    def add_monster(self, x, y):
+        monster = self.game.Monster(x, y)
+        self.world.monsters.append(monster)
+        return monster
+
+    def generate(self):
+        self.game.Dungeon()
+
+    def render(self, screen):
+        self.world.dungeon.print_dungeon(self.player.x, self.player.y, self.world.monsters)
+
+    def update(self):
+        self.world.check_for_stairs()
+
+    def combat(self):
+        self.world.handle_combat()
+
+
+class Deliverable4(Variant):
+    script = "Rogue python deliverable 4.py"
+
+    def build(self):
+        game = self.game
+        self.dungeon = game.Dungeon(seed=SEED)
+        self.floor = self.dungeon.floors[0]
+        self.grid = self.floor.grid
+        self.monsters = self.floor.monsters
+        self.spawn_tiles = (game.EMPTY,)
+        self.player = game.Player()
+        self.player.x, self.player.y = self.floor.get_spawn_point()
+
+    def add_monster(self, x, y):
+        monster = self.game.Monster(x, y)
+        self.floor.monsters.append(monster)
+        return monster
+
+    def add_item(self, x, y):
+        game = self.game
+        self.floor.items.append(game.Item(x, y, game.POTION_HEAL, "Healing Potion", game.heal_player))
+
+    def generate(self):
+        self.dungeon.create_floor(0, random.Random(SEED))
+
+    def render(self, screen):
+        self.dungeon.print_dungeon(self.player, screen)
+
+    def update(self):
+        self.dungeon.update(self.player)
+
+    def before_combat(self):
+        super().before_combat()
+        self.dungeon.combat = None
+
+    def combat(self):
+        fight = self.dungeon.handle_combat(self.player, self.opponent)
+        while not fight.is_over():
+            fight.step()
+        self.dungeon.end_combat()
+
+    def pickup(self):
+        # What the main loop does after every move
+        player, floor = self.player, self.floor
+        if (player.x, player.y) in [(item.x, item.y) for item in floor.items]:
+            item = next(i for i in floor.items if (i.x, i.y) == (player.x, player.y))
+            player.pick_up_item(item)
+            floor.items.remove(item)
+
+
+class Deliverable5(Variant):
+    script = "Rogue python deliverable 5.py"
+
+    def build(self):
+        game = self.game
+        self.floor = self.new_floor()
+        self.grid = self.floor.grid
+        self.monsters = self.floor.monsters
+        self.spawn_tiles = (game.EMPTY,)
+        self.player = game.Player()
+        self.player.x, self.player.y = self.open_cell()
+
+    def new_floor(self):
+        return self.game.Floor(0, random.Random(SEED))
+
+    def add_monster(self, x, y):
+        return self.floor.add_monster(self.rng.choice(self.game.MONSTER_KINDS), x, y)
+
+    def add_item(self, x, y):
+        self.floor.add_item(self.rng.choice(self.game.ITEM_TYPES), x, y)
+
+    def generate(self):
+        self.new_floor()
+
+    def render(self, screen):
+        self.floor.print_dungeon(self.player, screen)
+
+    def update(self):
+        self.floor.update(self.player)
+
+    def pickup(self):
+        self.floor.pick_up_items(self.player)
+
+
+class Deliverable6(Deliverable5):
+    script = "Rogue python deliverable 6.py"
+
+    def new_floor(self):
+        return self.game.Floor(0)
+
+    def add_monster(self, x, y):
+        monster = self.game.Monster(self.rng.choice(list(self.game.MONSTER_TYPES)), x, y)
+        self.floor.monsters.append(monster)
+        return monster
+
+    def add_item(self, x, y):
+        self.floor.items.append(self.game.Item(self.rng.choice(self.game.ITEM_TYPES), x, y))
+
+    def pickup(self):
+        # What the main loop does after every move
+        player, floor = self.player, self.floor
+        for item in floor.items[:]:
+            if (player.x, player.y) == (item.x, item.y):
+                if player.pick_up_item(item):
+                    floor.items.remove(item)
+
+
+class Deliverable7(Variant):
+    script = "Deliverable 7.py"
+    spawn_tiles = ('#',)
+
+    def build(self):
+        self.dungeon = self.new_dungeon()
+        self.grid = self.dungeon.grid
+        self.monsters = self.dungeon.monsters
+        self.player = self.game.Player()
+        self.player.x, self.player.y = self.open_cell('.')
+
+    def new_dungeon(self):
+        """Lay out a dungeon by hand: Deliverable 7's own generator never finishes.
+
+        Its is_valid_room() rejects rooms over '#', which the grid starts
+        out full of, so Dungeon() retries forever (generate records that).
+        The rooms come from rogue.bsp instead; spawning is the game's own.
+        """
+        game = self.game
+        dungeon = game.Dungeon.__new__(game.Dungeon)
+        dungeon.grid = [['#' for _ in range(game.DUNGEON_WIDTH)] for _ in range(game.DUNGEON_HEIGHT)]
+        dungeon.rooms = []
+        dungeon.monsters = []
+        dungeon.items = []
+        rooms, links, _ = split(1, 1, game.DUNGEON_WIDTH - 2, game.DUNGEON_HEIGHT - 2, 4, random,
+                                game.ROOM_MIN_SIZE - 1, game.ROOM_MAX_SIZE)
+        for x, y, width, height in rooms:
+            room = game.Room(x, y, width, height)
+            dungeon.create_room(room)
+            dungeon.rooms.append(room)
+        for a, b in links:
+            dungeon.create_hallway(dungeon.rooms[a].center(), dungeon.rooms[b].center())
+        dungeon.spawn_monsters()
+        dungeon.spawn_items()
+        return dungeon
+
+    def add_monster(self, x, y):
+        monster = self.game.Monster(self.rng.choice(list(self.game.MONSTER_TYPES)), x, y)
+        self.dungeon.monsters.append(monster)
+        return monster
+
+    def add_item(self, x, y):
+        self.item = self.game.Item(self.rng.choice(self.game.ITEM_TYPES), x, y)
+        self.dungeon.items.append(self.item)
+
+    def generate(self):
+        self.game.Dungeon()
+
+    def render(self, screen):
+        self.dungeon.render(screen, self.player)
+
+    def combat(self):
+        self.dungeon.handle_combat(self.player)
+
+    def pickup(self):
+        self.player.pick_up_item(self.item)
+
+
+class Deliverable8(Deliverable7):
+    script = "Deliverable_8.py"
+
+    def new_dungeon(self):
+        return self.game.Dungeon()
+
+
+VARIANTS = [Deliverables23, Deliverable4, Deliverable5, Deliverable6, Deliverable7, Deliverable8]
+
+
+def measure(operation, setup=None):
+    """Repeat operation for about BUDGET seconds; return run count and best/mean microseconds."""
+    times = []
+    deadline = time.perf_counter() + BUDGET
+    while len(times) < MIN_RUNS or (len(times) < MAX_RUNS and time.perf_counter() < deadline):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        operation()
+        times.append(time.perf_counter() - start)
+    return {'runs': len(times), 'best_us': round(min(times) * 1e6, 2),
+            'mean_us': round(sum(times) / len(times) * 1e6, 2)}
+
+
+def run_variant(variant_class):
+    game = load(variant_class.script)
+    own_size = (game.DUNGEON_WIDTH, game.DUNGEON_HEIGHT)
+    results = []
+    for size in SIZES:
+        width, height = size or own_size
+        for extra in EXTRA_ENTITIES:
+            screen = FakeScreen()
+            case = {'variant': variant_class.script, 'width': width, 'height': height, 'extra_entities': extra}
+            with contextlib.redirect_stdout(screen):  # The older versions print() their messages
+                try:
+                    with time_limit(TIME_LIMIT):
+                        variant = variant_class(game, width, height)
+                        variant.populate(extra)
+                except Exception as error:  # A version that can't build this map at all
+                    results.append(dict(case, error=repr(error)))
+                    continue
+                for name, setup in OPERATIONS:
+                    operation = getattr(variant, name)
+                    if operation is None:
+                        continue
+                    if name == 'render':
+                        operation = lambda render=operation: render(screen)
+                    screen.characters = 0
+                    try:
+                        with time_limit(TIME_LIMIT):
+                            timing = measure(operation, setup and getattr(variant, setup))
+                    except Exception as error:
+                        results.append(dict(case, operation=name, error=repr(error)))
+                        continue
+                    if name == 'render':
+                        timing['characters'] = screen.characters // timing['runs']
+                    results.append(dict(case, operation=name, **timing))
+    return results
+
+
+def key(result):
+    return (result['variant'], result['width'], result['height'], result['extra_entities'], result.get('operation'))
+
+
+def compare(results, baseline):
+    """Print each timing against the baseline run."""
+    earlier = {key(result): result for result in baseline['results'] if 'best_us' in result}
+    for result in results:
+        before = earlier.get(key(result))
+        if before is None or 'best_us' not in result:
+            continue
+        ratio = result['best_us'] / before['best_us']
+        flag = '  REGRESSION' if ratio > REGRESSION_RATIO else ''
+        print(f"{result['variant']:34} {result['width']:>4}x{result['height']:<4} +{result['extra_entities']:<4} "
+              f"{result['operation']:9} {before['best_us']:>11,.1f}us -> {result['best_us']:>11,.1f}us "
+              f"x{ratio:.2f}{flag}")
+
+
+def main():
+    output = sys.argv[1] if len(sys.argv) > 1 else OUTPUT
+    results = []
+    for variant_class in VARIANTS:
+        results.extend(run_variant(variant_class))
+    report = {'python': platform.python_version(), 'machine': platform.machine(), 'seed': SEED,
+              'budget_seconds': BUDGET, 'results': results}
+    with open(output, 'w') as out:
+        json.dump(report, out, indent=1)
+
+    for result in results:
+        timing = (f"{result['best_us']:>11,.1f}us best {result['mean_us']:>11,.1f}us mean"
+                  if 'best_us' in result else result['error'])
+        print(f"{result['variant']:34} {result['width']:>4}x{result['height']:<4} +{result['extra_entities']:<4} "
+              f"{result.get('operation', ''):9} {timing}")
+    print(f"Wrote {len(results)} results to {output}")
+    if len(sys.argv) > 2:
+        with open(sys.argv[2]) as baseline:
+            compare(results, json.load(baseline))
+
+
+if __name__ == "__main__":
+    main()
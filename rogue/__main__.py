@@ -0,0 +1,63 @@
+"""Play the headless engine in a terminal.
+
+    python -m rogue [seed [width height]]
+    python -m rogue --load [path]
+    python -m rogue --record path [seed [width height]]
+    python -m rogue --replay path [position]
+    python -m rogue --serve [port [seed [width height]]]
+    python -m rogue --serve-unix path [seed [width height]]
+    python -m rogue --balance [runs] [NAME=value ...]
+
+Maps bigger than the default 40x20 switch to large-map mode (chunked
+storage, one room per 400 cells), e.g. python -m rogue 7 2000 2000.
+Press S in the game to save to rogue.sav. Press p to show how long each
+phase of a turn takes (p50/p99), and C or M to start a cProfile or
+tracemalloc capture; press the same key again to write it to a file.
+
+--record writes every command of the game to a journal when it ends;
+--replay runs a journal without a terminal and prints the screen after
+`position` commands (the end of the game by default).
+
+--serve hosts a game for every telnet connection on a local port (4000
+by default) or Unix socket; see rogue.server.
+
+--balance plays scripted games with Deliverable_8.py's stats on every
+core and prints how deep they got and what killed them, with changes
+such as PLAYER_ATTACK=12 or Dragon.attack=25; see rogue.balance.
+"""
+import sys
+
+from rogue.curses_ui import SAVE_PATH, run
+
+if sys.argv[1:2] == ['--load']:
+    run(load_path=sys.argv[2] if len(sys.argv) > 2 else SAVE_PATH)
+elif sys.argv[1:2] == ['--record']:
+    run(*[int(arg) for arg in sys.argv[3:6]], record_path=sys.argv[2])
+elif sys.argv[1:2] == ['--replay']:
+    from rogue import engine
+    from rogue.replay import Journal, Replayer
+    from rogue.viewport import Camera
+    replayer = Replayer(Journal.load(sys.argv[2]))
+    position = int(sys.argv[3]) if len(sys.argv) > 3 else len(replayer)
+    state = replayer.state_at(position)
+    camera = Camera(min(state.width, 79), min(state.height, 22))  # One screenful around the player
+    print('\n'.join(engine.frame(state, camera)))
+    print(f"Position {position} of {len(replayer)}, turn {state.turn}, seed {state.seed}"
+          + (", game over" if state.over else ""))
+elif sys.argv[1:2] == ['--serve']:
+    from rogue import server
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else server.PORT
+    server.run(port, None, *[int(arg) for arg in sys.argv[3:6]])
+elif sys.argv[1:2] == ['--serve-unix']:
+    from rogue import server
+    server.run(server.PORT, sys.argv[2], *[int(arg) for arg in sys.argv[3:6]])
+elif sys.argv[1:2] == ['--balance']:
+    from rogue import balance
+    try:
+        runs = int(sys.argv[2]) if len(sys.argv) > 2 and '=' not in sys.argv[2] else balance.RUNS
+        balance.run(runs, [arg for arg in sys.argv[2:] if '=' in arg])
+    except ValueError as error:
+        sys.exit(f"{error}\nUsage: python -m rogue --balance [runs] [NAME=value ...], NAME one of:\n  "
+                 + ' '.join(balance.change_names(balance.script_balance())))
+else:
+    run(*[int(arg) for arg in sys.argv[1:4]])
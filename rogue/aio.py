@@ -0,0 +1,249 @@
+"""Run games as asyncio tasks, many to one event loop.
+
+A Session plays one engine game with a task per job, which talk through
+a TurnClock instead of running one after another in a blocking loop:
+
+    input      feeds commands from an async iterator into the session
+    player     carries out each command (engine._player_turn)
+    monsters   moves the monsters once the player's part of a turn is done
+    render     draws the latest state when something changed, at most
+               once per frame_interval however many turns went by
+    autosave   writes a save file every autosave_turns turns, and on close
+
+A turn starts when the player's command has been carried out and ends
+when the monsters have moved. The order of play is exactly that of
+engine.step(), so a journal recorded from a Session replays the same.
+None of the tasks block, so a slow renderer or a save only delays its own
+task, and any number of sessions can share one loop without threads:
+
+    await asyncio.gather(*(session.run() for session in sessions))
+
+An async service that takes commands from somewhere else (a socket, say)
+calls submit(command) instead of passing commands in, and gets the
+turn's events back. Time from submit() to the end of the turn goes into
+the session's latency histogram.
+
+Profiler spans only wrap code between awaits. A span left open across an
+await could be entered again by another session's task.
+"""
+import asyncio
+import inspect
+import time
+
+from rogue import engine, savefile
+from rogue.profiler import Histogram, profiler
+
+AUTOSAVE_TURNS = 100  # Turns between autosaves
+FRAME_INTERVAL = 1 / 30  # Least time between two frames of one session
+
+
+class TurnClock:
+    """Counts turns, and lets tasks wait for a turn to start or end."""
+
+    def __init__(self, turn=0):
+        self.started = turn
+        self.finished = turn
+        self.stopped = False  # Set by stop() to wake everything waiting
+        self.condition = asyncio.Condition()
+
+    async def start(self):
+        """Start the next turn and return its number."""
+        async with self.condition:
+            self.started += 1
+            self.condition.notify_all()
+            return self.started
+
+    async def finish(self, turn):
+        async with self.condition:
+            self.finished = turn
+            self.condition.notify_all()
+
+    async def wait_started(self, turn):
+        """Wait until the turn has started; return False if the clock stopped first."""
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.started >= turn or self.stopped)
+        return self.started >= turn
+
+    async def wait_finished(self, turn):
+        """Wait until the turn has ended; return False if the clock stopped first."""
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.finished >= turn or self.stopped)
+        return self.finished >= turn
+
+    async def stop(self):
+        async with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+
+class Session:
+    """One game played by cooperating tasks on the running event loop.
+
+    render(session) may be a plain function or a coroutine function; it
+    finds the events since the last frame in session.events and clears
+    them once shown. commands is an async iterable of engine commands,
+    or None for sessions driven through submit(). journal, if given,
+    records every command as rogue.replay does.
+    """
+
+    def __init__(self, state, render=None, commands=None, autosave_path=None, autosave_turns=AUTOSAVE_TURNS,
+                 frame_interval=FRAME_INTERVAL, journal=None):
+        self.state = state
+        self.render = render
+        self.commands = commands
+        self.autosave_path = autosave_path
+        self.autosave_turns = autosave_turns
+        self.frame_interval = frame_interval
+        self.journal = journal
+        self.clock = TurnClock(state.turn)
+        self.queue = asyncio.Queue()  # (command, future for its events, time submitted); None to stop
+        self.turn_events = []  # Events of the turn being played, shared by the player and monster tasks
+        self.events = []  # Events not yet shown by render
+        self.dirty = asyncio.Event()
+        self.dirty.set()  # Nothing has been drawn yet
+        self.closed = asyncio.Event()
+        self.latency = Histogram()  # Nanoseconds from submit() to the end of the turn
+        self.frames = 0
+        self.saves = 0
+
+    async def submit(self, command):
+        """Play a command and return its events once the turn is over ([] after the game ended)."""
+        if self.closed.is_set():
+            return []
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((command, future, time.perf_counter_ns()))
+        return await future
+
+    def close(self):
+        """Stop the session; run() returns after a last frame and save."""
+        if not self.closed.is_set():
+            self.closed.set()
+            self.queue.put_nowait(None)
+
+    async def run(self):
+        """Play until close() or the end of the game or of the commands."""
+        jobs = [self._player(), self._monsters()]
+        if self.render is not None:
+            jobs.append(self._render())
+        if self.autosave_path is not None:
+            jobs.append(self._autosave())
+        tasks = [asyncio.ensure_future(job) for job in jobs]
+        feeder = None
+        if self.commands is not None:
+            feeder = asyncio.ensure_future(self._input())
+            tasks.append(feeder)
+        for task in tasks:
+            task.add_done_callback(self._task_done)
+        try:
+            await self.closed.wait()
+        finally:
+            self.close()
+            if feeder is not None:
+                feeder.cancel()  # It may be waiting on input that never comes
+            await self.clock.stop()
+            self.dirty.set()  # Wake the renderer for the last frame
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            failure = next((result for result in results if isinstance(result, Exception)), None)
+            self._drain(failure)
+        if failure is not None:
+            raise failure
+        if self.autosave_path is not None:
+            self.save()
+
+    def _drain(self, failure):
+        """Answer every command still queued: with the failure that stopped the session, or with []."""
+        while not self.queue.empty():
+            entry = self.queue.get_nowait()
+            if entry is not None and not entry[1].done():
+                if failure is None:
+                    entry[1].set_result([])
+                else:
+                    entry[1].set_exception(failure)
+
+    def _task_done(self, task):
+        """Close the session when a task fails, so run() returns and reports it."""
+        if not task.cancelled() and task.exception() is not None:
+            self.close()
+
+    async def _input(self):
+        async for command in self.commands:
+            if self.closed.is_set():
+                break
+            await self.submit(command)
+        self.close()
+
+    async def _player(self):
+        state = self.state
+        while True:
+            entry = await self.queue.get()
+            if entry is None:
+                break
+            command, future, submitted = entry
+            if self.closed.is_set():
+                future.set_result([])  # Too late to start another turn
+                continue
+            events = self.turn_events = []
+            try:
+                if self.journal is not None:
+                    self.journal.record(command)
+                if state.over:
+                    valid = False
+                elif profiler.enabled:
+                    with profiler.span('player'):
+                        valid = engine._player_turn(state, command, events)
+                else:
+                    valid = engine._player_turn(state, command, events)
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)  # The caller hears of it too, not only run()
+                raise
+            if valid and not state.over:
+                turn = await self.clock.start()
+                await self.clock.wait_finished(turn)  # The monster task ends every turn that started
+            if valid:
+                state.turn += 1
+            self.latency.record(time.perf_counter_ns() - submitted)
+            self.events.extend(events)
+            self.dirty.set()
+            if not future.done():
+                future.set_result(events)
+            if state.over:
+                self.close()
+
+    async def _monsters(self):
+        clock = self.clock
+        while await clock.wait_started(clock.finished + 1):
+            turn = clock.started
+            if profiler.enabled:
+                with profiler.span('monsters'):
+                    engine._move_monsters(self.state, self.turn_events)
+            else:
+                engine._move_monsters(self.state, self.turn_events)
+            await clock.finish(turn)
+
+    async def _render(self):
+        while True:
+            await self.dirty.wait()
+            self.dirty.clear()
+            if inspect.iscoroutinefunction(self.render):
+                await self.render(self)
+            elif profiler.enabled:
+                with profiler.span('render'):
+                    self.render(self)
+            else:
+                self.render(self)
+            self.frames += 1
+            if self.closed.is_set():
+                break
+            if self.frame_interval:
+                await asyncio.sleep(self.frame_interval)
+
+    async def _autosave(self):
+        clock = self.clock
+        while await clock.wait_finished(clock.finished + self.autosave_turns):
+            self.save()
+
+    def save(self):
+        """Write the game to autosave_path now."""
+        savefile.save(self.state, self.autosave_path)
+        self.saves += 1
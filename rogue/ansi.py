@@ -0,0 +1,118 @@
+"""Frames for plain terminals, sent as the changes since the last one in one write.
+
+For games that print to stdout rather than use curses. The game fills
+the rows FrameWriter.frame() hands it (bytearrays allocated once and
+reused for every frame) and calls flush(), which compares them with
+what the terminal already shows and sends only the changed spans of the
+changed rows, each behind an ANSI cursor move, in a single write. Over
+a pipe or an SSH session, where every write is a syscall or a packet,
+that is one write per frame however much moved.
+
+The first frame clears the screen and keeps the rows below the map as
+a scrolling region, so whatever the game print()s or input()s there
+scrolls without moving the map, and later frames save the cursor, draw
+their changes and put it back. close() gives the whole screen back.
+"""
+import shutil
+import sys
+
+ESC = b'\x1b['
+SAVE_CURSOR = b'\x1b7'
+RESTORE_CURSOR = b'\x1b8'
+SPAN_GAP = 6  # Unchanged bytes between two changes worth skipping with a cursor move rather than resending
+
+
+class FrameWriter:
+    """Keep the frame on screen and send each new one as the difference."""
+
+    def __init__(self, stream=None, gap=SPAN_GAP):
+        self.stream = stream  # None means whatever sys.stdout is when a frame is sent
+        self.gap = gap
+        self.width = 0
+        self.height = 0
+        self.rows = []  # The frame being drawn, a bytearray per row
+        self.shown = []  # What the terminal shows; empty until the first frame or after invalidate()
+        self.out = bytearray()  # Escape codes and changes of the frame being sent, reused
+        self.frames = 0
+        self.written = 0  # Bytes sent, over all frames
+
+    def frame(self, width, height):
+        """Return the rows to draw the next frame into, blank the first time or after a resize."""
+        if (width, height) != (self.width, self.height):
+            self.width = width
+            self.height = height
+            self.rows = [bytearray(b' ' * width) for _ in range(height)]
+            self.shown = []
+        return self.rows
+
+    def invalidate(self):
+        """Redraw everything next time, e.g. after something else drew over the map."""
+        self.shown = []
+
+    def flush(self):
+        """Send what changed since the last frame."""
+        out = self.out
+        del out[:]
+        if not self.shown:
+            self._full(out)
+        else:
+            self._changes(out)
+        self.frames += 1
+        if out:
+            self._write(bytes(out))
+
+    def _full(self, out):
+        lines = shutil.get_terminal_size().lines
+        out += ESC + b'2J'
+        if lines > self.height + 1:
+            out += ESC + b'%d;%dr' % (self.height + 1, lines)  # Scroll only the rows under the map
+        for y, row in enumerate(self.rows):
+            out += ESC + b'%d;1H' % (y + 1)
+            out += row
+        out += ESC + b'%d;1H' % (self.height + 1)
+        self.shown = [bytearray(row) for row in self.rows]
+
+    def _changes(self, out):
+        gap = self.gap
+        width = self.width
+        for y, (row, old) in enumerate(zip(self.rows, self.shown)):
+            if row == old:
+                continue
+            x = 0
+            while x < width:
+                if row[x] == old[x]:
+                    x += 1
+                    continue
+                start = x
+                end = x + 1
+                x += 1
+                # Grow the span over short unchanged stretches; stop at a long one
+                while x < width and x - end < gap:
+                    if row[x] != old[x]:
+                        end = x + 1
+                    x += 1
+                if not out:
+                    out += SAVE_CURSOR
+                out += ESC + b'%d;%dH' % (y + 1, start + 1)
+                out += row[start:end]
+                x = end
+            old[:] = row
+        if out:
+            out += RESTORE_CURSOR
+
+    def _write(self, data):
+        stream = self.stream or sys.stdout
+        stream.flush()  # Whatever the game print()ed goes first
+        binary = getattr(stream, 'buffer', None)
+        if binary is not None:
+            binary.write(data)
+            binary.flush()
+        else:
+            stream.write(data.decode('latin-1'))
+            stream.flush()
+        self.written += len(data)
+
+    def close(self):
+        """Give the terminal back its whole screen, leaving the cursor where it was."""
+        if self.frames:
+            self._write(SAVE_CURSOR + ESC + b'r' + RESTORE_CURSOR)
@@ -0,0 +1,310 @@
+"""Monte Carlo balance runs: thousands of scripted headless games, one report.
+
+The stats Deliverable_8.py is tuned with (MONSTER_TYPES, the player's
+starting stats, LEVEL_UP_EXP and what each potion and scroll adds) are
+read from the script itself and played under the headless engine's
+rules, which are not that script's. In Deliverable_8.py a monster on the
+player's cell hits them every turn, every such hit earns the player 20
+experience and the player never hurts a monster; there are no stairs
+and no hit roll. The engine has bump attacks that land with HIT_CHANCE,
+EXP_PER_KILL per monster killed, monsters that chase the player and
+floors joined by stairs. The report says how those stats fare under
+the engine's rules, the game rogue.curses_ui and rogue.server run.
+
+A scripted Bot plays game after game on every CPU core: it fights
+whatever stands next to it, drinks a healing item when it is hurt, uses
+everything else as soon as it has it, goes for items a few steps away
+and otherwise heads for the stairs down.
+Reaching WIN_DEPTH counts as a win; a fight neither side can ever win
+(see rogue.combat) or a game past MAX_TURNS ends it as STUCK.
+
+Every game comes back as a small outcome tuple as soon as its chunk is
+done, and Report folds it into counts rather than keeping it, so the
+report is the same size for a hundred games or a million. Game n always
+plays seed n, so two runs with different stats face the same dungeons
+and the difference in their curves is the stats, not the luck.
+
+    python -m rogue --balance [runs] [NAME=value ...]
+
+Changes are applied on top of the script's stats: PLAYER_ATTACK=12 sets
+a player stat, Dragon.attack=25 one stat of one monster and
+scroll_heal=40 how much an item adds.
+"""
+import importlib.util
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from rogue import engine
+from rogue.combat import fight_odds
+from rogue.flowfield import FlowField
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Deliverable_8.py')
+RUNS = 10000
+CHUNK = 50  # Games per task handed to a worker
+WIN_DEPTH = 10  # Reaching this floor wins the game
+MAX_TURNS = 5000  # Games still going after this many turns end as STUCK, as do fights neither side can win
+HEAL_BELOW = 0.4  # Share of max health under which the bot drinks
+ITEM_DETOUR = 6  # Steps the bot will go out of its way for an item
+
+# How a game ended, besides the name of the monster that killed the player
+WON = 'won'
+STUCK = 'stuck'
+
+# Engine settings a script may set, copied over when it does
+BALANCE_NAMES = ('PLAYER_HEALTH', 'PLAYER_ATTACK', 'PLAYER_DEFENSE', 'MAX_INVENTORY', 'LEVEL_UP_EXP',
+                 'EXP_PER_KILL', 'HIT_CHANCE', 'ITEM_TYPES', 'POTION_TYPES', 'SCROLL_TYPES')
+
+STEP_DIRECTIONS = {step: direction for direction, step in engine.DIRECTIONS.items()}
+
+
+def script_balance(path=SCRIPT):
+    """Read the stats a game script is tuned with, in the engine's terms."""
+    spec = importlib.util.spec_from_file_location('balance_script', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # The game's main() only runs when the script is run directly
+    balance = {name: getattr(module, name) for name in BALANCE_NAMES if hasattr(module, name)}
+    balance['MONSTER_TYPES'] = {name: dict(stats) for name, stats in module.MONSTER_TYPES.items()}
+    table = getattr(module, 'ITEM_TABLE', None)
+    if table is not None:
+        balance['ITEM_EFFECTS'] = {name: (kind['effect'][0], kind['effect'][1], kind['message'])
+                                   for name, kind in table.items() if 'effect' in kind}
+    return balance
+
+
+def with_changes(balance, changes):
+    """Return a copy of balance with NAME=value changes made to it."""
+    balance = dict(balance)
+    balance['MONSTER_TYPES'] = {name: dict(stats) for name, stats in
+                                balance.get('MONSTER_TYPES', engine.MONSTER_TYPES).items()}
+    balance['ITEM_EFFECTS'] = dict(balance.get('ITEM_EFFECTS', engine.ITEM_EFFECTS))
+    for change in changes:
+        name, _, text = change.partition('=')
+        try:
+            value = float(text) if '.' in text else int(text)
+        except ValueError:
+            raise ValueError(f"{name} needs a number, not {text!r}") from None
+        monster, _, stat = name.partition('.')
+        if stat:
+            if monster not in balance['MONSTER_TYPES'] or stat not in balance['MONSTER_TYPES'][monster]:
+                raise ValueError(f"no monster stat {name!r}")
+            balance['MONSTER_TYPES'][monster][stat] = value
+        elif name in balance['ITEM_EFFECTS']:
+            effect_stat, _, message = balance['ITEM_EFFECTS'][name]
+            balance['ITEM_EFFECTS'][name] = (effect_stat, value, message)
+        elif name in BALANCE_NAMES and isinstance(balance.get(name, getattr(engine, name)), (int, float)):
+            balance[name] = value
+        else:
+            raise ValueError(f"unknown stat {name!r}")
+    return balance
+
+
+def change_names(balance):
+    """Return every NAME a NAME=value change can be made to."""
+    names = [name for name in BALANCE_NAMES if isinstance(balance.get(name, getattr(engine, name)), (int, float))]
+    names += [f"{monster}.{stat}" for monster, stats in balance.get('MONSTER_TYPES', engine.MONSTER_TYPES).items()
+              for stat in stats]
+    names += list(balance.get('ITEM_EFFECTS', engine.ITEM_EFFECTS))
+    return names
+
+
+def apply(balance):
+    """Set the engine's stats for the games played in this process."""
+    for name, value in balance.items():
+        setattr(engine, name, value)
+
+
+def heals(item):
+    effect = engine.ITEM_EFFECTS.get(item.name)
+    return effect is not None and effect[0] == 'health'
+
+
+class Bot:
+    """Choose the next command of a game; it never runs from a fight."""
+
+    def __init__(self):
+        self.floor = None
+        self.revision = None
+        self.opponent = None  # The monster attacked this turn
+        self.route = None  # Toward the stairs down, over the whole floor
+        self.detour = None  # The same, over the stairs up too
+        self.nearby = FlowField(ITEM_DETOUR)  # Toward the player, to find items close by
+
+    def command(self, state):
+        player = state.player
+        floor = state.floor
+        if floor is not self.floor or floor.revision != self.revision:
+            self.enter(floor)
+        inventory = player.inventory
+        if player.health <= player.max_health * HEAL_BELOW:
+            for index, item in enumerate(inventory):
+                if heals(item):
+                    return (engine.USE, index)
+        for index, item in enumerate(inventory):
+            if not heals(item):
+                return (engine.USE, index)  # Boosts at once, and the rest to keep room for healing
+
+        x = player.x
+        y = player.y
+        for (dx, dy), direction in STEP_DIRECTIONS.items():
+            monster = floor.occupancy.first(x + dx, y + dy, engine.MONSTER)
+            if monster is not None:
+                self.opponent = monster
+                return direction
+        self.opponent = None
+
+        if len(inventory) < engine.MAX_INVENTORY:
+            close = [item for item in floor.items if abs(item.x - x) + abs(item.y - y) <= ITEM_DETOUR]
+            if close:
+                steps = self.nearby.toward(x, y, self.passable, floor.revision)
+                distance = self.nearby.distance
+                reachable = [item for item in close if (item.x, item.y) in steps]
+                if reachable:
+                    item = min(reachable, key=lambda item: distance[item.x, item.y])
+                    cell = (item.x, item.y)
+                    while steps[cell] != (x, y):  # Back along the path to the step next to the player
+                        cell = steps[cell]
+                    return STEP_DIRECTIONS[cell[0] - x, cell[1] - y]
+
+        target = self.route.toward(*floor.stairs_down, self.passable, floor.revision).get((x, y))
+        if target is None:
+            # Off the route: on the stairs up, walled off from the stairs down by them (going up and
+            # coming back down lands beside them), or back on the stairs down after that
+            target = self.detour.toward(*floor.stairs_down, self.walkable, floor.revision).get((x, y))
+            if target is None:
+                target = next(((x + dx, y + dy) for dx, dy in STEP_DIRECTIONS if self.walkable(x + dx, y + dy)),
+                              None)
+            if target is None:
+                return engine.WAIT
+        return STEP_DIRECTIONS[target[0] - x, target[1] - y]
+
+    def enter(self, floor):
+        """Start routing on a new floor (or one whose tiles changed), keeping off the stairs back up."""
+        cells = {(x, y) for y in range(floor.height) for x in range(floor.width) if floor.is_walkable(x, y)}
+        away = cells - {floor.stairs_up}
+
+        # Looked up in sets made once rather than read from the floor for every cell searched
+        def walkable(x, y):
+            return (x, y) in cells
+
+        def passable(x, y):
+            return (x, y) in away
+
+        self.floor = floor
+        self.revision = floor.revision
+        self.walkable = walkable
+        self.passable = passable
+        self.route = FlowField(floor.width * floor.height)
+        self.detour = FlowField(floor.width * floor.height)
+
+
+def stalemate(player, monster):
+    """Whether neither side of a fight can ever finish the other."""
+    odds = fight_odds(player.health, player.attack_damage, player.defense,
+                      monster.health, monster.attack, monster.defense, engine.HIT_CHANCE, engine.HIT_CHANCE)
+    return odds.stalemate == 1.0
+
+
+def play(seed, width=engine.DUNGEON_WIDTH, height=engine.DUNGEON_HEIGHT):
+    """Play one game to the end; return (seed, depth, ending, turns, level, kills).
+
+    The ending is WON, STUCK or the type of monster that killed the player.
+    """
+    state = engine.new_game(seed, width, height)
+    bot = Bot()
+    ending = STUCK
+    kills = 0
+    while state.turn < MAX_TURNS:
+        for event in engine.step(state, bot.command(state)):
+            if event[0] == engine.KILLED:
+                kills += 1
+            elif event[0] == engine.DIED:
+                ending = event[1]
+        if state.over:
+            break
+        if state.depth >= WIN_DEPTH:
+            ending = WON
+            break
+        if bot.opponent is not None and bot.opponent.health > 0 and stalemate(state.player, bot.opponent):
+            break  # The bot would trade harmless blows until MAX_TURNS
+    return (seed, state.depth, ending, state.turn, state.player.level, kills)
+
+
+def play_chunk(seeds, width, height):
+    return [play(seed, width, height) for seed in seeds]
+
+
+class Report:
+    """Running totals over game outcomes."""
+
+    def __init__(self):
+        self.runs = 0
+        self.endings = Counter()
+        self.reached = Counter()  # Depth -> games that got at least that deep
+        self.ended_at = Counter()  # Depth -> games that ended there without winning
+        self.levels = Counter()
+        self.turns = Counter()  # Ending -> turns summed over those games
+        self.kills = 0
+
+    def add(self, outcome):
+        _, depth, ending, turns, level, kills = outcome
+        self.runs += 1
+        self.endings[ending] += 1
+        for reached in range(depth + 1):
+            self.reached[reached] += 1
+        if ending != WON:
+            self.ended_at[depth] += 1
+        self.levels[level] += 1
+        self.turns[ending] += turns
+        self.kills += kills
+
+    def lines(self):
+        runs = max(1, self.runs)
+        lines = [f"{self.runs} games: {100 * self.endings[WON] / runs:.1f}% won (depth {WIN_DEPTH}), "
+                 f"{100 * self.endings[STUCK] / runs:.1f}% stuck (an endless fight or {MAX_TURNS} turns), "
+                 f"{self.kills / runs:.1f} kills per game",
+                 '',
+                 f"{'depth':>5} {'reached':>8} {'ended':>8}"]
+        for depth in sorted(self.reached):
+            lines.append(f"{depth:>5} {100 * self.reached[depth] / runs:>7.1f}% {100 * self.ended_at[depth] / runs:>7.1f}%")
+        lines += ['', f"{'ending':10} {'games':>7} {'turns':>7}"]
+        for ending, count in self.endings.most_common():
+            lines.append(f"{ending:10} {100 * count / runs:>6.1f}% {self.turns[ending] / count:>7.0f}")
+        lines += ['', 'final level: ' + ', '.join(f"{level}: {100 * count / runs:.1f}%"
+                                                   for level, count in sorted(self.levels.items()))]
+        return lines
+
+
+def simulate(balance, runs=RUNS, width=engine.DUNGEON_WIDTH, height=engine.DUNGEON_HEIGHT, workers=None,
+             on_outcome=None):
+    """Play runs games (seeds 0 to runs - 1) over a process pool and return the Report.
+
+    on_outcome, if given, is called with every outcome as it comes in.
+    """
+    report = Report()
+    with ProcessPoolExecutor(workers, initializer=apply, initargs=(balance,)) as executor:
+        tasks = [executor.submit(play_chunk, range(start, min(start + CHUNK, runs)), width, height)
+                 for start in range(0, runs, CHUNK)]
+        for task in as_completed(tasks):
+            for outcome in task.result():
+                report.add(outcome)
+                if on_outcome is not None:
+                    on_outcome(outcome)
+    return report
+
+
+def run(runs=RUNS, changes=()):
+    """Simulate the script's stats with some changes and print the report.
+
+    Raises ValueError for a change that names no stat or gives no number.
+    """
+    balance = with_changes(script_balance(), changes)
+    print(f"Stats from {os.path.basename(SCRIPT)}" + (" with " + ' '.join(changes) if changes else ''))
+    print("Rules of the headless engine (rogue.engine), not of the script: bump attacks hit "
+          f"{100 * balance.get('HIT_CHANCE', engine.HIT_CHANCE):.0f}% of the time, chasing monsters, stairs")
+    start = time.perf_counter()
+    report = simulate(balance, runs)
+    seconds = time.perf_counter() - start
+    print('\n'.join(report.lines()))
+    print(f"\n{seconds:.1f}s on {os.cpu_count()} cores, {report.runs / seconds:.0f} games/s")
@@ -0,0 +1,125 @@
+"""Binary space partition floor generator with bounded running time.
+
+Random room placement retries until a room happens to land on free space,
+so its running time depends on luck and it can fail outright. Here the
+map is instead cut in two again and again, always cutting the biggest
+piece, until there is one piece per room. Each piece gets a room, and the
+two halves of every cut are joined by a corridor, so the floor is
+connected and has exactly the requested number of rooms.
+
+Every cut either succeeds or retires a piece that is too small to cut, so
+the work is bounded by the number of pieces (at most area / min_size**2)
+plus carving, which is linear in map area. When the rooms cannot fit at
+all, split() says so straight away with a ValueError.
+"""
+import heapq
+import time
+
+from rogue.engine import Floor, GenerationStats, Room, ROOM_MIN_SIZE, ROOM_MAX_SIZE, NUM_ROOMS
+from rogue.tiles import ArrayFloor
+
+
+def split(x, y, width, height, room_count, rng, min_size=ROOM_MIN_SIZE, max_size=ROOM_MAX_SIZE):
+    """Partition a rectangle and place one room in each piece.
+
+    Returns (rooms, links, stats): rooms as (x, y, width, height) tuples,
+    links as pairs of room indexes that should be joined by a corridor,
+    and a GenerationStats.
+    """
+    start = time.perf_counter()
+    stats = GenerationStats()
+    if room_count < 1:
+        raise ValueError("room_count must be at least 1")
+    if width < min_size or height < min_size:
+        raise ValueError(f"a {width}x{height} area cannot hold a {min_size}x{min_size} room")
+
+    # Nodes are [x, y, width, height, first_child, second_child]
+    root = [x, y, width, height, None, None]
+    heap = [(-width * height, 0, root)]
+    order = 1  # Tie-breaker so the heap never compares nodes
+    leaves = 1
+    cuts = []
+    while leaves < room_count:
+        if not heap:
+            raise ValueError(f"{room_count} rooms of at least {min_size}x{min_size} "
+                             f"do not fit in {width}x{height}")
+        _, _, node = heapq.heappop(heap)
+        nx, ny, nw, nh, _, _ = node
+        can_cut_width = nw >= 2 * min_size
+        can_cut_height = nh >= 2 * min_size
+        if not can_cut_width and not can_cut_height:
+            stats.retries += 1  # Too small to cut again; it stays a single room
+            continue
+        if can_cut_width and can_cut_height:
+            cut_width = nw > nh or (nw == nh and rng.random() < 0.5)
+        else:
+            cut_width = can_cut_width
+        if cut_width:
+            at = rng.randint(min_size, nw - min_size)
+            first = [nx, ny, at, nh, None, None]
+            second = [nx + at, ny, nw - at, nh, None, None]
+        else:
+            at = rng.randint(min_size, nh - min_size)
+            first = [nx, ny, nw, at, None, None]
+            second = [nx, ny + at, nw, nh - at, None, None]
+        node[4] = first
+        node[5] = second
+        cuts.append(node)
+        for child in (first, second):
+            heapq.heappush(heap, (-child[2] * child[3], order, child))
+            order += 1
+        leaves += 1
+
+    # One room per leaf, in the order the leaves appear left to right in the tree
+    rooms = []
+    room_of = {}
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node[4] is not None:
+            stack.append(node[5])
+            stack.append(node[4])
+            continue
+        nx, ny, nw, nh, _, _ = node
+        w = rng.randint(min_size, min(max_size, nw))
+        h = rng.randint(min_size, min(max_size, nh))
+        room_of[id(node)] = len(rooms)
+        rooms.append((nx + rng.randint(0, nw - w), ny + rng.randint(0, nh - h), w, h))
+
+    # Join the two halves of every cut through a room on each side
+    links = []
+    for node in cuts:
+        links.append((room_of[id(_first_leaf(node[4]))], room_of[id(_first_leaf(node[5]))]))
+
+    stats.rooms = len(rooms)
+    stats.seconds = time.perf_counter() - start
+    return rooms, links, stats
+
+
+def _first_leaf(node):
+    while node[4] is not None:
+        node = node[4]
+    return node
+
+
+class BSPLayout:
+    """Floor mix-in that lays rooms out with split() instead of random drops."""
+
+    room_count = NUM_ROOMS
+
+    def layout_rooms(self, rng):
+        rooms, links, self.stats = split(1, 1, self.width - 2, self.height - 2, self.room_count, rng)
+        for x, y, w, h in rooms:
+            room = Room(x, y, w, h)
+            self.create_room(room)
+            self.rooms.append(room)
+        for a, b in links:
+            self.create_hallway(self.rooms[a].center(), self.rooms[b].center(), rng)
+
+
+class BSPFloor(BSPLayout, Floor):
+    """engine.Floor laid out by binary space partition."""
+
+
+class BSPArrayFloor(BSPLayout, ArrayFloor):
+    """The NumPy tile engine laid out by binary space partition."""
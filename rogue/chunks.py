@@ -0,0 +1,190 @@
+"""Large-map mode: tiles kept in fixed-size chunks allocated on first carve.
+
+A 2000x2000 floor is four million cells, almost all of them solid rock.
+ChunkedGrid splits the map into CHUNK_SIZE x CHUNK_SIZE blocks and only
+allocates a block (a bytearray of glyph bytes) when something other than
+rock is written into it, so memory follows how much of the map was dug
+out rather than its size. Unallocated blocks read as rock.
+
+LargeFloor puts this together with the BSP layout from rogue.bsp and
+scales the number of rooms with the area of the map. Pair it with
+rogue.viewport.Camera so each turn only draws the part of the map that
+fits on screen.
+"""
+from rogue.bsp import BSPLayout
+from rogue.engine import Floor, ROCK, FLOOR, HALL, WALL, DOOR, NUM_ROOMS
+
+CHUNK_SHIFT = 6
+CHUNK_SIZE = 1 << CHUNK_SHIFT  # 64x64 cells per chunk
+CHUNK_MASK = CHUNK_SIZE - 1
+CELLS_PER_ROOM = 400  # LargeFloor places one room per this many cells of map
+
+EMPTY_CHUNK = ROCK.encode('ascii') * (CHUNK_SIZE * CHUNK_SIZE)
+DIG_TABLE = str.maketrans({ROCK: HALL, WALL: DOOR})  # What a hallway does to the tiles it crosses
+
+
+class GridRow:
+    """One row of a ChunkedGrid, so grid[y][x] reads like a list of lists."""
+
+    __slots__ = ('grid', 'y')
+
+    def __init__(self, grid, y):
+        self.grid = grid
+        self.y = y
+
+    def __getitem__(self, x):
+        return self.grid.get(x, self.y)
+
+    def __setitem__(self, x, tile):
+        self.grid.set(x, self.y, tile)
+
+
+class ChunkedGrid:
+    """A width x height grid of one-character tiles stored in sparse chunks."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.chunks = {}  # (chunk_x, chunk_y) -> bytearray of CHUNK_SIZE * CHUNK_SIZE glyphs
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, y):
+        return GridRow(self, y)
+
+    def get(self, x, y):
+        chunk = self.chunks.get((x >> CHUNK_SHIFT, y >> CHUNK_SHIFT))
+        if chunk is None:
+            return ROCK
+        return chr(chunk[(y & CHUNK_MASK) << CHUNK_SHIFT | x & CHUNK_MASK])
+
+    def set(self, x, y, tile):
+        key = (x >> CHUNK_SHIFT, y >> CHUNK_SHIFT)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if tile == ROCK:
+                return  # Already rock; no need to allocate
+            chunk = self.chunks[key] = bytearray(EMPTY_CHUNK)
+        chunk[(y & CHUNK_MASK) << CHUNK_SHIFT | x & CHUNK_MASK] = ord(tile)
+
+    def span(self, y, left, right):
+        """Return the tiles of row y from column left up to (not including) right."""
+        parts = []
+        row = (y & CHUNK_MASK) << CHUNK_SHIFT
+        x = left
+        while x < right:
+            chunk_x = x >> CHUNK_SHIFT
+            end = min(right, (chunk_x + 1) << CHUNK_SHIFT)
+            chunk = self.chunks.get((chunk_x, y >> CHUNK_SHIFT))
+            if chunk is None:
+                parts.append(ROCK * (end - x))
+            else:
+                start = row | x & CHUNK_MASK
+                parts.append(chunk[start:start + end - x].decode('ascii'))
+            x = end
+        return ''.join(parts)
+
+    def write(self, x, y, text):
+        """Write a run of tiles into row y starting at column x."""
+        data = text.encode('ascii')
+        row = (y & CHUNK_MASK) << CHUNK_SHIFT
+        done = 0
+        while done < len(data):
+            chunk_x = (x + done) >> CHUNK_SHIFT
+            count = min(len(data) - done, ((chunk_x + 1) << CHUNK_SHIFT) - x - done)
+            key = (chunk_x, y >> CHUNK_SHIFT)
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                chunk = self.chunks[key] = bytearray(EMPTY_CHUNK)
+            start = row | (x + done) & CHUNK_MASK
+            chunk[start:start + count] = data[done:done + count]
+            done += count
+
+    def cells(self, tile):
+        """Return every cell holding a tile, looking only at allocated chunks."""
+        if tile == ROCK:
+            raise ValueError("rock is everywhere nothing was carved; not listing it")
+        found = []
+        byte = ord(tile)
+        for (chunk_x, chunk_y), chunk in self.chunks.items():
+            base_x = chunk_x << CHUNK_SHIFT
+            base_y = chunk_y << CHUNK_SHIFT
+            at = chunk.find(byte)
+            while at != -1:
+                found.append((base_x + (at & CHUNK_MASK), base_y + (at >> CHUNK_SHIFT)))
+                at = chunk.find(byte, at + 1)
+        return found
+
+    def allocated_bytes(self):
+        """Memory held by tile data, i.e. by the allocated chunks."""
+        return len(self.chunks) * CHUNK_SIZE * CHUNK_SIZE
+
+
+class ChunkedFloor(Floor):
+    """A Floor whose tiles live in a ChunkedGrid."""
+
+    def new_grid(self):
+        return ChunkedGrid(self.width, self.height)
+
+    def is_valid_room(self, room):
+        """A room (walls included) may only be carved out of solid rock."""
+        rock = ROCK * room.width
+        right = room.x + room.width
+        for y in range(room.y, room.y + room.height):
+            if self.grid.span(y, room.x, right) != rock:
+                return False
+        return True
+
+    def create_room(self, room):
+        """Carve a room: walls around the edge, floor inside."""
+        wall = WALL * room.width
+        inside = WALL + FLOOR * (room.width - 2) + WALL
+        last = room.y + room.height - 1
+        for y in range(room.y, last + 1):
+            self.grid.write(room.x, y, wall if y in (room.y, last) else inside)
+
+    def create_horiz_hallway(self, x1, x2, y):
+        left = min(x1, x2)
+        self.grid.write(left, y, self.grid.span(y, left, max(x1, x2) + 1).translate(DIG_TABLE))
+
+    def dig(self, x, y):
+        """Carve one hallway cell, turning any wall it crosses into a door."""
+        tile = self.grid.get(x, y)
+        if tile == ROCK:
+            self.grid.set(x, y, HALL)
+        elif tile == WALL:
+            self.grid.set(x, y, DOOR)
+
+    def tile(self, x, y):
+        return self.grid.get(x, y)
+
+    def write_tile(self, x, y, tile):
+        self.grid.set(x, y, tile)
+
+    def is_walkable(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and self.grid.get(x, y) in self.walkable_tiles
+
+    def cells_of(self, tile):
+        return self.grid.cells(tile)
+
+    def span(self, y, left, right):
+        return self.grid.span(y, left, right)
+
+    def load_row(self, y, text):
+        # Only write from the first to the last carved cell so rock stays unallocated
+        body = text.strip(ROCK)
+        if body:
+            self.grid.write(len(text) - len(text.lstrip(ROCK)), y, body)
+
+    def rows(self, player=None):
+        """Return the whole floor as strings; prefer window() on large maps."""
+        return self.window(0, 0, self.width, self.height, player)
+
+
+class LargeFloor(BSPLayout, ChunkedFloor):
+    """Chunked storage and BSP layout, with rooms in proportion to map area."""
+
+    @property
+    def room_count(self):
+        return max(NUM_ROOMS, self.width * self.height // CELLS_PER_ROOM)
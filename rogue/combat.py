@@ -0,0 +1,98 @@
+"""Fight outcome odds in closed form, cached by the stats involved.
+
+A fight is a series of rounds. In each round the first side attacks, then
+the other side strikes back if it is still standing. Every attack hits
+with a fixed chance and deals max(0, attack - defense), so each side needs
+a fixed number of hits to win, and the number of attacks it takes to land
+them follows a negative binomial distribution. The first side wins in
+round n when its last needed hit lands on its n-th attack while the other
+side has landed fewer than it needs in n - 1 attacks; losing works the
+same way the other round. Summing over n gives the exact odds without
+simulating a single round.
+
+AI code and balance tools can call fight_odds() as often as they like:
+results are cached, and the stats in play take few distinct values.
+"""
+from functools import lru_cache
+from math import comb
+
+from rogue.engine import HIT_CHANCE
+
+ODDS_TOLERANCE = 1e-9  # Stop adding rounds once less probability than this is unaccounted for
+MAX_FIGHT_ROUNDS = 10000  # Fights still going after this many rounds count as stalemates
+
+
+class FightOdds:
+    """How a fight is likely to go, seen from the side that strikes first."""
+
+    def __init__(self, win, loss, expected_rounds, health):
+        self.win = win
+        self.loss = loss
+        self.stalemate = max(0.0, 1.0 - win - loss)  # Neither side can finish the other
+        self.expected_rounds = expected_rounds  # Over fights that end
+        self.health = health  # Health left after a win -> chance
+
+    def expected_health(self):
+        """Average health left over the fights that are won."""
+        if not self.win:
+            return 0.0
+        return sum(health * chance for health, chance in self.health.items()) / self.win
+
+    def __repr__(self):
+        return (f"FightOdds(win={self.win:.4f}, loss={self.loss:.4f}, stalemate={self.stalemate:.4f}, "
+                f"expected_rounds={self.expected_rounds:.2f})")
+
+
+def hits_needed(health, damage):
+    """Hits of a given damage it takes to bring health to zero, None if never."""
+    if health <= 0:
+        return 0
+    if damage <= 0:
+        return None
+    return -(-health // damage)
+
+
+@lru_cache(maxsize=4096)
+def fight_odds(health, attack, defense, enemy_health, enemy_attack, enemy_defense,
+               hit_chance=HIT_CHANCE, enemy_hit_chance=HIT_CHANCE):
+    """Return the FightOdds of a fight where the first set of stats strikes first."""
+    damage = max(0, attack - enemy_defense)
+    enemy_damage = max(0, enemy_attack - defense)
+    need = hits_needed(enemy_health, damage) if hit_chance > 0 else None
+    enemy_need = hits_needed(health, enemy_damage) if enemy_hit_chance > 0 else None
+    if need == 0:
+        return FightOdds(1.0, 0.0, 0.0, {health: 1.0})
+    if enemy_need == 0:
+        return FightOdds(0.0, 1.0, 0.0, {})
+    if need is None and enemy_need is None:
+        return FightOdds(0.0, 0.0, 0.0, {})
+
+    p = hit_chance
+    q = enemy_hit_chance
+    win = 0.0
+    loss = 0.0
+    rounds = 0.0
+    health_left = {}
+    for n in range(1, MAX_FIGHT_ROUNDS + 1):
+        # Win in round n: our last needed hit is attack n, they have landed fewer than they need in n - 1
+        if need is not None and n >= need:
+            finish = comb(n - 1, need - 1) * p ** need * (1 - p) ** (n - need)
+            if finish:
+                for hits in range(n if enemy_need is None else min(enemy_need, n)):
+                    chance = finish * comb(n - 1, hits) * q ** hits * (1 - q) ** (n - 1 - hits)
+                    left = health - hits * enemy_damage
+                    health_left[left] = health_left.get(left, 0.0) + chance
+                    win += chance
+                    rounds += n * chance
+        # Loss in round n: we are short of our hits after n attacks, their last needed hit is attack n
+        if enemy_need is not None and n >= enemy_need:
+            finish = comb(n - 1, enemy_need - 1) * q ** enemy_need * (1 - q) ** (n - enemy_need)
+            if finish:
+                short = 1.0 if need is None else sum(comb(n, hits) * p ** hits * (1 - p) ** (n - hits)
+                                                     for hits in range(min(need, n + 1)))
+                loss += finish * short
+                rounds += n * finish * short
+        if 1.0 - win - loss < ODDS_TOLERANCE:
+            break
+    ended = win + loss
+    return FightOdds(win, loss, rounds / ended if ended else 0.0, health_left)
@@ -0,0 +1,194 @@
+"""Find the parts of a floor that cannot reach each other, and join them.
+
+label_runs() splits every row into runs of open tiles with one regular
+expression scan and joins each run to the runs it touches in the row
+above with a DisjointSet (union-find). A floor of any size then costs
+one pass over its rows, and the union-find works on runs rather than on
+single cells, so a wide room is a handful of entries however large.
+
+connect() goes on from there only when the floor came out in pieces. It
+grows every region into the diggable tiles around it at once, breadth
+first, and wherever two regions' growth meets it notes how many cells a
+corridor joining them there would take. Taking the cheapest of those
+joins that still link two separate groups (Kruskal's algorithm, on a
+second DisjointSet over the regions) picks corridors whose total length
+is close to the fewest cells that could join everything, in one pass,
+instead of generating the floor again until it happens to be connected.
+
+Grids are lists of rows of one-character tiles, indexed grid[y][x]. The
+outermost rows and columns are never open or dug, as the games keep
+their edges solid. Movement is in the four directions.
+"""
+import re
+from array import array
+from collections import deque
+
+
+class DisjointSet:
+    """Union-find over the ints 0..n-1, by size with path halving."""
+
+    def __init__(self, size=0):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def __len__(self):
+        return len(self.parent)
+
+    def add(self):
+        """Add a new set of its own and return its id."""
+        item = len(self.parent)
+        self.parent.append(item)
+        self.size.append(1)
+        return item
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        """Join the sets holding a and b; return False if they were one already."""
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return True
+
+
+def tile_pattern(tiles):
+    """A regular expression matching runs of the given tiles."""
+    return re.compile('[' + ''.join(re.escape(tile) for tile in tiles) + ']+')
+
+
+def label_runs(grid, open_tiles):
+    """Return the open runs of every row and a DisjointSet of the runs that touch.
+
+    runs[y] lists (start, end, run) for each run of open tiles in row y,
+    left to right, end exclusive; runs in the same set are connected.
+    """
+    pattern = tile_pattern(open_tiles)
+    height = len(grid)
+    width = len(grid[0]) if height else 0
+    runs = [[] for _ in range(height)]
+    sets = DisjointSet()
+    above = []
+    for y in range(1, height - 1):
+        row = [(start, end, sets.add()) for start, end in
+               (match.span() for match in pattern.finditer(''.join(grid[y]), 1, width - 1))]
+        # Both rows are sorted, so one walk along them finds every overlap
+        i = j = 0
+        while i < len(row) and j < len(above):
+            start, end, run = row[i]
+            above_start, above_end, above_run = above[j]
+            if start < above_end and above_start < end:
+                sets.union(run, above_run)
+            if end <= above_end:
+                i += 1
+            else:
+                j += 1
+        runs[y] = above = row
+    return runs, sets
+
+
+def regions(grid, open_tiles):
+    """Return the number of separate open regions on the grid."""
+    runs, sets = label_runs(grid, open_tiles)
+    return len({sets.find(run) for row in runs for _, _, run in row})
+
+
+def connect(grid, open_tiles, dig_tiles):
+    """Return the (x, y) cells to dig so that every open region joins up.
+
+    Only tiles in dig_tiles may be dug through. The list is empty when the
+    floor is connected already; regions sealed off by tiles that cannot
+    be dug stay as they are. The grid itself is not changed.
+    """
+    runs, sets = label_runs(grid, open_tiles)
+    labels = {}  # Root run -> region number
+    for row in runs:
+        for _, _, run in row:
+            labels.setdefault(sets.find(run), len(labels))
+    if len(labels) < 2:
+        return []
+
+    height = len(grid)
+    width = len(grid[0])
+    cells = width * height
+    owner = array('i', [-1]) * cells  # Region each open or reached cell belongs to
+    distance = array('i', [-1]) * cells  # Cells dug to get here from the region: 0 when open
+    parent = array('i', [-1]) * cells  # Previous dug cell on the way back to the region
+    for y, row in enumerate(runs):
+        base = y * width
+        for start, end, run in row:
+            owner[base + start:base + end] = array('i', [labels[sets.find(run)]]) * (end - start)
+            distance[base + start:base + end] = array('i', [0]) * (end - start)
+    diggable = bytearray(cells)
+    pattern = tile_pattern(dig_tiles)
+    spans = []
+    for y in range(1, height - 1):
+        base = y * width
+        for match in pattern.finditer(''.join(grid[y]), 1, width - 1):
+            start, end = match.span()
+            diggable[base + start:base + end] = b'\x01' * (end - start)
+            spans.append((base + start, base + end))
+
+    # Joins found so far: (region, region) -> (cells to dig, end in one region's growth, end in the other's)
+    joins = {}
+
+    def meet(a, b, cost, here, there):
+        key = (a, b) if a < b else (b, a)
+        if key not in joins or cost < joins[key][0]:
+            joins[key] = (cost, here, there)
+
+    # Every diggable cell next to a region starts that region's growth
+    queue = deque()
+    steps = (-1, 1, -width, width)
+    for start, end in spans:
+        for index in range(start, end):
+            region = -1
+            for step in steps:
+                neighbour = index + step
+                if distance[neighbour] == 0:
+                    if region < 0:
+                        region = owner[neighbour]
+                    elif owner[neighbour] != region:
+                        meet(region, owner[neighbour], 1, index, -1)  # One cell already joins two regions
+            if region >= 0:
+                owner[index] = region
+                distance[index] = 1
+                queue.append(index)
+
+    while queue:
+        index = queue.popleft()
+        region = owner[index]
+        cost = distance[index]
+        for step in steps:
+            neighbour = index + step
+            if distance[neighbour] < 0:
+                if diggable[neighbour]:
+                    owner[neighbour] = region
+                    distance[neighbour] = cost + 1
+                    parent[neighbour] = index
+                    queue.append(neighbour)
+            elif owner[neighbour] != region:
+                if distance[neighbour] == 0:
+                    meet(region, owner[neighbour], cost, index, -1)
+                else:
+                    meet(region, owner[neighbour], cost + distance[neighbour], index, neighbour)
+
+    linked = DisjointSet(len(labels))
+    dug = {}  # Cell -> None, keeping the order corridors were chosen in
+    for (a, b), (cost, here, there) in sorted(joins.items(), key=lambda join: join[1][0]):
+        if not linked.union(a, b):
+            continue
+        for end in (here, there):
+            while end >= 0:
+                dug[end] = None
+                end = parent[end]
+    return [(index % width, index // width) for index in dug]
@@ -0,0 +1,136 @@
+"""Curses front end for the headless engine in rogue.engine."""
+import curses
+import sys
+
+from rogue import engine, savefile
+from rogue.chunks import LargeFloor
+from rogue.fov import FieldOfView
+from rogue.profiler import profiler
+from rogue.render import DirtyRenderer
+from rogue.replay import Journal
+from rogue.viewport import Camera
+
+KEY_COMMANDS = {
+    ord('h'): engine.LEFT,
+    ord('j'): engine.DOWN,
+    ord('k'): engine.UP,
+    ord('l'): engine.RIGHT,
+    curses.KEY_LEFT: engine.LEFT,
+    curses.KEY_DOWN: engine.DOWN,
+    curses.KEY_UP: engine.UP,
+    curses.KEY_RIGHT: engine.RIGHT,
+    ord('.'): engine.WAIT,
+}
+ITEM_KEYS = '1234567890'  # Use inventory slots 1 to 10, the tenth with 0
+SAVE_KEY = ord('S')
+SAVE_PATH = 'rogue.sav'
+PROFILE_KEY = ord('p')  # Show per-phase p50/p99 timings under the map
+CPROFILE_KEY = ord('C')  # Start a cProfile capture; press again to write it out
+TRACEMALLOC_KEY = ord('M')  # The same for a tracemalloc snapshot
+
+
+def choose_item(stdscr, player):
+    """Show the inventory and return the chosen index, or None to cancel."""
+    stdscr.erase()
+    stdscr.addstr(0, 0, "Inventory:")
+    if not player.inventory:
+        stdscr.addstr(1, 0, "Your inventory is empty.")
+    choices = ITEM_KEYS[:len(player.inventory)]
+    for row, (key, item) in enumerate(zip(choices, player.inventory), start=1):
+        stdscr.addstr(row, 0, f"{key}. {item.name}")
+    stdscr.addstr(len(choices) + 2, 0, "Press the number of an item to use it, or 'i' to close...")
+    stdscr.refresh()
+    while True:
+        key = stdscr.getch()
+        if key in (ord('i'), 27):
+            return None
+        if 0 <= key < 256 and chr(key) in choices:
+            return choices.index(chr(key))
+
+
+def fit_camera(stdscr, camera):
+    """Size the camera to the terminal, leaving the status, message and profiler rows."""
+    screen_height, screen_width = stdscr.getmaxyx()
+    camera.resize(screen_width - 1, screen_height - 3)
+
+
+def main(stdscr, seed=None, width=engine.DUNGEON_WIDTH, height=engine.DUNGEON_HEIGHT, state=None,
+         record_path=None):
+    """Play a loaded state or a new game; record_path saves a journal of a new game for rogue.replay."""
+    curses.curs_set(0)  # Hide cursor
+    journal = None
+    if state is None:
+        large = width > engine.DUNGEON_WIDTH or height > engine.DUNGEON_HEIGHT
+        state = engine.new_game(seed, width, height, LargeFloor if large else engine.Floor)
+        if record_path is not None:  # A journal replays from the seed, so only new games are recorded
+            journal = Journal(state.seed, width, height, state.floor_class)
+    try:
+        play(stdscr, state, journal)
+    finally:
+        if journal is not None:
+            journal.save(record_path)  # Also after a crash, so the crash can be replayed
+
+
+def play(stdscr, state, journal=None):
+    """Run the game until the player quits or dies, recording commands to journal if given."""
+    renderer = DirtyRenderer(stdscr)
+    camera = Camera(state.width, state.height)
+    fit_camera(stdscr, camera)
+    fov = FieldOfView()
+    message = ''
+
+    while True:
+        with profiler.span('render'):
+            rows = engine.frame(state, camera, fov) + [message, profiler.status(camera.width)]
+            renderer.draw(rows)
+        if state.over:
+            stdscr.getch()
+            break
+
+        key = stdscr.getch()
+        if key == ord('q'):
+            break
+        if key == SAVE_KEY:
+            savefile.save(state, SAVE_PATH)
+            message = f"Game saved to {SAVE_PATH}."
+            continue
+        if key == PROFILE_KEY:
+            profiler.toggle()
+            continue
+        if key == CPROFILE_KEY:
+            profiler.toggle_cprofile()
+            continue
+        if key == TRACEMALLOC_KEY:
+            profiler.toggle_tracemalloc()
+            continue
+        if key == curses.KEY_RESIZE:
+            fit_camera(stdscr, camera)
+            renderer.invalidate()
+            continue
+        if key == ord('i'):
+            index = choose_item(stdscr, state.player)
+            renderer.invalidate()
+            if index is None:
+                continue
+            command = (engine.USE, index)
+        else:
+            command = KEY_COMMANDS.get(key)
+            if command is None:
+                continue
+
+        if journal is not None:
+            journal.record(command)
+        events = engine.step(state, command)
+        message = ' '.join(filter(None, map(engine.describe, events)))
+
+
+def run(seed=None, width=engine.DUNGEON_WIDTH, height=engine.DUNGEON_HEIGHT, load_path=None, record_path=None):
+    state = None
+    if load_path is not None:  # Before curses takes the terminal, so a bad save is reported readably
+        try:
+            state = savefile.load(load_path)
+        except (savefile.SaveFormatError, OSError) as error:
+            sys.exit(f"Cannot load the game: {error}")
+    curses.wrapper(main, seed, width, height, state, record_path)
+    if profiler.spans:
+        print(profiler.report())
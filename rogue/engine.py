@@ -0,0 +1,710 @@
+"""Headless game rules: step(state, command) -> events, no terminal needed.
+
+The rules are built from Deliverable_8.py (levels, experience, monster
+types) and Rogue python deliverable 5.py (wandering monsters, potions and
+scrolls, stairs between floors), gathered in one place without any curses
+calls. Front ends such as rogue.curses_ui turn key presses into commands,
+feed them to step() and draw whatever the returned events and frame()
+describe.
+
+This is a separate implementation, not a layer under the deliverable
+scripts: they keep their own copies of the rules and their own curses
+loops. Only rogue.curses_ui, rogue.server and rogue.aio play through
+step(), and the rules here have drifted from the scripts' since (bump
+attacks with HIT_CHANCE, chasing monsters; see rogue.balance).
+
+Floors are generated lazily from per-floor seeds (see rogue.floors) and
+everything else draws from state.rng, so a game is fully determined by
+its seed and the commands fed to it.
+"""
+import random
+import time
+
+from rogue.floors import FloorStore
+from rogue.flowfield import FlowField
+from rogue.freecells import FreeCellIndex
+from rogue.profiler import profiler
+from rogue.spatial import SpatialIndex
+
+# Map dimensions and generation
+DUNGEON_WIDTH = 40
+DUNGEON_HEIGHT = 20
+ROOM_MIN_SIZE = 5
+ROOM_MAX_SIZE = 10
+NUM_ROOMS = 4
+ROOM_TRIES = 50  # Placement attempts per room before giving up on it
+NUM_MONSTERS = 5
+NUM_ITEMS = 5
+CHASE_RADIUS = 10  # Monsters this many steps from the player come after them
+
+# Player stats
+PLAYER_HEALTH = 100
+PLAYER_ATTACK = 10
+PLAYER_DEFENSE = 5
+MAX_INVENTORY = 10
+LEVEL_UP_EXP = 100  # Experience required to level up
+EXP_PER_KILL = 20
+HIT_CHANCE = 0.8
+
+MONSTER_TYPES = {
+    'Goblin': {'health': 20, 'attack': 5, 'defense': 2},
+    'Kestral': {'health': 40, 'attack': 15, 'defense': 5},
+    'Snake': {'health': 60, 'attack': 20, 'defense': 10},
+    'Dragon': {'health': 100, 'attack': 30, 'defense': 20},
+    'Blob': {'health': 25, 'attack': 8, 'defense': 3}
+}
+ITEM_TYPES = ['potion_heal', 'weapon_sword', 'armor_shield', 'scroll_identity', 'food_ration', 'magic_ring', 'gold_coin']
+POTION_TYPES = ['potion_heal', 'potion_attack', 'potion_defense']
+SCROLL_TYPES = ['scroll_heal', 'scroll_attack', 'scroll_defense']
+
+# Tiles
+ROCK = ' '
+FLOOR = '.'
+HALL = '#'
+WALL = '|'
+DOOR = '+'
+STAIRS_UP = '<'
+STAIRS_DOWN = '>'
+WALKABLE = frozenset((FLOOR, HALL, DOOR, STAIRS_UP, STAIRS_DOWN))
+SPAWN_TILES = (FLOOR, HALL)  # Tiles the free-cell index keeps track of
+
+# Glyphs for things standing on tiles
+PLAYER = '@'
+MONSTER = 'M'
+ITEM = '*'
+
+# Commands
+LEFT = 'left'
+RIGHT = 'right'
+UP = 'up'
+DOWN = 'down'
+WAIT = 'wait'
+USE = 'use'  # Sent as (USE, inventory_index)
+
+DIRECTIONS = {
+    LEFT: (-1, 0),
+    RIGHT: (1, 0),
+    UP: (0, -1),
+    DOWN: (0, 1),
+}
+MONSTER_STEPS = tuple(DIRECTIONS.values())
+
+# Events returned by step(), as tuples whose first element is the kind
+MOVED = 'moved'                  # (MOVED, x, y)
+BLOCKED = 'blocked'              # (BLOCKED, x, y)
+HIT = 'hit'                      # (HIT, attacker, defender, damage)
+MISSED = 'missed'                # (MISSED, attacker, defender)
+KILLED = 'killed'                # (KILLED, monster_type)
+PICKED_UP = 'picked_up'          # (PICKED_UP, item_name)
+INVENTORY_FULL = 'inventory_full'  # (INVENTORY_FULL, item_name)
+USED = 'used'                    # (USED, item_name, message)
+LEVEL_UP = 'level_up'            # (LEVEL_UP, level)
+DESCENDED = 'descended'          # (DESCENDED, depth)
+ASCENDED = 'ascended'            # (ASCENDED, depth)
+DIED = 'died'                    # (DIED, monster_type)
+INVALID = 'invalid'              # (INVALID, command)
+
+# Item effects: name -> (stat, amount, message)
+ITEM_EFFECTS = {
+    'potion_heal': ('health', 20, "You used a healing potion! Health restored."),
+    'potion_attack': ('attack_damage', 5, "You used an attack potion! Attack increased."),
+    'potion_defense': ('defense', 5, "You used a defense potion! Defense increased."),
+    'scroll_heal': ('health', 30, "You used a healing scroll! Health restored."),
+    'scroll_attack': ('attack_damage', 10, "You used an attack scroll! Attack increased."),
+    'scroll_defense': ('defense', 10, "You used a defense scroll! Defense increased."),
+}
+
+
+class Player:
+    def __init__(self, x=0, y=0):
+        self.x = x
+        self.y = y
+        self.health = PLAYER_HEALTH
+        self.max_health = PLAYER_HEALTH
+        self.attack_damage = PLAYER_ATTACK
+        self.defense = PLAYER_DEFENSE
+        self.level = 1
+        self.exp = 0
+        self.inventory = []
+
+    def pick_up_item(self, item):
+        if len(self.inventory) < MAX_INVENTORY:
+            self.inventory.append(item)
+            return True
+        return False
+
+    def gain_exp(self, amount):
+        """Add experience and return True if the player levelled up."""
+        self.exp += amount
+        if self.exp >= LEVEL_UP_EXP:
+            self.level_up()
+            return True
+        return False
+
+    def level_up(self):
+        self.level += 1
+        self.exp = 0
+        self.max_health += 20  # Increase health on level-up
+        self.health = self.max_health
+        self.attack_damage += 5  # Increase attack damage on level-up
+        self.defense += 2  # Increase defense on level-up
+
+    def use_item(self, index):
+        """Use an inventory item and return the message describing it."""
+        item = self.inventory.pop(index)
+        effect = ITEM_EFFECTS.get(item.name)
+        if effect is None:
+            return f"You used the {item.name}. Nothing happens."
+        stat, amount, message = effect
+        setattr(self, stat, getattr(self, stat) + amount)
+        return message
+
+
+class Monster:
+    def __init__(self, monster_type, x, y):
+        self.type = monster_type
+        self.health = MONSTER_TYPES[monster_type]['health']
+        self.attack = MONSTER_TYPES[monster_type]['attack']
+        self.defense = MONSTER_TYPES[monster_type]['defense']
+        self.x = x
+        self.y = y
+
+
+class Item:
+    def __init__(self, name, x, y):
+        self.name = name
+        self.x = x
+        self.y = y
+
+
+class Room:
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def center(self):
+        return (self.x + self.width // 2, self.y + self.height // 2)
+
+
+class GenerationStats:
+    """How much work laying out a floor took."""
+
+    def __init__(self):
+        self.rooms = 0
+        self.retries = 0  # Placements or splits that were tried and thrown away
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return f"GenerationStats(rooms={self.rooms}, retries={self.retries}, seconds={self.seconds:.6f})"
+
+
+class Floor:
+    """One level of the dungeon: tiles, rooms, monsters and items."""
+
+    # What grid[y][x] holds for tiles monsters can step on
+    walkable_tiles = WALKABLE
+
+    def __init__(self, depth, rng, width=DUNGEON_WIDTH, height=DUNGEON_HEIGHT):
+        self.setup(depth, width, height)
+        self.generate(rng)
+
+    @classmethod
+    def restore(cls, depth, width, height, rows):
+        """Rebuild a floor from its tile rows, e.g. from a save, without generating it.
+
+        Rooms, stairs, monsters and items are left for the caller to put back.
+        """
+        floor = cls.__new__(cls)
+        floor.setup(depth, width, height)
+        for y, row in enumerate(rows):
+            floor.load_row(y, row)
+        floor.index_free_cells()
+        return floor
+
+    def setup(self, depth, width, height):
+        """Start out as solid rock with nothing on it."""
+        self.depth = depth
+        self.width = width
+        self.height = height
+        self.grid = self.new_grid()
+        self.rooms = []
+        self.monsters = []
+        self.items = []
+        self.occupancy = SpatialIndex()
+        self.free = FreeCellIndex(SPAWN_TILES)  # Cells with no item on them to spawn things on
+        self.stairs_up = None
+        self.stairs_down = None
+        self.stats = GenerationStats()
+        self.revision = 0  # Bumped whenever a tile changes after generation
+        self.explored = bytearray((width * height + 7) // 8)  # One bit per cell the player has seen
+
+    def new_grid(self):
+        """Return solid rock; subclasses may store tiles differently."""
+        return [[ROCK for _ in range(self.width)] for _ in range(self.height)]
+
+    def generate(self, rng):
+        start = time.perf_counter()
+        self.layout_rooms(rng)
+        if not self.rooms:
+            raise ValueError(f"no room fits in a {self.width}x{self.height} floor")
+        self.stats.rooms = len(self.rooms)
+        self.stats.seconds = time.perf_counter() - start
+        self.index_free_cells()
+
+        self.stairs_down = self.rooms[-1].center()
+        self.set_tile(*self.stairs_down, STAIRS_DOWN)
+        if self.depth > 0:
+            first = self.rooms[0]
+            self.stairs_up = (first.x + 1, first.y + 1)
+            self.set_tile(*self.stairs_up, STAIRS_UP)
+
+        # Monsters wander off every turn, so they only hold their cells
+        # (and the player's starting cell) until everything has spawned
+        start = self.rooms[0].center()
+        self.free.occupy(*start, self.tile(*start))
+        room_floor = self.free[FLOOR]
+        monster_types = list(MONSTER_TYPES)
+        for _ in range(min(NUM_MONSTERS, len(room_floor))):
+            x, y = room_floor.take(rng)
+            self.add_monster(Monster(rng.choice(monster_types), x, y))
+        item_types = ITEM_TYPES + POTION_TYPES + SCROLL_TYPES
+        for _ in range(min(NUM_ITEMS, len(room_floor))):
+            x, y = room_floor.take(rng)
+            self.add_item(Item(rng.choice(item_types), x, y))
+        for x, y in [start] + [(monster.x, monster.y) for monster in self.monsters]:
+            self.vacated(x, y)
+
+    def layout_rooms(self, rng):
+        """Drop rooms at random spots, chaining each to the previous one.
+
+        Each room gets ROOM_TRIES attempts and is skipped if none fits, so
+        the floor can end up with fewer than NUM_ROOMS rooms.
+        """
+        for _ in range(NUM_ROOMS):
+            for _ in range(ROOM_TRIES):
+                w = rng.randint(ROOM_MIN_SIZE, ROOM_MAX_SIZE)
+                h = rng.randint(ROOM_MIN_SIZE, ROOM_MAX_SIZE)
+                if w > self.width - 2 or h > self.height - 2:
+                    self.stats.retries += 1
+                    continue
+                room = Room(rng.randint(1, self.width - w - 1), rng.randint(1, self.height - h - 1), w, h)
+                if self.is_valid_room(room):
+                    self.create_room(room)
+                    if self.rooms:
+                        self.create_hallway(self.rooms[-1].center(), room.center(), rng)
+                    self.rooms.append(room)
+                    break
+                self.stats.retries += 1
+
+    def is_valid_room(self, room):
+        """A room (walls included) may only be carved out of solid rock."""
+        for y in range(room.y, room.y + room.height):
+            for x in range(room.x, room.x + room.width):
+                if self.grid[y][x] != ROCK:
+                    return False
+        return True
+
+    def create_room(self, room):
+        """Carve a room: walls around the edge, floor inside."""
+        for y in range(room.y, room.y + room.height):
+            for x in range(room.x, room.x + room.width):
+                edge = x in (room.x, room.x + room.width - 1) or y in (room.y, room.y + room.height - 1)
+                self.grid[y][x] = WALL if edge else FLOOR
+
+    def create_hallway(self, start, end, rng):
+        x1, y1 = start
+        x2, y2 = end
+        if rng.random() < 0.5:
+            self.create_horiz_hallway(x1, x2, y1)
+            self.create_vert_hallway(y1, y2, x2)
+        else:
+            self.create_vert_hallway(y1, y2, x1)
+            self.create_horiz_hallway(x1, x2, y2)
+
+    def create_horiz_hallway(self, x1, x2, y):
+        for x in range(min(x1, x2), max(x1, x2) + 1):
+            self.dig(x, y)
+
+    def create_vert_hallway(self, y1, y2, x):
+        for y in range(min(y1, y2), max(y1, y2) + 1):
+            self.dig(x, y)
+
+    def dig(self, x, y):
+        """Carve one hallway cell, turning any wall it crosses into a door."""
+        tile = self.grid[y][x]
+        if tile == ROCK:
+            self.grid[y][x] = HALL
+        elif tile == WALL:
+            self.grid[y][x] = DOOR
+
+    def tile(self, x, y):
+        return self.grid[y][x]
+
+    def set_tile(self, x, y, tile):
+        """Change a tile after generation, keeping the free-cell index in step."""
+        old_tile = self.tile(x, y)
+        self.write_tile(x, y, tile)
+        self.revision += 1
+        self.free.carved(x, y, old_tile, tile)
+        if self.occupancy.first(x, y, ITEM) is not None:
+            self.free.occupy(x, y, tile)
+
+    def write_tile(self, x, y, tile):
+        self.grid[y][x] = tile
+
+    def is_walkable(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and self.grid[y][x] in WALKABLE
+
+    def blocks_sight(self, x, y):
+        return not self.is_walkable(x, y)
+
+    def explore(self, cells):
+        """Mark cells as seen by the player."""
+        explored = self.explored
+        width = self.width
+        height = self.height
+        for x, y in cells:
+            if 0 <= x < width and 0 <= y < height:
+                bit = y * width + x
+                explored[bit >> 3] |= 1 << (bit & 7)
+
+    def is_explored(self, x, y):
+        bit = y * self.width + x
+        return self.explored[bit >> 3] >> (bit & 7) & 1 == 1
+
+    def cells_of(self, tile):
+        """Return every cell made of the given tile."""
+        return [(x, y) for y, row in enumerate(self.grid) for x, cell in enumerate(row) if cell == tile]
+
+    def index_free_cells(self):
+        """Fill the free-cell index once the layout has been carved."""
+        for tile, free in self.free.classes.items():
+            for cell in self.cells_of(tile):
+                free.add(cell)
+
+    def add_monster(self, monster):
+        self.monsters.append(monster)
+        self.occupancy.add(monster, MONSTER)
+
+    def remove_monster(self, monster):
+        self.monsters.remove(monster)
+        self.occupancy.remove(monster)
+
+    def add_item(self, item):
+        self.items.append(item)
+        self.occupancy.add(item, ITEM)
+        self.free.occupy(item.x, item.y, self.tile(item.x, item.y))
+
+    def remove_item(self, item):
+        self.items.remove(item)
+        self.occupancy.remove(item)
+        self.vacated(item.x, item.y)
+
+    def vacated(self, x, y):
+        """Give a cell back to the free-cell index unless an item still lies there."""
+        if self.occupancy.first(x, y, ITEM) is None:
+            self.free.release(x, y, self.tile(x, y))
+
+    def span(self, y, left, right):
+        """Return the tiles of row y from column left up to (not including) right."""
+        return ''.join(self.grid[y][left:right])
+
+    def load_row(self, y, text):
+        """Overwrite row y with a string of tiles."""
+        self.grid[y] = list(text)
+
+    def window(self, left, top, width, height, player=None, visible=None):
+        """Return the part of the floor a camera sees, entities and player drawn in.
+
+        Only cells inside the window are read, so the cost follows the size
+        of the window rather than the size of the floor. Given the set of
+        visible cells (see rogue.fov), cells the player has never seen are
+        left blank and entities are only drawn where the player can see.
+        """
+        right = min(left + width, self.width)
+        bottom = min(top + height, self.height)
+        if visible is None:
+            lines = [list(self.span(y, left, right)) for y in range(top, bottom)]
+            cells = self.occupancy.cells
+            if len(cells) < len(lines) * (right - left):
+                inside = [(cell, bucket) for cell, bucket in cells.items()
+                          if left <= cell[0] < right and top <= cell[1] < bottom]
+            else:
+                inside = [((x, y), cells[x, y]) for y in range(top, bottom) for x in range(left, right)
+                          if (x, y) in cells]
+        else:
+            lines = [self.remembered(y, left, right) for y in range(top, bottom)]
+            cells = self.occupancy.cells
+            inside = [(cell, cells[cell]) for cell in visible
+                      if cell in cells and left <= cell[0] < right and top <= cell[1] < bottom]
+        for (x, y), bucket in inside:
+            lines[y - top][x - left] = MONSTER if MONSTER in bucket.values() else ITEM
+        if player is not None and left <= player.x < right and top <= player.y < bottom:
+            lines[player.y - top][player.x - left] = PLAYER
+        return [''.join(line) for line in lines]
+
+    def remembered(self, y, left, right):
+        """Return row y between two columns as a list, blank where never explored."""
+        explored = self.explored
+        first = y * self.width + left
+        last = first + right - left - 1
+        if not any(explored[first >> 3:(last >> 3) + 1]):
+            return [ROCK] * (right - left)  # Nothing seen on this stretch yet
+        text = self.span(y, left, right)
+        return [tile if explored[bit >> 3] >> (bit & 7) & 1 else ROCK
+                for bit, tile in enumerate(text, first)]
+
+    def rows(self, player=None):
+        """Return the floor as strings, with entities and the player drawn in."""
+        lines = [row[:] for row in self.grid]
+        for (x, y), bucket in self.occupancy.cells.items():
+            tags = bucket.values()
+            lines[y][x] = MONSTER if MONSTER in tags else ITEM
+        if player is not None:
+            lines[player.y][player.x] = PLAYER
+        return [''.join(line) for line in lines]
+
+
+class GameState:
+    """Everything that makes up a running game."""
+
+    def __init__(self, seed=None, width=DUNGEON_WIDTH, height=DUNGEON_HEIGHT, floor_class=Floor,
+                 depth=0, saved_floors=None):
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.width = width
+        self.height = height
+        self.floor_class = floor_class
+        self.turn = 0
+        self.over = False
+        self.depth = depth
+        # saved_floors hands back floors from a save file (see rogue.savefile)
+        self.floors = FloorStore(seed, self.build_floor, saved=saved_floors)
+        self.flow = FlowField(CHASE_RADIUS)  # Shared by every monster chasing the player
+        self.floor = self.floors.get(depth)
+        self.player = Player(*self.floor.rooms[0].center())
+
+    def build_floor(self, depth, rng):
+        with profiler.span('generate'):
+            return self.floor_class(depth, rng, self.width, self.height)
+
+    def change_floor(self, depth):
+        """Move the player to another floor, arriving on the matching stairs."""
+        going_down = depth > self.depth
+        self.depth = depth
+        self.floor = self.floors.get(depth)
+        arrival = self.floor.stairs_up if going_down else self.floor.stairs_down
+        self.player.x, self.player.y = arrival or self.floor.rooms[0].center()
+
+
+def new_game(seed=None, width=DUNGEON_WIDTH, height=DUNGEON_HEIGHT, floor_class=Floor):
+    """Start a game. The same seed always produces the same dungeon.
+
+    floor_class picks how tiles are stored, e.g. rogue.tiles.ArrayFloor
+    for the NumPy tile engine.
+    """
+    return GameState(seed, width, height, floor_class)
+
+
+def step(state, command):
+    """Advance the game by one player command and return the list of events."""
+    if state.over:
+        return []
+    events = []
+    if profiler.enabled:  # Checked once so turns cost nothing extra while profiling is off
+        with profiler.span('player'):
+            valid = _player_turn(state, command, events)
+        if valid and not state.over:
+            with profiler.span('monsters'):
+                _move_monsters(state, events)
+    else:
+        valid = _player_turn(state, command, events)
+        if valid and not state.over:
+            _move_monsters(state, events)
+    if valid:
+        state.turn += 1
+    return events
+
+
+def _player_turn(state, command, events):
+    """Carry out the player's command; return False if it wasn't a valid one."""
+    if command in DIRECTIONS:
+        dx, dy = DIRECTIONS[command]
+        _move_player(state, dx, dy, events)
+    elif command == WAIT:
+        pass
+    elif type(command) is tuple and command[0] == USE and 0 <= command[1] < len(state.player.inventory):
+        name = state.player.inventory[command[1]].name
+        events.append((USED, name, state.player.use_item(command[1])))
+    else:
+        events.append((INVALID, command))
+        return False
+    return True
+
+
+def _move_player(state, dx, dy, events):
+    player = state.player
+    floor = state.floor
+    x = player.x + dx
+    y = player.y + dy
+    target = floor.occupancy.first(x, y, MONSTER)
+    if target is not None:
+        _player_attacks(state, target, events)
+        return
+    if not floor.is_walkable(x, y):
+        events.append((BLOCKED, x, y))
+        return
+    player.x = x
+    player.y = y
+    events.append((MOVED, x, y))
+
+    item = floor.occupancy.first(x, y, ITEM)
+    while item is not None:
+        if not player.pick_up_item(item):
+            events.append((INVENTORY_FULL, item.name))
+            break
+        floor.remove_item(item)
+        events.append((PICKED_UP, item.name))
+        item = floor.occupancy.first(x, y, ITEM)
+
+    tile = floor.tile(x, y)
+    if tile == STAIRS_DOWN:
+        state.change_floor(state.depth + 1)
+        events.append((DESCENDED, state.depth))
+    elif tile == STAIRS_UP:
+        state.change_floor(state.depth - 1)
+        events.append((ASCENDED, state.depth))
+
+
+def _player_attacks(state, monster, events):
+    player = state.player
+    if state.rng.random() >= HIT_CHANCE:
+        events.append((MISSED, PLAYER, monster.type))
+        return
+    damage = max(0, player.attack_damage - monster.defense)
+    monster.health -= damage
+    events.append((HIT, PLAYER, monster.type, damage))
+    if monster.health <= 0:
+        state.floor.remove_monster(monster)
+        events.append((KILLED, monster.type))
+        if player.gain_exp(EXP_PER_KILL):
+            events.append((LEVEL_UP, player.level))
+
+
+def _move_monsters(state, events):
+    """Monsters near the player chase them, the rest wander one step.
+
+    Chasers follow the shared flow field, which is built at most once per
+    turn however many of them there are. Walking into the player means
+    attacking.
+    """
+    floor = state.floor
+    player = state.player
+    px = player.x
+    py = player.y
+    grid = floor.grid
+    walkable = floor.walkable_tiles
+    width = floor.width
+    height = floor.height
+    occupancy = floor.occupancy
+    random = state.rng.random
+    radius = state.flow.radius
+    steps = None
+    for monster in floor.monsters:
+        target = None
+        if abs(monster.x - px) + abs(monster.y - py) <= radius:
+            if steps is None:
+                steps = state.flow.toward(px, py, floor.is_walkable, floor.revision)
+            target = steps.get((monster.x, monster.y))
+        if target is None:
+            dx, dy = MONSTER_STEPS[int(random() * 4)]
+            x = monster.x + dx
+            y = monster.y + dy
+        else:
+            x, y = target
+        if x == px and y == py:
+            _monster_attacks(state, monster, events)
+            if state.over:
+                return
+        elif target is not None or (0 <= y < height and 0 <= x < width and grid[y][x] in walkable):
+            old_x = monster.x
+            old_y = monster.y
+            monster.x = x
+            monster.y = y
+            occupancy.moved(monster, old_x, old_y)
+
+
+def _monster_attacks(state, monster, events):
+    player = state.player
+    if state.rng.random() >= HIT_CHANCE:
+        events.append((MISSED, monster.type, PLAYER))
+        return
+    damage = max(0, monster.attack - player.defense)
+    player.health -= damage
+    events.append((HIT, monster.type, PLAYER, damage))
+    if player.health <= 0:
+        state.over = True
+        events.append((DIED, monster.type))
+
+
+def status_line(state):
+    player = state.player
+    return (f"Depth: {state.depth} Level: {player.level} Health: {player.health} "
+            f"Attack: {player.attack_damage} Defense: {player.defense} EXP: {player.exp}/{LEVEL_UP_EXP}")
+
+
+def frame(state, camera=None, fov=None):
+    """Return the current screen as a list of strings: map rows then status.
+
+    With a camera (see rogue.viewport) only the window around the player
+    is drawn; without one the whole floor is. With a field of view (see
+    rogue.fov) only what the player sees or remembers is drawn.
+    """
+    floor = state.floor
+    player = state.player
+    if camera is None and fov is None:
+        rows = floor.rows(player)
+    else:
+        visible = None if fov is None else fov.visible(floor, player.x, player.y)
+        if camera is None:
+            left, top, width, height = 0, 0, floor.width, floor.height
+        else:
+            left, top = camera.follow(player.x, player.y, floor.width, floor.height)
+            width, height = camera.width, camera.height
+        rows = floor.window(left, top, width, height, player, visible)
+    rows.append(status_line(state))
+    return rows
+
+
+def describe(event):
+    """Turn an event into a message line for a front end."""
+    kind = event[0]
+    if kind == HIT:
+        if event[1] == PLAYER:
+            return f"You hit the {event[2]} for {event[3]} damage."
+        return f"The {event[1]} hits you for {event[3]} damage."
+    if kind == MISSED:
+        if event[1] == PLAYER:
+            return f"You miss the {event[2]}."
+        return f"The {event[1]} misses you."
+    if kind == KILLED:
+        return f"You have defeated the {event[1]}!"
+    if kind == PICKED_UP:
+        return f"You pick up the {event[1]}."
+    if kind == INVENTORY_FULL:
+        return "Your inventory is full!"
+    if kind == USED:
+        return event[2]
+    if kind == LEVEL_UP:
+        return f"You reached level {event[1]}!"
+    if kind == DESCENDED:
+        return f"You descend to depth {event[1]}."
+    if kind == ASCENDED:
+        return f"You climb up to depth {event[1]}."
+    if kind == DIED:
+        return f"You have been defeated by the {event[1]}!"
+    return ''
@@ -0,0 +1,214 @@
+"""Struct-of-arrays storage for monsters and items.
+
+An EntityStore keeps one typed array per field (x, y, health, ...) plus a
+kind column of small integers, instead of one Python object per entity.
+With 16-bit columns a monster costs about 13 bytes, against well over a
+hundred for an object and its attributes. Systems run over the columns in
+one pass: move() steps every entity, at() finds who stands on a cell,
+damage() hits a batch of rows and sweep() clears out the dead. With NumPy
+installed, damage() and sweep() on large stores work on the columns as
+arrays in place (np.frombuffer shares the memory), with plain loops
+otherwise.
+
+Rows are never moved. A removed row goes on a free list and is reused by
+the next add(), so a row number stays a valid handle for as long as its
+entity lives. Code that would rather work with objects can ask for an
+EntityView, a two-slot proxy that reads and writes the columns.
+
+Stores built with indexed=True also keep a cell -> rows lookup, for
+things that rarely move but are looked up by position every turn, like
+items under the player.
+"""
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # Optional; the systems fall back to plain loops
+    np = None
+
+POSITION_COLUMNS = ('x', 'y')
+NUMPY_MIN_ROWS = 64  # Below this, plain loops beat NumPy's per-call overhead
+
+
+class EntityStore:
+    """Entities of a fixed set of kinds, stored column by column."""
+
+    def __init__(self, kinds, columns=POSITION_COLUMNS, indexed=False, typecode='i'):
+        self.kinds = list(kinds)
+        self.kind_ids = {kind: number for number, kind in enumerate(self.kinds)}
+        self.columns = {name: array(typecode) for name in columns}  # 'h' halves them if values fit in 16 bits
+        self.kind = array('H')
+        self.alive = bytearray()
+        self.free = []  # Rows of removed entities, reused first
+        self.count = 0
+        self.cells = {} if indexed else None  # (x, y) -> list of rows, for indexed stores
+        self.x = self.columns['x']
+        self.y = self.columns['y']
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return (EntityView(self, row) for row in self.rows())
+
+    def add(self, kind, **values):
+        """Add an entity and return its row; columns not given start at 0."""
+        if self.free:
+            row = self.free.pop()
+            for name, column in self.columns.items():
+                column[row] = values.get(name, 0)
+            self.kind[row] = self.kind_ids[kind]
+            self.alive[row] = 1
+        else:
+            row = len(self.kind)
+            for name, column in self.columns.items():
+                column.append(values.get(name, 0))
+            self.kind.append(self.kind_ids[kind])
+            self.alive.append(1)
+        self.count += 1
+        if self.cells is not None:
+            self.cells.setdefault((self.x[row], self.y[row]), []).append(row)
+        return row
+
+    def remove(self, row):
+        if self.cells is not None:
+            key = (self.x[row], self.y[row])
+            bucket = self.cells[key]
+            bucket.remove(row)
+            if not bucket:
+                del self.cells[key]
+        self.alive[row] = 0
+        self.free.append(row)
+        self.count -= 1
+
+    def rows(self):
+        """Rows of the living entities, in row order."""
+        if not self.free:
+            return range(len(self.alive))
+        return [row for row, alive in enumerate(self.alive) if alive]
+
+    def kind_of(self, row):
+        return self.kinds[self.kind[row]]
+
+    def view(self, row):
+        return EntityView(self, row)
+
+    def at(self, x, y):
+        """Rows of the entities on a cell."""
+        if self.cells is not None:
+            return list(self.cells.get((x, y), ()))
+        xs, ys = self.x, self.y
+        return [row for row in self.rows() if xs[row] == x and ys[row] == y]
+
+    def first_at(self, x, y, **values):
+        """The first row on a cell whose columns hold the given values; None if there is none."""
+        rows = self.cells.get((x, y)) if self.cells is not None else self.at(x, y)
+        if not rows:
+            return None  # Most cells hold nothing, so skip the matching
+        columns = self.columns
+        for row in rows:
+            if all(columns[name][row] == value for name, value in values.items()):
+                return row
+        return None
+
+    def move(self, steps, passable, choices, rng):
+        """Move every entity one step, in one pass.
+
+        Entities on a cell of steps (cell -> next cell, e.g. a flow field
+        toward the player) take that step. The rest try a random step
+        from choices and stay put if passable(x, y) says no. Not for
+        indexed stores, whose cell lookup would go stale.
+        """
+        # Work on lists and write them back at the end: reading and writing
+        # array items one at a time is several times slower than list items
+        xs, ys = self.x.tolist(), self.y.tolist()
+        get = steps.get
+        choice = rng.choice
+        for row in self.rows():
+            x = xs[row]
+            y = ys[row]
+            step = get((x, y))
+            if step is None:
+                dx, dy = choice(choices)
+                if not passable(x + dx, y + dy):
+                    continue
+                xs[row] = x + dx
+                ys[row] = y + dy
+            else:
+                xs[row], ys[row] = step
+        self.x[:] = array(self.x.typecode, xs)
+        self.y[:] = array(self.y.typecode, ys)
+
+    def damage(self, rows, amount):
+        """Hit each row (once) for amount less its defense, never below zero."""
+        health = self.columns['health']
+        defense = self.columns['defense']
+        if np is not None and len(rows) >= NUMPY_MIN_ROWS:
+            index = np.asarray(rows)
+            health_array = np.frombuffer(health, dtype=health.typecode)
+            health_array[index] -= np.maximum(amount - np.frombuffer(defense, dtype=defense.typecode)[index], 0)
+            return
+        for row in rows:
+            hit = amount - defense[row]
+            if hit > 0:
+                health[row] -= hit
+
+    def sweep(self):
+        """Remove every entity at 0 health or below; return their rows."""
+        health = self.columns['health']
+        if np is not None and len(self.alive) >= NUMPY_MIN_ROWS:
+            alive = np.frombuffer(self.alive, dtype=np.uint8)
+            dead = np.flatnonzero((np.frombuffer(health, dtype=health.typecode) <= 0) & (alive != 0))
+            if self.cells is None:
+                alive[dead] = 0  # Nothing else to update, so skip remove()
+                dead = dead.tolist()
+                self.free.extend(dead)
+                self.count -= len(dead)
+                return dead
+            dead = dead.tolist()
+        else:
+            dead = [row for row in self.rows() if health[row] <= 0]
+        for row in dead:
+            self.remove(row)
+        return dead
+
+    def nbytes(self):
+        """Bytes held by the columns, for comparing with one object per entity."""
+        return (sum(column.itemsize * len(column) for column in self.columns.values())
+                + self.kind.itemsize * len(self.kind) + len(self.alive))
+
+
+class EntityView:
+    """One row of an EntityStore, read and written like an object's attributes."""
+
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store, row):
+        object.__setattr__(self, 'store', store)
+        object.__setattr__(self, 'row', row)
+
+    def __getattr__(self, name):
+        try:
+            return self.store.columns[name][self.row]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        try:
+            self.store.columns[name][self.row] = value
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @property
+    def kind(self):
+        return self.store.kind_of(self.row)
+
+    def __eq__(self, other):
+        return isinstance(other, EntityView) and other.store is self.store and other.row == self.row
+
+    def __hash__(self):
+        return hash((id(self.store), self.row))
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={column[self.row]}" for name, column in self.store.columns.items())
+        return f"EntityView({self.kind}, {fields})"
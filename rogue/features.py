@@ -0,0 +1,76 @@
+"""Index of the fixed features of a floor: stairs, doors, traps.
+
+Features never move, so unlike entities (see rogue.spatial and
+rogue.entities) they need no re-filing as turns go by, only when the
+floor itself changes. A floor builds its index as it is generated, and
+whatever changes a feature afterwards (opening a door, springing a trap)
+goes through the index, so checking what the player stepped on is one
+dictionary lookup instead of a look at the grid or a scan over it.
+
+A cell has at most one feature. Kinds are whatever the game uses to
+tell them apart; the deliverables use the glyph the feature is drawn
+with, so a grid can be indexed straight from its tiles with scan().
+"""
+
+
+class Feature:
+    """Something fixed to a cell, with room for whatever the game keeps about it."""
+
+    __slots__ = ('kind', 'x', 'y', 'data')
+
+    def __init__(self, kind, x, y, data=None):
+        self.kind = kind
+        self.x = x
+        self.y = y
+        self.data = data  # E.g. where stairs lead or whether a trap has gone off
+
+    def __repr__(self):
+        return f"Feature({self.kind!r}, {self.x}, {self.y}, {self.data!r})"
+
+
+class FeatureIndex:
+    """Map (x, y) cells to the Feature on them."""
+
+    def __init__(self):
+        self.cells = {}
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        return iter(self.cells.values())
+
+    def __contains__(self, cell):
+        return cell in self.cells
+
+    def add(self, kind, x, y, data=None):
+        """Put a feature on a cell, replacing any already there, and return it."""
+        feature = self.cells[(x, y)] = Feature(kind, x, y, data)
+        return feature
+
+    def remove(self, x, y):
+        """Take the feature off a cell and return it, or None if there was none."""
+        return self.cells.pop((x, y), None)
+
+    def at(self, x, y):
+        """Return the feature on a cell, or None."""
+        return self.cells.get((x, y))
+
+    def kind_at(self, x, y):
+        """Return the kind of feature on a cell, or None."""
+        feature = self.cells.get((x, y))
+        return None if feature is None else feature.kind
+
+    def of_kind(self, kind):
+        """Return every feature of one kind (a pass over them all, so not for every turn)."""
+        return [feature for feature in self.cells.values() if feature.kind == kind]
+
+    def scan(self, grid, kinds):
+        """Add a feature for every cell of the grid whose tile is one of kinds."""
+        kinds = frozenset(kinds)
+        for y, row in enumerate(grid):
+            if kinds.isdisjoint(row):
+                continue
+            for x, tile in enumerate(row):
+                if tile in kinds:
+                    self.add(tile, x, y)
@@ -0,0 +1,135 @@
+"""Lazily generated, seeded dungeon floors kept in a bounded LRU cache.
+
+Every floor has its own seed derived from the run seed and its depth, so
+a floor is only generated the first time the player reaches it and always
+comes out the same. The most recently visited floors stay live; older
+ones are packed into compressed bytes and unpacked exactly as they were
+left when the player comes back, monsters and dropped items included.
+
+Given an executor (a one-thread ThreadPoolExecutor, say), the store can
+also generate floors before they are needed: prefetch(depth) starts the
+work in the background, and get(depth) then takes the finished floor, or
+waits for the rest of it, instead of generating the floor on the spot.
+The floor comes from the same per-floor seed either way, so it does not
+matter when or where it was built. A ProcessPoolExecutor works too, if
+the factory and its floors can be pickled.
+"""
+import pickle
+import random
+import time
+import zlib
+from collections import OrderedDict
+
+FLOOR_CACHE_SIZE = 4  # Live floors kept before older ones are packed
+
+
+def floor_seed(seed, depth):
+    """Derive a stable per-floor seed from the run seed and the depth."""
+    return random.Random(f"{seed}/{depth}").getrandbits(64)
+
+
+def timed_build(factory, depth, seed):
+    """Build a floor and return it with the seconds that took (runs on the executor)."""
+    start = time.perf_counter()
+    floor = factory(depth, random.Random(seed))
+    return floor, time.perf_counter() - start
+
+
+class FloorStore:
+    """Hand out floors by depth, generating each one on its first visit.
+
+    factory(depth, rng) builds a new floor using only the given
+    random.Random, which is seeded from floor_seed().
+    """
+
+    def __init__(self, seed, factory, capacity=FLOOR_CACHE_SIZE, saved=None, executor=None):
+        self.seed = seed
+        self.factory = factory
+        self.capacity = capacity
+        self.live = OrderedDict()  # depth -> floor, least recently used first
+        self.packed = {}  # depth -> zlib-compressed pickle of an evicted floor
+        self.saved = saved  # Floors loaded from a save but not visited yet: supports pop(depth, None)
+        self.executor = executor  # Builds prefetched floors; None turns prefetch() off
+        self.pending = {}  # depth -> Future of (floor, seconds) from prefetch()
+        self.generated = 0
+        self.restored = 0
+        self.evicted = 0
+        self.prefetch_hits = 0  # Prefetched floors that were ready when asked for
+        self.prefetch_waits = 0  # ... that were still being built
+        self.prefetch_misses = 0  # Floors generated on the spot
+        self.hidden = 0.0  # Seconds of generation done in the background
+        self.stalled = 0.0  # Seconds get() spent generating or waiting
+
+    def __contains__(self, depth):
+        return depth in self.live or depth in self.packed or (self.saved is not None and depth in self.saved)
+
+    def __len__(self):
+        return len(self.live) + len(self.packed) + (len(self.saved) if self.saved is not None else 0)
+
+    def __getitem__(self, depth):
+        return self.get(depth)
+
+    def get(self, depth):
+        """Return the floor at a depth, generating or unpacking it if needed."""
+        floor = self.live.get(depth)
+        if floor is not None:
+            self.live.move_to_end(depth)
+            return floor
+        blob = self.packed.pop(depth, None)
+        if blob is not None:
+            floor = pickle.loads(zlib.decompress(blob))
+            self.restored += 1
+        elif self.saved is not None and depth in self.saved:
+            floor = self.saved.pop(depth)
+            self.restored += 1
+        elif depth in self.pending:
+            future = self.pending.pop(depth)
+            ready = future.done()
+            start = time.perf_counter()
+            floor, seconds = future.result()
+            waited = time.perf_counter() - start
+            if ready:
+                self.prefetch_hits += 1
+            else:
+                self.prefetch_waits += 1
+            self.hidden += max(0.0, seconds - waited)
+            self.stalled += waited
+            self.generated += 1
+        else:
+            floor, seconds = timed_build(self.factory, depth, floor_seed(self.seed, depth))
+            self.prefetch_misses += 1
+            self.stalled += seconds
+            self.generated += 1
+        self.live[depth] = floor
+        self.shrink()
+        return floor
+
+    def prefetch(self, *depths):
+        """Start building the floors at these depths in the background, if not already there."""
+        if self.executor is None:
+            return
+        for depth in depths:
+            if depth not in self and depth not in self.pending:
+                self.pending[depth] = self.executor.submit(timed_build, self.factory, depth,
+                                                           floor_seed(self.seed, depth))
+
+    def shrink(self):
+        """Pack the least recently used floors until the live set fits."""
+        while len(self.live) > self.capacity:
+            depth, floor = self.live.popitem(last=False)
+            self.packed[depth] = zlib.compress(pickle.dumps(floor, pickle.HIGHEST_PROTOCOL))
+            self.evicted += 1
+
+    def packed_bytes(self):
+        """Total size of all packed floors."""
+        return sum(len(blob) for blob in self.packed.values())
+
+    def report(self):
+        """One line on how many new floors were prefetched and the time that saved."""
+        asked = self.prefetch_hits + self.prefetch_waits + self.prefetch_misses
+        if not asked:
+            return "No floors generated."
+        return (f"Floors generated: {asked}, prefetched and ready {self.prefetch_hits} "
+                f"({100 * self.prefetch_hits / asked:.0f}% hit rate), still building {self.prefetch_waits}, "
+                f"generated on the spot {self.prefetch_misses}. "
+                f"Hidden {1000 * self.hidden:.1f}ms, stalled {1000 * self.stalled:.1f}ms.")
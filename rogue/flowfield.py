@@ -0,0 +1,61 @@
+"""Shared flow field: one breadth-first search toward the player per move.
+
+Instead of every monster searching for its own path, a single search
+spreads out from the player and records, for every cell it reaches, the
+neighbouring cell one step closer to them. A chasing monster then only
+looks up the cell it stands on, so pathfinding costs the same whether one
+monster is chasing or a thousand are. Steps all cost the same, which
+makes the search a plain layered breadth-first search (Dijkstra with unit
+weights).
+
+The search stops `radius` steps out, so its cost depends on that radius
+rather than the size of the map, and it is only redone when the target
+moves or the floor's tiles change.
+"""
+FLOW_RADIUS = 10  # How many steps from the target the field reaches
+
+
+class FlowField:
+    """Next steps toward one target for every cell within radius of it."""
+
+    def __init__(self, radius=FLOW_RADIUS):
+        self.radius = radius
+        self.key = None  # (x, y, passable, revision) the field was built for
+        self.steps = {}  # cell -> neighbouring cell one step closer to the target
+        self.distance = {}  # cell -> steps to the target
+        self.builds = 0
+
+    def toward(self, x, y, passable, revision=None):
+        """Return the steps map toward (x, y), rebuilding it only if stale.
+
+        passable(x, y) says whether a cell can be walked through; it is
+        part of the cache key, so a bound method such as floor.is_walkable
+        also tells floors apart. revision should change whenever the
+        floor's tiles do.
+        """
+        key = (x, y, passable, revision)
+        if key != self.key:
+            self.build(x, y, passable)
+            self.key = key
+        return self.steps
+
+    def build(self, x, y, passable):
+        """Search outwards from (x, y), one ring of equal distance at a time."""
+        steps = {}
+        distance = {(x, y): 0}
+        frontier = [(x, y)]
+        for ring in range(1, self.radius + 1):
+            reached = []
+            for cell in frontier:
+                cx, cy = cell
+                for neighbour in ((cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+                    if neighbour not in distance and passable(*neighbour):
+                        distance[neighbour] = ring
+                        steps[neighbour] = cell
+                        reached.append(neighbour)
+            if not reached:
+                break
+            frontier = reached
+        self.steps = steps
+        self.distance = distance
+        self.builds += 1
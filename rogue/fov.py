@@ -0,0 +1,98 @@
+"""Field of view by recursive shadowcasting, cached per position.
+
+shadowcast() scans the eight octants around the viewer row by row,
+narrowing the range of slopes it can still see each time it runs into
+something that blocks sight, and stops at the view radius. It only ever
+looks at cells within that radius, so its cost depends on the radius and
+not on the size of the map.
+
+FieldOfView remembers recent results by (depth, position, floor
+revision), so standing still or walking back over the same cells costs a
+dictionary lookup. When it does compute a view it also marks those cells
+as explored on the floor, which is what renderers use to draw the parts of
+the map the player has seen before.
+"""
+from collections import OrderedDict
+
+FOV_RADIUS = 8
+FOV_CACHE_SIZE = 128  # Views remembered per FieldOfView
+
+# (xx, xy, yx, yy) multipliers taking octant coordinates to map offsets
+OCTANTS = ((1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+           (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1))
+
+
+def shadowcast(x, y, radius, blocks_sight):
+    """Return the set of cells visible from (x, y).
+
+    blocks_sight(x, y) says whether a cell stops the view. Cells that block
+    sight are themselves visible, so walls show up around a room.
+    """
+    visible = {(x, y)}
+    for xx, xy, yx, yy in OCTANTS:
+        _cast(x, y, 1, 1.0, 0.0, radius, xx, xy, yx, yy, blocks_sight, visible)
+    return visible
+
+
+def _cast(cx, cy, row, start, end, radius, xx, xy, yx, yy, blocks_sight, visible):
+    """Scan one octant from `row` outwards between two slopes."""
+    if start < end:
+        return
+    radius_squared = radius * radius
+    for distance in range(row, radius + 1):
+        dx = -distance - 1
+        dy = -distance
+        blocked = False
+        new_start = start
+        while dx <= 0:
+            dx += 1
+            x = cx + dx * xx + dy * xy
+            y = cy + dx * yx + dy * yy
+            left_slope = (dx - 0.5) / (dy + 0.5)
+            right_slope = (dx + 0.5) / (dy - 0.5)
+            if start < right_slope:
+                continue
+            if end > left_slope:
+                break
+            if dx * dx + dy * dy < radius_squared:
+                visible.add((x, y))
+            if blocked:
+                if blocks_sight(x, y):
+                    new_start = right_slope
+                    continue
+                blocked = False
+                start = new_start
+            elif blocks_sight(x, y) and distance < radius:
+                # The rest of this octant is in shadow; scan what is left above it
+                blocked = True
+                _cast(cx, cy, distance + 1, start, left_slope, radius, xx, xy, yx, yy, blocks_sight, visible)
+                new_start = right_slope
+        if blocked:
+            break
+
+
+class FieldOfView:
+    """What the player can see, remembered for recently visited cells."""
+
+    def __init__(self, radius=FOV_RADIUS, capacity=FOV_CACHE_SIZE):
+        self.radius = radius
+        self.capacity = capacity
+        self.cache = OrderedDict()  # (depth, x, y, revision) -> frozenset of visible cells
+        self.hits = 0
+        self.misses = 0
+
+    def visible(self, floor, x, y):
+        """Return the cells visible from (x, y), marking them explored on the floor."""
+        key = (floor.depth, x, y, floor.revision)
+        cells = self.cache.get(key)
+        if cells is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return cells
+        self.misses += 1
+        cells = frozenset(shadowcast(x, y, self.radius, floor.blocks_sight))
+        floor.explore(cells)
+        self.cache[key] = cells
+        if len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+        return cells
@@ -0,0 +1,111 @@
+"""Free-cell index: O(1) uniform sampling of unoccupied cells by tile class.
+
+Spawning used to draw random coordinates until one landed on a usable
+cell, which takes unbounded time on sparse maps and never returns when no
+such cell exists. FreeCellIndex keeps, for each tile class it tracks, the
+cells of that class that nothing occupies. Cells are added when they are
+carved, removed when something takes them, and handed out uniformly at
+random in constant time.
+"""
+
+
+class NoFreeCellError(LookupError):
+    """Raised when a tile class has no free cell left to hand out."""
+
+
+class FreeCells:
+    """A set of cells with O(1) add, discard and uniform random choice.
+
+    Cells live in a dense list; a dict remembers each cell's slot so a cell
+    can be removed by swapping the last one into its place.
+    """
+
+    def __init__(self, cells=()):
+        self.cells = []
+        self.slots = {}
+        for cell in cells:
+            self.add(cell)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return cell in self.slots
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def add(self, cell):
+        if cell not in self.slots:
+            self.slots[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell):
+        slot = self.slots.pop(cell, None)
+        if slot is None:
+            return
+        last = self.cells.pop()
+        if slot < len(self.cells):
+            self.cells[slot] = last
+            self.slots[last] = slot
+
+    def choice(self, rng):
+        """Return a uniformly random cell without removing it."""
+        if not self.cells:
+            raise NoFreeCellError("no free cell left")
+        return self.cells[int(rng.random() * len(self.cells))]
+
+    def take(self, rng):
+        """Remove and return a uniformly random cell (sampling without replacement)."""
+        cell = self.choice(rng)
+        self.discard(cell)
+        return cell
+
+
+class FreeCellIndex:
+    """Free cells grouped by the tile they are made of.
+
+    Only the tile classes passed in are tracked, so a floor can ask for
+    free room floor without paying to index every cell of solid rock.
+    """
+
+    def __init__(self, tiles):
+        self.classes = {tile: FreeCells() for tile in tiles}
+
+    def __getitem__(self, tile):
+        return self.classes[tile]
+
+    def carved(self, x, y, old_tile, new_tile):
+        """Move a cell between classes after its tile changed."""
+        free = self.classes.get(old_tile)
+        if free is not None:
+            free.discard((x, y))
+        free = self.classes.get(new_tile)
+        if free is not None:
+            free.add((x, y))
+
+    def occupy(self, x, y, tile):
+        """Mark a cell as taken by something standing on it."""
+        free = self.classes.get(tile)
+        if free is not None:
+            free.discard((x, y))
+
+    def release(self, x, y, tile):
+        """Mark a cell as free again once nothing stands on it."""
+        free = self.classes.get(tile)
+        if free is not None:
+            free.add((x, y))
+
+    def choice(self, tile, rng):
+        """Return a random free cell of a tile class, leaving it free."""
+        try:
+            return self.classes[tile].choice(rng)
+        except NoFreeCellError:
+            raise NoFreeCellError(f"no free {tile!r} cell left") from None
+
+    def take(self, tile, rng):
+        """Return a random free cell of a tile class and mark it taken."""
+        try:
+            return self.classes[tile].take(rng)
+        except NoFreeCellError:
+            raise NoFreeCellError(f"no free {tile!r} cell left") from None
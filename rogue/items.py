@@ -0,0 +1,132 @@
+"""Item kinds compiled from a table, and an inventory that stacks them.
+
+Games describe their items in a table shaped like MONSTER_TYPES:
+
+    ITEM_TABLE = {
+        'potion_heal': {'category': 'potion', 'glyph': 'H',
+                        'effect': ('health', 20), 'message': "Health restored."},
+        'gold_coin': {'category': 'treasure'},
+    }
+
+ItemCatalog turns each name into a small integer id, in table order, and
+keeps everything else in lists indexed by that id: the glyph, the category
+id and the effect. Using an item is then one list lookup and one call
+instead of a chain of string comparisons, however many kinds there are.
+An effect adds its amount to the named player stat; an item without one
+does nothing when used.
+
+Inventory holds a stack per kind, each in a numbered slot. Picking up
+something already carried adds to its stack, and anything else takes a
+free slot: the lowest at first, then whichever was emptied last. Slots
+keep their number while other stacks come and go, so the number the
+player presses for an item stays the same. Every operation is O(1)
+in the number of slots and kinds: a dict finds the slot of a kind, and
+each category keeps its own set of slots.
+"""
+DEFAULT_GLYPH = '*'
+DEFAULT_CATEGORY = 'misc'
+
+
+class ItemCatalog:
+    """Integer ids, glyphs, categories and effects for every kind in a table."""
+
+    def __init__(self, table, default_glyph=DEFAULT_GLYPH):
+        self.names = list(table)
+        self.ids = {name: item_id for item_id, name in enumerate(self.names)}
+        self.categories = list(dict.fromkeys(row.get('category', DEFAULT_CATEGORY) for row in table.values()))
+        self.category_ids = {category: number for number, category in enumerate(self.categories)}
+        self.category = [self.category_ids[row.get('category', DEFAULT_CATEGORY)] for row in table.values()]
+        self.glyphs = [row.get('glyph', default_glyph) for row in table.values()]
+        self.effects = [compile_effect(row) for row in table.values()]  # Dispatch list: id -> effect or None
+
+    def __len__(self):
+        return len(self.names)
+
+    def use(self, item_id, player):
+        """Apply an item's effect to player and return its message ('' if it has none)."""
+        effect = self.effects[item_id]
+        return effect(player) if effect is not None else ''
+
+
+def compile_effect(row):
+    """A function applying a table row's effect to a player, or None."""
+    if 'effect' not in row:
+        return None
+    stat, amount = row['effect']
+    message = row.get('message', '')
+
+    def apply(player):
+        setattr(player, stat, getattr(player, stat) + amount)
+        return message
+    return apply
+
+
+class Inventory:
+    """Stacks of items in a fixed number of slots, found by slot, kind or category."""
+
+    def __init__(self, catalog, capacity):
+        self.catalog = catalog
+        self.capacity = capacity
+        self.kinds = [None] * capacity  # Slot -> item id, None while empty
+        self.counts = [0] * capacity
+        self.slot_of = {}  # Item id -> slot
+        self.free = list(range(capacity - 1, -1, -1))  # Empty slots, popped from the end
+        self.by_category = [{} for _ in catalog.categories]  # Category id -> slots, as an ordered set
+
+    def __len__(self):
+        """Number of stacks (occupied slots)."""
+        return len(self.slot_of)
+
+    def __iter__(self):
+        """(slot, name, count) for each stack, in slot order."""
+        names = self.catalog.names
+        for slot, item_id in enumerate(self.kinds):
+            if item_id is not None:
+                yield slot, names[item_id], self.counts[slot]
+
+    def add(self, item_id):
+        """Add one item to its stack or a free slot; return False if no slot is free."""
+        slot = self.slot_of.get(item_id)
+        if slot is None:
+            if not self.free:
+                return False
+            slot = self.free.pop()
+            self.kinds[slot] = item_id
+            self.slot_of[item_id] = slot
+            self.by_category[self.catalog.category[item_id]][slot] = None
+        self.counts[slot] += 1
+        return True
+
+    def take(self, slot):
+        """Remove one item from a slot and return its id, or None if the slot is empty."""
+        item_id = self.kinds[slot]
+        if item_id is None:
+            return None
+        self.counts[slot] -= 1
+        if not self.counts[slot]:
+            self.kinds[slot] = None
+            del self.slot_of[item_id]
+            del self.by_category[self.catalog.category[item_id]][slot]
+            self.free.append(slot)
+        return item_id
+
+    def use(self, slot, player):
+        """Use one item from a slot on player and return the message ('' for an empty slot)."""
+        item_id = self.take(slot)
+        return '' if item_id is None else self.catalog.use(item_id, player)
+
+    def find(self, name):
+        """The slot holding a kind, by name, or None."""
+        return self.slot_of.get(self.catalog.ids[name])
+
+    def first(self, category):
+        """The slot of a category's longest-held stack, or None."""
+        slots = self.by_category[self.catalog.category_ids[category]]
+        return next(iter(slots), None)
+
+    def count(self, name):
+        slot = self.find(name)
+        return 0 if slot is None else self.counts[slot]
+
+    def clear(self):
+        self.__init__(self.catalog, self.capacity)
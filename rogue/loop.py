@@ -0,0 +1,75 @@
+"""Event-driven main loop for the curses deliverables.
+
+The deliverables used to wake every 100 ms, clear the screen and paint it
+again whether or not anything had happened. InputLoop instead blocks in
+getch() until a key arrives or the next timed update is due (curses waits
+with select() on the terminal underneath), and tells the caller to redraw
+only after a key or an update changed something. Timed updates, such as
+wandering monsters, run from a FrameScheduler at whatever rate the game
+asks for.
+
+LoopStats keeps count of frames drawn and CPU used so the difference can
+be seen: report() gives frames per second and the share of wall time
+spent on the CPU, which for a player sitting idle is the idle cost.
+"""
+import math
+import time
+
+from rogue.scheduler import FrameScheduler
+
+TICK_RATE = 10  # Timed updates per second unless a game asks for another rate
+
+
+class LoopStats:
+    """Frames, wakeups and CPU time since the loop started."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.cpu_started = time.process_time()
+        self.frames = 0
+        self.wakeups = 0  # Times getch() returned, for a key or for a timed update
+        self.keys = 0
+
+    def report(self):
+        wall = max(time.monotonic() - self.started, 1e-9)
+        cpu = time.process_time() - self.cpu_started
+        return (f"{self.frames} frames in {wall:.1f}s ({self.frames / wall:.1f} fps), "
+                f"{self.wakeups / wall:.1f} wakeups/s, CPU {100 * cpu / wall:.1f}% of wall time")
+
+
+class InputLoop:
+    """Wait for keys and timed updates; redraw only when something changed."""
+
+    def __init__(self, stdscr, scheduler=None):
+        self.stdscr = stdscr
+        self.scheduler = scheduler or FrameScheduler()
+        self.stats = LoopStats()
+        self.dirty = True  # Nothing has been drawn yet
+
+    def every(self, interval, callback):
+        """Run callback() every interval seconds and redraw after it."""
+        def update():
+            callback()
+            self.dirty = True
+        return self.scheduler.every(interval, update)
+
+    def next_key(self):
+        """Block until a key is pressed or an update is due.
+
+        Runs whatever updates are due and returns the key, or -1 when only
+        an update woke the loop up.
+        """
+        timeout = self.scheduler.timeout()
+        self.stdscr.timeout(-1 if timeout is None else math.ceil(timeout * 1000))
+        key = self.stdscr.getch()
+        self.stats.wakeups += 1
+        if key != -1:
+            self.stats.keys += 1
+            self.dirty = True
+        self.scheduler.run_due()
+        return key
+
+    def drew(self):
+        """Note that the screen is up to date."""
+        self.dirty = False
+        self.stats.frames += 1
@@ -0,0 +1,235 @@
+"""Per-phase turn timings: named spans recorded into HDR-style histograms.
+
+Code marks each phase of a turn with a span:
+
+    with profiler.span('render'):
+        draw_everything()
+
+While the profiler is off, span() hands back one shared do-nothing
+context manager, which costs a few hundred nanoseconds: nothing next to
+a keypress or a frame. Code that runs thousands of times a second, like
+engine.step() in a headless replay, checks profiler.enabled first and
+skips the with block entirely. While the profiler is on, every span's
+duration goes into the Histogram for its name, and status() gives the
+p50/p99 of each phase for a one-line display in the game.
+
+Spans are inclusive. A floor generated while the player walks onto the
+stairs counts towards both 'generate' and the phase around it. Spans
+opened on other threads, like a floor prefetched in the background, are
+not recorded: they don't hold up a turn, and a Span is not thread-safe.
+
+Histograms use log-linear buckets like HdrHistogram. Durations under
+128ns get a bucket each, and above that every power of two is split into
+64 buckets. Any percentile is then within about 1.6% of the true value,
+in a fixed 2.6K-entry array, however many samples are recorded.
+
+toggle_cprofile() and toggle_tracemalloc() start a capture on the first
+call and write it to a file on the second, for a closer look at whatever
+the histograms point to.
+"""
+import cProfile
+import os
+import threading
+import time
+import tracemalloc
+from array import array
+from math import ceil
+
+SUB_BUCKET_BITS = 7  # 2**7 exact buckets, then 64 per power of two
+HALF_BUCKETS = 1 << (SUB_BUCKET_BITS - 1)
+MAX_SHIFT = 40  # Durations up to about 2**47 ns (39 hours); longer ones are clamped
+PHASE_ORDER = ('input', 'player', 'combat', 'monsters', 'update', 'generate', 'render')
+DUMP_PREFIX = 'rogue'
+
+
+class Histogram:
+    """Counts of durations in nanoseconds, in log-linear buckets."""
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * (MAX_SHIFT + 2) * HALF_BUCKETS))
+        self.low = len(self.counts)  # Lowest and highest buckets in use, so reading skips the rest
+        self.high = 0
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def record(self, value):
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        if shift > 0:
+            if shift > MAX_SHIFT:
+                shift = MAX_SHIFT
+                value = (2 * HALF_BUCKETS - 1) << shift
+            index = (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+        else:
+            index = value
+        self.counts[index] += 1
+        if index < self.low:
+            self.low = index
+        if index > self.high:
+            self.high = index
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentiles(self, *fractions):
+        """Return the value at each fraction (0.5 for the median), in one pass over the buckets."""
+        if not self.total:
+            return [0] * len(fractions)
+        ranks = sorted((max(1, ceil(fraction * self.total)), position)
+                       for position, fraction in enumerate(fractions))
+        values = [0] * len(fractions)
+        seen = 0
+        wanted = 0
+        for index, count in enumerate(self.counts[self.low:self.high + 1], self.low):
+            if not count:
+                continue
+            seen += count
+            while wanted < len(ranks) and seen >= ranks[wanted][0]:
+                values[ranks[wanted][1]] = min(bucket_top(index), self.max)
+                wanted += 1
+            if wanted == len(ranks):
+                break
+        return values
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0
+
+
+def bucket_top(index):
+    """The highest duration that lands in bucket index."""
+    if index < 2 * HALF_BUCKETS:
+        return index
+    shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+    return ((index - (shift << (SUB_BUCKET_BITS - 1))) << shift) + (1 << shift) - 1
+
+
+def format_duration(nanoseconds):
+    if nanoseconds < 1000:
+        return f"{nanoseconds}ns"
+    if nanoseconds < 10_000:
+        return f"{nanoseconds / 1000:.1f}us"
+    if nanoseconds < 1_000_000:
+        return f"{nanoseconds / 1000:.0f}us"
+    if nanoseconds < 1_000_000_000:
+        return f"{nanoseconds / 1_000_000:.1f}ms"
+    return f"{nanoseconds / 1_000_000_000:.2f}s"
+
+
+class Span:
+    """Times one phase into a histogram; reused for every turn."""
+
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.started = 0
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info):
+        self.histogram.record(time.perf_counter_ns() - self.started)
+
+
+class NullSpan:
+    """What span() returns while profiling is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Profiler:
+    """Named phase histograms that cost next to nothing while switched off."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.spans = {}  # name -> Span, each holding its Histogram
+        self.notice = ''  # Last message from a capture, shown by status()
+        self.cprofile = None
+        self.dumps = 0
+        self.thread = threading.main_thread().ident  # The thread that plays the turns
+
+    def span(self, name):
+        if not self.enabled or threading.get_ident() != self.thread:
+            return NULL_SPAN
+        span = self.spans.get(name)
+        if span is None:
+            span = self.spans[name] = Span(Histogram())
+        return span
+
+    def toggle(self):
+        """Switch recording on with empty histograms, or off."""
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.spans.clear()
+        self.notice = ''
+        return self.enabled
+
+    def phases(self):
+        """Names with samples, in turn order, then any others alphabetically."""
+        order = {name: position for position, name in enumerate(PHASE_ORDER)}
+        return sorted((name for name, span in self.spans.items() if span.histogram.total),
+                      key=lambda name: (order.get(name, len(order)), name))
+
+    def status(self, width=None):
+        """One line with the p50/p99 of each phase, or '' when there is nothing to show."""
+        parts = [self.notice] if self.notice else []
+        if self.enabled:
+            parts.append('p50/p99')
+            for name in self.phases():
+                p50, p99 = self.spans[name].histogram.percentiles(0.5, 0.99)
+                parts.append(f"{name} {format_duration(p50)}/{format_duration(p99)}")
+        line = '  '.join(parts)
+        return line if width is None else line[:width]
+
+    def report(self):
+        """A table of every phase recorded, for printing after the game."""
+        lines = [f"{'phase':10} {'count':>8} {'mean':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}"]
+        for name in self.phases():
+            histogram = self.spans[name].histogram
+            p50, p90, p99 = histogram.percentiles(0.5, 0.9, 0.99)
+            lines.append(f"{name:10} {histogram.total:>8} " + ' '.join(
+                f"{format_duration(value):>8}" for value in (round(histogram.mean()), p50, p90, p99, histogram.max)))
+        return '\n'.join(lines)
+
+    def dump_path(self, extension):
+        self.dumps += 1
+        return f"{DUMP_PREFIX}-{os.getpid()}-{self.dumps}.{extension}"
+
+    def toggle_cprofile(self):
+        """Start a cProfile capture, or stop it and write the stats file; return a message."""
+        if self.cprofile is None:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+            self.notice = "cProfile running"
+        else:
+            self.cprofile.disable()
+            path = self.dump_path('prof')
+            self.cprofile.dump_stats(path)
+            self.cprofile = None
+            self.notice = f"cProfile stats written to {path}"
+        return self.notice
+
+    def toggle_tracemalloc(self):
+        """Start tracing allocations, or stop and write a snapshot; return a message."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.notice = "tracemalloc running"
+        else:
+            path = self.dump_path('tracemalloc')
+            tracemalloc.take_snapshot().dump(path)
+            tracemalloc.stop()
+            self.notice = f"tracemalloc snapshot written to {path}"
+        return self.notice
+
+
+profiler = Profiler()  # Shared by the engine and the games; off until someone turns it on
@@ -0,0 +1,49 @@
+"""Incremental curses rendering that only repaints what changed."""
+import curses
+
+
+class DirtyRenderer:
+    """Draw whole frames, but only send the changed parts of each row.
+
+    A frame is a list of strings, one per screen row starting at row 0.
+    The renderer remembers the last frame it drew and, for every row that
+    differs, writes just the span between the first and last changed
+    column. Nothing reaches the terminal until the end of draw(), where a
+    single noutrefresh()/doupdate() pair flushes the batch.
+    """
+
+    def __init__(self, stdscr):
+        self.stdscr = stdscr
+        self.previous = []
+
+    def invalidate(self):
+        """Forget the last frame, e.g. after another screen drew over ours."""
+        self.stdscr.erase()
+        self.previous = []
+
+    def draw(self, rows):
+        """Draw a frame and flush it to the terminal."""
+        previous = self.previous
+        drawn = []
+        for y, row in enumerate(rows):
+            old = previous[y] if y < len(previous) else ''
+            if len(row) < len(old):
+                # Blank out whatever the old, longer row left behind
+                row = row.ljust(len(old))
+            drawn.append(row)
+            if row == old:
+                continue
+            start = 0
+            end = len(row)
+            limit = min(len(row), len(old))
+            while start < limit and row[start] == old[start]:
+                start += 1
+            while end > start and end <= len(old) and row[end - 1] == old[end - 1]:
+                end -= 1
+            self.stdscr.addstr(y, start, row[start:end])
+        for y in range(len(rows), len(previous)):
+            self.stdscr.move(y, 0)
+            self.stdscr.clrtoeol()
+        self.previous = drawn
+        self.stdscr.noutrefresh()
+        curses.doupdate()
@@ -0,0 +1,170 @@
+"""Record games as a seed plus a command journal, and replay them headless.
+
+The engine draws every random number from the game's seed, so a seed and
+the list of commands fed to step() pin a game down completely. A Journal
+stores exactly that: a short header and one byte per command, compressed.
+That is enough to reproduce a player's bug report or to profile a real
+session offline.
+
+A Replayer runs a journal through the engine without any terminal and
+keeps a keyframe (a pickled GameState) every `interval` commands. Seeking
+to any position starts from the nearest keyframe at or before it, so it
+never replays more than `interval` commands however long the game was.
+
+Positions count commands: position n is the state after the first n
+commands of the journal.
+"""
+import pickle
+import struct
+import zlib
+
+from rogue import engine
+from rogue.savefile import FLOOR_CLASSES, Reader, pack_string
+
+MAGIC = b'RGJN'
+JOURNAL_VERSION = 1
+KEYFRAME_INTERVAL = 500  # Commands between replay keyframes
+
+HEADER = struct.Struct('<4sHqIII')  # magic, version, seed, width, height, command count
+
+# One byte per command: the moves and waiting, or USE_CODE + inventory index
+COMMAND_CODES = {engine.LEFT: 0, engine.RIGHT: 1, engine.UP: 2, engine.DOWN: 3, engine.WAIT: 4}
+USE_CODE = 16
+CODE_COMMANDS = {code: command for command, code in COMMAND_CODES.items()}
+
+
+class JournalError(ValueError):
+    """Raised when a file is not a journal this version can read."""
+
+
+def encode_command(command):
+    code = COMMAND_CODES.get(command) if type(command) is str else None
+    if code is not None:
+        return code
+    if type(command) is tuple and command[0] == engine.USE and 0 <= command[1] < 256 - USE_CODE:
+        return USE_CODE + command[1]
+    raise ValueError(f"cannot record command {command!r}")
+
+
+def decode_command(code):
+    if code >= USE_CODE:
+        return (engine.USE, code - USE_CODE)
+    try:
+        return CODE_COMMANDS[code]
+    except KeyError:
+        raise JournalError(f"unknown command code {code}") from None
+
+
+class Journal:
+    """The seed and settings of a game and every command fed to it."""
+
+    def __init__(self, seed, width=engine.DUNGEON_WIDTH, height=engine.DUNGEON_HEIGHT, floor_class=engine.Floor):
+        if not isinstance(seed, int):
+            raise ValueError("only games with an integer seed can be recorded")
+        if FLOOR_CLASSES.get(floor_class.__name__) is not floor_class:
+            raise ValueError(f"cannot record games on floors of type {floor_class.__name__}")
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.floor_class = floor_class
+        self.codes = bytearray()
+
+    def __len__(self):
+        return len(self.codes)
+
+    def new_game(self):
+        """Return the game as it was before the first command."""
+        return engine.new_game(self.seed, self.width, self.height, self.floor_class)
+
+    def record(self, command):
+        self.codes.append(encode_command(command))
+
+    def commands(self):
+        return [decode_command(code) for code in self.codes]
+
+    def dumps(self):
+        return (HEADER.pack(MAGIC, JOURNAL_VERSION, self.seed, self.width, self.height, len(self.codes))
+                + pack_string(self.floor_class.__name__) + zlib.compress(bytes(self.codes), 9))
+
+    def save(self, path):
+        with open(path, 'wb') as out:
+            out.write(self.dumps())
+
+    @classmethod
+    def loads(cls, data):
+        reader = Reader(data)
+        try:
+            magic, version, seed, width, height, count = reader.read(HEADER)
+            if magic != MAGIC:
+                raise JournalError("not a journal")
+            if version != JOURNAL_VERSION:
+                raise JournalError(f"journal version {version} is not supported (expected {JOURNAL_VERSION})")
+            floor_class = FLOOR_CLASSES.get(reader.string())
+            codes = zlib.decompress(data[reader.offset:])
+        except (struct.error, UnicodeDecodeError, zlib.error) as error:
+            raise JournalError(f"damaged journal: {error}") from None
+        if floor_class is None:
+            raise JournalError("journal names an unknown floor type")
+        if len(codes) != count:
+            raise JournalError(f"journal holds {len(codes)} commands, header says {count}")
+        journal = cls(seed, width, height, floor_class)
+        journal.codes = bytearray(codes)
+        return journal
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as journal_file:
+            return cls.loads(journal_file.read())
+
+
+class Recorder:
+    """Play a game through step() while writing every command to a journal."""
+
+    def __init__(self, seed=None, width=engine.DUNGEON_WIDTH, height=engine.DUNGEON_HEIGHT, floor_class=engine.Floor):
+        self.state = engine.new_game(seed, width, height, floor_class)
+        self.journal = Journal(self.state.seed, width, height, floor_class)
+
+    def step(self, command):
+        self.journal.record(command)
+        return engine.step(self.state, command)
+
+
+class Replayer:
+    """Re-run a journal headless, keeping keyframes to seek quickly."""
+
+    def __init__(self, journal, interval=KEYFRAME_INTERVAL):
+        self.journal = journal
+        self.interval = interval
+        self.commands = journal.commands()
+        self.keyframes = {0: snapshot(journal.new_game())}  # position -> pickled GameState
+        self.steps = 0  # Commands executed so far, across all seeks
+
+    def __len__(self):
+        return len(self.commands)
+
+    def state_at(self, position):
+        """Return a fresh GameState after the first `position` commands."""
+        if not 0 <= position <= len(self.commands):
+            raise IndexError(f"position {position} is outside the journal (0 to {len(self.commands)})")
+        start = position - position % self.interval
+        while start not in self.keyframes:
+            start -= self.interval  # That keyframe hasn't been reached yet; fill in from an earlier one
+        state = pickle.loads(self.keyframes[start])
+        commands = self.commands
+        for index in range(start, position):
+            engine.step(state, commands[index])
+            if (index + 1) % self.interval == 0 and index + 1 not in self.keyframes:
+                self.keyframes[index + 1] = snapshot(state)
+        self.steps += position - start
+        return state
+
+    def run(self):
+        """Replay the whole journal and return the final state."""
+        return self.state_at(len(self.commands))
+
+    def keyframe_bytes(self):
+        return sum(len(keyframe) for keyframe in self.keyframes.values())
+
+
+def snapshot(state):
+    return pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
@@ -0,0 +1,268 @@
+"""Versioned binary save files with one separately addressable section per floor.
+
+Layout, all integers little-endian:
+
+    header       magic b'RGSV', format version, flags
+    game         seed, turn, depth, game-over flag, map size, floor class name
+    names        the monster types and item names the records below refer to by index
+    rng          the state of the game's random.Random
+    player       stats, then one fixed-width record per inventory item
+    floor table  (depth, offset, length) for every saved floor
+    floors       the floor sections, wherever the table says
+
+A floor section is a fixed-size header, the rooms, width * height tile
+bytes, the explored bitset, then fixed-width monster and item records.
+
+load() maps the file into memory and reads everything except the floor
+sections. Each floor is decoded the first time the player reaches it,
+and floors nobody visited are copied straight into the next save without
+being decoded at all.
+"""
+import mmap
+import os
+import pickle
+import struct
+import zlib
+
+from rogue.bsp import BSPFloor, BSPArrayFloor
+from rogue.chunks import ChunkedFloor, LargeFloor
+from rogue.engine import Floor, GameState, Item, Monster, Player, Room
+from rogue.tiles import ArrayFloor
+
+MAGIC = b'RGSV'
+SAVE_VERSION = 1
+
+HEADER = struct.Struct('<4sHH')  # magic, version, flags
+GAME = struct.Struct('<qIiBII')  # seed, turn, depth, over, width, height
+RNG = struct.Struct('<B625IBd')  # generator version, Mersenne Twister state, has gauss_next, gauss_next
+PLAYER = struct.Struct('<iiiiiiiiH')  # x, y, health, max health, attack, defense, level, exp, inventory size
+ITEM = struct.Struct('<Hii')  # name index, x, y
+TABLE_ENTRY = struct.Struct('<iQQ')  # depth, offset, length
+FLOOR_HEADER = struct.Struct('<iIIiiiiIIIQ')  # depth, width, height, stairs up x/y, stairs down x/y,
+                                              # rooms, monsters, items, revision
+ROOM = struct.Struct('<IIII')  # x, y, width, height
+MONSTER = struct.Struct('<HIIiii')  # type index, x, y, health, attack, defense
+COUNT = struct.Struct('<I')
+LENGTH = struct.Struct('<H')
+
+# Floor classes a save can name; anything else cannot be rebuilt
+FLOOR_CLASSES = {cls.__name__: cls for cls in (Floor, ArrayFloor, BSPFloor, BSPArrayFloor, ChunkedFloor, LargeFloor)}
+
+
+class SaveFormatError(ValueError):
+    """Raised when a file is not a save this version can read."""
+
+
+def save(state, path):
+    """Write a game to path, replacing any earlier save only once the new one is complete."""
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as out:
+        out.write(dumps(state))
+    os.replace(temporary, path)
+
+
+def dumps(state):
+    """Return a game as save-file bytes."""
+    if FLOOR_CLASSES.get(state.floor_class.__name__) is not state.floor_class:
+        raise ValueError(f"cannot save floors of type {state.floor_class.__name__}")
+    if not isinstance(state.seed, int):
+        raise ValueError("only games with an integer seed can be saved")
+    store = state.floors
+    saved = store.saved if isinstance(store.saved, SavedFloors) else None
+    # Start from the loaded file's names so its unvisited floors can be copied as they are
+    names = {name: index for index, name in enumerate(saved.names)} if saved else {}
+
+    sections = {}
+    for depth, floor in store.live.items():
+        sections[depth] = encode_floor(floor, names)
+    for depth, blob in store.packed.items():
+        sections[depth] = encode_floor(pickle.loads(zlib.decompress(blob)), names)
+    if saved:
+        for depth in saved:
+            sections[depth] = saved.section(depth)
+
+    player = state.player
+    inventory = [ITEM.pack(names.setdefault(item.name, len(names)), item.x, item.y) for item in player.inventory]
+    rng_version, mt_state, gauss_next = state.rng.getstate()
+    head = [
+        HEADER.pack(MAGIC, SAVE_VERSION, 0),
+        GAME.pack(state.seed, state.turn, state.depth, state.over, state.width, state.height),
+        pack_string(state.floor_class.__name__),
+        COUNT.pack(len(names)),
+    ]
+    head.extend(pack_string(name) for name in names)
+    head.append(RNG.pack(rng_version, *mt_state, gauss_next is not None, gauss_next or 0.0))
+    head.append(PLAYER.pack(player.x, player.y, player.health, player.max_health, player.attack_damage,
+                            player.defense, player.level, player.exp, len(inventory)))
+    head.extend(inventory)
+    head.append(COUNT.pack(len(sections)))
+
+    offset = sum(len(part) for part in head) + TABLE_ENTRY.size * len(sections)
+    table = []
+    for depth in sorted(sections):
+        table.append(TABLE_ENTRY.pack(depth, offset, len(sections[depth])))
+        offset += len(sections[depth])
+    return b''.join(head + table + [sections[depth] for depth in sorted(sections)])
+
+
+def encode_floor(floor, names):
+    """Return one floor section; names maps names to indexes and grows as needed."""
+    up_x, up_y = floor.stairs_up or (-1, -1)
+    down_x, down_y = floor.stairs_down or (-1, -1)
+    parts = [FLOOR_HEADER.pack(floor.depth, floor.width, floor.height, up_x, up_y, down_x, down_y,
+                               len(floor.rooms), len(floor.monsters), len(floor.items), floor.revision)]
+    parts.extend(ROOM.pack(room.x, room.y, room.width, room.height) for room in floor.rooms)
+    parts.append(''.join(floor.span(y, 0, floor.width) for y in range(floor.height)).encode('ascii'))
+    parts.append(bytes(floor.explored))
+    parts.extend(MONSTER.pack(names.setdefault(monster.type, len(names)), monster.x, monster.y,
+                              monster.health, monster.attack, monster.defense) for monster in floor.monsters)
+    parts.extend(ITEM.pack(names.setdefault(item.name, len(names)), item.x, item.y) for item in floor.items)
+    return b''.join(parts)
+
+
+def decode_floor(data, floor_class, names):
+    """Rebuild a floor from its section, raising SaveFormatError if it is cut short."""
+    if len(data) < FLOOR_HEADER.size:
+        raise SaveFormatError(f"floor section of {len(data)} bytes has no room for its header")
+    (depth, width, height, up_x, up_y, down_x, down_y,
+     room_count, monster_count, item_count, revision) = FLOOR_HEADER.unpack_from(data, 0)
+    needed = (FLOOR_HEADER.size + room_count * ROOM.size + width * height + (width * height + 7) // 8
+              + monster_count * MONSTER.size + item_count * ITEM.size)
+    if len(data) < needed:
+        raise SaveFormatError(f"floor {depth} is cut short: {len(data)} of {needed} bytes")
+    at = FLOOR_HEADER.size
+    rooms = [Room(*fields) for fields in ROOM.iter_unpack(data[at:at + room_count * ROOM.size])]
+    at += room_count * ROOM.size
+    tiles = data[at:at + width * height].decode('ascii')
+    at += width * height
+    floor = floor_class.restore(depth, width, height, [tiles[y * width:(y + 1) * width] for y in range(height)])
+    floor.rooms = rooms
+    floor.stairs_up = (up_x, up_y) if up_x >= 0 else None
+    floor.stairs_down = (down_x, down_y) if down_x >= 0 else None
+    floor.revision = revision
+    floor.explored[:] = data[at:at + len(floor.explored)]
+    at += len(floor.explored)
+    for kind, x, y, health, attack, defense in MONSTER.iter_unpack(data[at:at + monster_count * MONSTER.size]):
+        monster = Monster(names[kind], x, y)
+        monster.health = health
+        monster.attack = attack
+        monster.defense = defense
+        floor.add_monster(monster)
+    at += monster_count * MONSTER.size
+    for name, x, y in ITEM.iter_unpack(data[at:at + item_count * ITEM.size]):
+        floor.add_item(Item(names[name], x, y))
+    return floor
+
+
+class SavedFloors:
+    """The floor sections of a mapped save file, decoded one at a time on request.
+
+    FloorStore pops a floor from here the first time the player enters it.
+    The file stays mapped until every floor has been taken.
+    """
+
+    def __init__(self, buffer, table, floor_class, names):
+        self.buffer = buffer
+        self.table = table  # depth -> (offset, length)
+        self.floor_class = floor_class
+        self.names = names
+
+    def __contains__(self, depth):
+        return depth in self.table
+
+    def __len__(self):
+        return len(self.table)
+
+    def __iter__(self):
+        return iter(list(self.table))
+
+    def section(self, depth):
+        """Return a floor's section bytes without decoding them."""
+        offset, length = self.table[depth]
+        return self.buffer[offset:offset + length]
+
+    def pop(self, depth):
+        try:
+            floor = decode_floor(self.section(depth), self.floor_class, self.names)
+        except (struct.error, UnicodeDecodeError, IndexError) as error:
+            raise SaveFormatError(f"floor {depth} is damaged: {error}") from None
+        del self.table[depth]
+        if not self.table:
+            self.buffer.close()
+        return floor
+
+
+def load(path):
+    """Open a save and return the GameState, decoding only the current floor."""
+    with open(path, 'rb') as saved_file:
+        if os.fstat(saved_file.fileno()).st_size == 0:  # mmap cannot map an empty file
+            raise SaveFormatError(f"{path} is empty")
+        buffer = mmap.mmap(saved_file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return loads(buffer)
+    except (struct.error, UnicodeDecodeError, IndexError) as error:
+        buffer.close()
+        raise SaveFormatError(f"{path} is damaged: {error}") from None
+    except SaveFormatError as error:
+        buffer.close()
+        raise SaveFormatError(f"{path}: {error}") from None
+
+
+def loads(buffer):
+    """Return the GameState held in a save's bytes (or an mmap of them)."""
+    reader = Reader(buffer)
+    magic, version, _ = reader.read(HEADER)
+    if magic != MAGIC:
+        raise SaveFormatError("not a save file")
+    if version != SAVE_VERSION:
+        raise SaveFormatError(f"save format version {version} is not supported (expected {SAVE_VERSION})")
+    seed, turn, depth, over, width, height = reader.read(GAME)
+    class_name = reader.string()
+    floor_class = FLOOR_CLASSES.get(class_name)
+    if floor_class is None:
+        raise SaveFormatError(f"unknown floor type {class_name!r}")
+    names = [reader.string() for _ in range(reader.read(COUNT)[0])]
+    rng_fields = reader.read(RNG)
+    player_fields = reader.read(PLAYER)
+    inventory = [reader.read(ITEM) for _ in range(player_fields[-1])]
+    table = {}
+    for _ in range(reader.read(COUNT)[0]):
+        floor_depth, offset, length = reader.read(TABLE_ENTRY)
+        if length < FLOOR_HEADER.size or offset + length > len(buffer):
+            raise SaveFormatError(f"floor {floor_depth} runs past the end of the file or is too short")
+        table[floor_depth] = (offset, length)
+
+    saved = SavedFloors(buffer, table, floor_class, names)
+    state = GameState(seed, width, height, floor_class, depth=depth, saved_floors=saved)
+    state.turn = turn
+    state.over = bool(over)
+    state.rng.setstate((rng_fields[0], rng_fields[1:626], rng_fields[627] if rng_fields[626] else None))
+    player = state.player = Player()
+    (player.x, player.y, player.health, player.max_health, player.attack_damage,
+     player.defense, player.level, player.exp, _) = player_fields
+    player.inventory = [Item(names[name], x, y) for name, x, y in inventory]
+    return state
+
+
+class Reader:
+    """Read structs and strings one after another from a buffer."""
+
+    def __init__(self, buffer, offset=0):
+        self.buffer = buffer
+        self.offset = offset
+
+    def read(self, layout):
+        fields = layout.unpack_from(self.buffer, self.offset)
+        self.offset += layout.size
+        return fields
+
+    def string(self):
+        length, = self.read(LENGTH)
+        text = self.buffer[self.offset:self.offset + length].decode('utf-8')
+        self.offset += length
+        return text
+
+
+def pack_string(text):
+    data = text.encode('utf-8')
+    return LENGTH.pack(len(data)) + data
@@ -0,0 +1,73 @@
+"""Frame scheduler: timed callbacks driven from the main loop, never sleeping.
+
+Anything that should happen later or at a steady pace (a combat round,
+an animation frame) is scheduled here instead of calling time.sleep(),
+and the main loop calls run_due() between key presses. timeout() says
+how long the loop may wait for input before the next callback is due.
+"""
+import heapq
+import time
+
+
+class ScheduledTask:
+    """A callback due at a time, repeating every `interval` seconds if set."""
+
+    def __init__(self, due, interval, callback):
+        self.due = due
+        self.interval = interval
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FrameScheduler:
+    """Timed callbacks kept in a heap ordered by when they are due."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.queue = []  # (due, order, task)
+        self.order = 0  # Tie-breaker so tasks due at the same time run in the order added
+
+    def __len__(self):
+        return sum(1 for _, _, task in self.queue if not task.cancelled)
+
+    def after(self, delay, callback):
+        """Call callback() once, delay seconds from now."""
+        return self.push(ScheduledTask(self.clock() + delay, None, callback))
+
+    def every(self, interval, callback):
+        """Call callback() every interval seconds until the task is cancelled."""
+        return self.push(ScheduledTask(self.clock() + interval, interval, callback))
+
+    def push(self, task):
+        heapq.heappush(self.queue, (task.due, self.order, task))
+        self.order += 1
+        return task
+
+    def timeout(self):
+        """Seconds until the next callback is due, 0 if one is late, None if idle."""
+        while self.queue and self.queue[0][2].cancelled:
+            heapq.heappop(self.queue)
+        if not self.queue:
+            return None
+        return max(0.0, self.queue[0][0] - self.clock())
+
+    def run_due(self):
+        """Run every callback that is due and return how many ran."""
+        now = self.clock()
+        ran = 0
+        while self.queue and self.queue[0][0] <= now:
+            _, _, task = heapq.heappop(self.queue)
+            if task.cancelled:
+                continue
+            task.callback()
+            ran += 1
+            if task.interval is not None and not task.cancelled:
+                # Keep to the original beat rather than drifting by how late we ran
+                task.due += task.interval
+                if task.due <= now:
+                    task.due = now + task.interval
+                self.push(task)
+        return ran
@@ -0,0 +1,366 @@
+"""Host many games in one process, played over telnet.
+
+    python -m rogue --serve [port]
+    python -m rogue --serve-unix path
+
+Every connection gets its own game (its own player, dungeon and floors)
+and plays it with a telnet client (telnet localhost 4000, or
+socat -,raw,echo=0 UNIX-CONNECT:path). The server asks the client to stop
+echoing and send each key as it is pressed, then draws the map with ANSI
+escapes after every command: arrows or hjkl move, . waits, i lists the
+inventory, 1-9 and 0 use an item and q leaves.
+
+Connections only read keys and queue commands. The turns themselves are
+played by one FairScheduler task, which takes one command from each
+session with commands waiting in turn, round robin, so a client sending
+keys as fast as it can gets no more turns than one typing slowly. After
+time_slice seconds of turns the scheduler yields to the event loop so
+reads and writes keep moving, then carries on where it stopped.
+
+This is lighter than one rogue.aio.Session per connection: an idle
+session is its game state plus a Client, a camera, a small field-of-view
+cache and the connection's streams and task, with nothing else waiting
+on the loop. Latency is counted for the whole server, from a key
+arriving to its turn played and drawn; report() gives p50/p99.
+"""
+import asyncio
+import time
+import traceback
+from collections import deque
+
+from rogue import engine
+from rogue.chunks import LargeFloor
+from rogue.fov import FieldOfView
+from rogue.profiler import Histogram, format_duration, profiler
+from rogue.viewport import Camera
+
+HOST = '127.0.0.1'
+PORT = 4000
+TIME_SLICE = 0.002  # Seconds of turns the scheduler plays before letting the loop do I/O
+MAX_TYPEAHEAD = 16  # Commands queued per session; the rest of a read beyond that is dropped
+WRITE_BUFFER_LIMIT = 64 * 1024  # Skip frames for a client this far behind; the next one redraws everything
+READ_SIZE = 64  # Far more than anyone types between two reads; a flood gets cut short
+SCREEN_WIDTH = 79
+SCREEN_HEIGHT = 22  # Map rows; the status and message lines go underneath
+FOV_CACHE_SIZE = 8  # Much smaller than the single-player default, as there are thousands of these
+
+# Telnet protocol bytes (RFC 854, 857, 858, 1073)
+IAC = 255
+DONT = 254
+DO = 253
+WONT = 252
+WILL = 251
+SB = 250
+SE = 240
+ECHO = 1
+SUPPRESS_GO_AHEAD = 3
+NAWS = 31  # Negotiate About Window Size
+TELNET_SETUP = bytes([IAC, WILL, ECHO, IAC, WILL, SUPPRESS_GO_AHEAD, IAC, DO, NAWS])
+
+SHOW_INVENTORY = 'inventory'  # Not an engine command; queued with the rest so it shows after the moves before it
+
+CLEAR_SCREEN = '\x1b[2J'
+HOME = '\x1b[H'
+CLEAR_LINE = '\x1b[K'
+CLEAR_BELOW = '\x1b[J'
+
+KEY_COMMANDS = {
+    'h': engine.LEFT,
+    'j': engine.DOWN,
+    'k': engine.UP,
+    'l': engine.RIGHT,
+    '\x1b[D': engine.LEFT,
+    '\x1b[B': engine.DOWN,
+    '\x1b[A': engine.UP,
+    '\x1b[C': engine.RIGHT,
+    '\x1bOD': engine.LEFT,  # Arrows in application cursor mode
+    '\x1bOB': engine.DOWN,
+    '\x1bOA': engine.UP,
+    '\x1bOC': engine.RIGHT,
+    '.': engine.WAIT,
+    'i': SHOW_INVENTORY,
+}
+ITEM_KEYS = '1234567890'  # Use inventory slots 1 to 10, the tenth with 0
+for _slot, _key in enumerate(ITEM_KEYS):
+    KEY_COMMANDS[_key] = (engine.USE, _slot)
+QUIT_KEY = 'q'
+
+
+class KeyDecoder:
+    """Split what a telnet client sends into keys, skipping telnet commands.
+
+    Feed it bytes as they arrive; a telnet command or escape sequence cut
+    in two by the network is kept until the rest comes. Window sizes the
+    client reports (NAWS) are passed to on_resize(width, height).
+    """
+
+    def __init__(self, on_resize=None):
+        self.buffer = b''
+        self.on_resize = on_resize
+
+    def feed(self, data):
+        """Return the complete keys in data and whatever was left over from before."""
+        data = self.buffer + data
+        keys = []
+        index = 0
+        end = len(data)
+        while index < end:
+            byte = data[index]
+            if byte == IAC:
+                if index + 1 >= end:
+                    break
+                command = data[index + 1]
+                if command == SB:
+                    close = data.find(bytes([IAC, SE]), index + 2)
+                    if close < 0:
+                        break
+                    self.subnegotiation(data[index + 2:close])
+                    index = close + 2
+                elif command in (WILL, WONT, DO, DONT):
+                    if index + 2 >= end:
+                        break
+                    index += 3
+                else:
+                    index += 2  # Another command, or an escaped 255 byte: not a key we use
+            elif byte == 0x1b:
+                if index + 1 < end and data[index + 1] not in b'[O':
+                    index += 1  # Escape on its own; nothing uses it
+                    continue
+                if index + 2 >= end:
+                    break
+                keys.append(data[index:index + 3].decode('latin-1'))
+                index += 3
+            else:
+                keys.append(chr(byte))
+                index += 1
+        self.buffer = data[index:]
+        return keys
+
+    def subnegotiation(self, payload):
+        if len(payload) == 5 and payload[0] == NAWS and self.on_resize is not None:
+            self.on_resize(payload[1] << 8 | payload[2], payload[3] << 8 | payload[4])
+
+
+class Client:
+    """One connection and the game it is playing."""
+
+    def __init__(self, state, writer):
+        self.state = state
+        self.writer = writer
+        self.camera = Camera(min(state.width, SCREEN_WIDTH), min(state.height, SCREEN_HEIGHT))
+        self.fov = FieldOfView(capacity=FOV_CACHE_SIZE)
+        self.commands = deque()  # (command, nanoseconds when its key arrived)
+        self.queued = False  # Whether the scheduler has this client in its ready queue
+        self.room = None  # Future the connection waits on while commands is full
+        self.closed = False
+        self.message = ''
+        self.skipped = 0  # Frames not sent because the client was not reading them
+
+    def resize(self, width, height):
+        self.camera.resize(min(self.state.width, width - 1), min(self.state.height, height - 3))
+
+    def play(self, command):
+        if command == SHOW_INVENTORY:
+            self.show_inventory()
+            return
+        events = engine.step(self.state, command)
+        self.message = ' '.join(filter(None, map(engine.describe, events)))
+
+    def show_inventory(self):
+        inventory = self.state.player.inventory
+        if inventory:
+            self.message = ' '.join(f"{key}.{item.name}" for key, item in zip(ITEM_KEYS, inventory))
+        else:
+            self.message = "Your inventory is empty."
+
+    def draw(self, clear=False):
+        """Send the screen in one write, unless the client is too far behind to want it."""
+        if self.closed:
+            return
+        if self.writer.transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+            self.skipped += 1
+            return
+        if profiler.enabled:
+            with profiler.span('render'):
+                self.writer.write(self.screen(clear))
+        else:
+            self.writer.write(self.screen(clear))
+
+    def screen(self, clear=False):
+        rows = engine.frame(self.state, self.camera, self.fov)
+        rows.append(self.message)
+        if self.state.over:
+            rows.append("Game over. Press any key to leave.")
+        lines = (CLEAR_SCREEN if clear else '') + HOME + (CLEAR_LINE + '\r\n').join(rows) + CLEAR_BELOW
+        return lines.encode('ascii', 'replace')
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.commands.clear()
+            if self.room is not None:
+                self.room.set_result(None)
+                self.room = None
+            self.writer.close()
+
+
+class FairScheduler:
+    """Play the sessions' turns round robin, a time slice at a time."""
+
+    def __init__(self, time_slice=TIME_SLICE):
+        self.time_slice = time_slice
+        self.ready = deque()  # Clients with commands waiting, each in here at most once
+        self.wakeup = asyncio.Event()
+        self.latency = Histogram()  # Nanoseconds from a key arriving to its turn played, and drawn if last of a burst
+        self.played = 0  # Commands played, turns and inventory listings alike
+        self.slices = 0
+        self.dropped = 0  # Commands refused because their session already had MAX_TYPEAHEAD waiting
+        self.failed = 0  # Sessions closed because playing one of their commands raised
+
+    def push(self, client, command):
+        """Queue a command for a client; return False if it had too many waiting."""
+        if len(client.commands) >= MAX_TYPEAHEAD:
+            self.dropped += 1
+            return False
+        client.commands.append((command, time.perf_counter_ns()))
+        if not client.queued:
+            client.queued = True
+            self.ready.append(client)
+            self.wakeup.set()
+        return True
+
+    async def run(self):
+        ready = self.ready
+        clock = time.perf_counter
+        while True:
+            while not ready:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+            deadline = clock() + self.time_slice
+            self.slices += 1
+            while ready and clock() < deadline:
+                client = ready.popleft()
+                if client.closed:
+                    client.queued = False
+                    continue
+                command, received = client.commands.popleft()
+                if client.room is not None:
+                    client.room.set_result(None)
+                    client.room = None
+                try:
+                    client.play(command)
+                except Exception:
+                    # A failing game ends its own session; the scheduler carries on with the others
+                    self.failed += 1
+                    traceback.print_exc()
+                    client.queued = False
+                    client.close()
+                    continue
+                self.played += 1
+                if client.commands and not client.state.over:
+                    ready.append(client)  # Back of the line until everyone else has had a turn
+                else:
+                    client.commands.clear()
+                    client.queued = False
+                    client.draw()  # Only once a burst of keys has been played
+                self.latency.record(time.perf_counter_ns() - received)
+            await asyncio.sleep(0)
+
+
+class GameServer:
+    """Accept telnet connections and give each one a new game.
+
+    Games are seeded seed, seed + 1, ... in the order players connect, or
+    at random with seed None. Maps bigger than the default switch to
+    large-map mode as in the curses game.
+    """
+
+    def __init__(self, seed=None, width=engine.DUNGEON_WIDTH, height=engine.DUNGEON_HEIGHT,
+                 time_slice=TIME_SLICE):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        large = width > engine.DUNGEON_WIDTH or height > engine.DUNGEON_HEIGHT
+        self.floor_class = LargeFloor if large else engine.Floor
+        self.scheduler = FairScheduler(time_slice)
+        self.clients = {}  # Client -> the task handling its connection
+        self.games = 0
+
+    def new_game(self):
+        seed = None if self.seed is None else self.seed + self.games
+        self.games += 1
+        return engine.new_game(seed, self.width, self.height, self.floor_class)
+
+    async def handle(self, reader, writer):
+        """Play one connection's game until it quits, dies or goes away."""
+        client = Client(self.new_game(), writer)
+        decoder = KeyDecoder(client.resize)
+        self.clients[client] = asyncio.current_task()
+        try:
+            writer.write(TELNET_SETUP)
+            client.draw(clear=True)
+            while not client.closed:
+                if len(client.commands) >= MAX_TYPEAHEAD:
+                    # Stop reading until some are played, so a client typing
+                    # faster than its turns come round is held back by the socket
+                    client.room = asyncio.get_running_loop().create_future()
+                    await client.room
+                    continue
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                for key in decoder.feed(data):
+                    if client.state.over or key == QUIT_KEY:
+                        client.close()
+                        break
+                    command = KEY_COMMANDS.get(key)
+                    if command is not None:
+                        self.scheduler.push(client, command)
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.pop(client, None)
+            client.close()
+
+    async def serve(self, port=PORT, path=None, host=HOST, started=None):
+        """Listen on a TCP port, or on a Unix socket if path is given, until cancelled.
+
+        started, if given, is a Future that gets the listening server.
+        """
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle, path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        scheduler = asyncio.ensure_future(self.scheduler.run())
+        if started is not None:
+            started.set_result(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            scheduler.cancel()
+            handlers = list(self.clients.values())
+            for client in list(self.clients):
+                client.close()  # Each handler then reads the end of its connection and returns
+            await asyncio.gather(*handlers, return_exceptions=True)
+
+    def report(self):
+        """One line on sessions, turns and turn latency so far."""
+        scheduler = self.scheduler
+        p50, p99 = scheduler.latency.percentiles(0.5, 0.99)
+        return (f"{len(self.clients)} sessions connected, {self.games} games started. "
+                f"{scheduler.played:,} commands in {scheduler.slices:,} slices, latency p50 {format_duration(p50)} "
+                f"p99 {format_duration(p99)} max {format_duration(scheduler.latency.max)}, "
+                f"{scheduler.dropped} commands dropped, {scheduler.failed} sessions ended by errors.")
+
+
+def run(port=PORT, path=None, seed=None, width=engine.DUNGEON_WIDTH, height=engine.DUNGEON_HEIGHT):
+    """Serve games until interrupted, then print the report."""
+    server = GameServer(seed, width, height)
+    where = path if path is not None else f"{HOST}:{port}"
+    print(f"Serving rogue on {where}; Ctrl-C to stop.")
+    try:
+        asyncio.run(server.serve(port, path))
+    except KeyboardInterrupt:
+        pass
+    print(server.report())
@@ -0,0 +1,58 @@
+"""Spatial index mapping grid cells to the entities standing on them."""
+
+# Returned for empty cells so callers can iterate without a None check
+_EMPTY = {}
+
+
+class SpatialIndex:
+    """Keep track of which entities occupy each (x, y) cell of a floor.
+
+    Every cell maps to a small dict of entity -> tag. The tag is whatever
+    the floor wants to remember about the entity (the deliverables use the
+    glyph it is drawn with), so a lookup tells you both what is on a cell
+    and how to treat it.
+    """
+
+    def __init__(self):
+        self.cells = {}
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.cells.values())
+
+    def add(self, entity, tag=None):
+        """Register an entity at its current position."""
+        key = (entity.x, entity.y)
+        bucket = self.cells.get(key)
+        if bucket is None:
+            bucket = self.cells[key] = {}
+        bucket[entity] = tag
+
+    def remove(self, entity):
+        """Forget an entity standing at its current position."""
+        self._take(entity, entity.x, entity.y)
+
+    def moved(self, entity, old_x, old_y):
+        """Re-file an entity whose x/y changed from (old_x, old_y)."""
+        if (old_x, old_y) == (entity.x, entity.y):
+            return
+        tag = self._take(entity, old_x, old_y)
+        self.add(entity, tag)
+
+    def at(self, x, y):
+        """Return the entity -> tag dict for a cell (empty if nothing is there)."""
+        return self.cells.get((x, y), _EMPTY)
+
+    def first(self, x, y, tag):
+        """Return the first entity on a cell with the given tag, or None."""
+        for entity, entity_tag in self.cells.get((x, y), _EMPTY).items():
+            if entity_tag == tag:
+                return entity
+        return None
+
+    def _take(self, entity, x, y):
+        key = (x, y)
+        bucket = self.cells[key]
+        tag = bucket.pop(entity)
+        if not bucket:
+            del self.cells[key]
+        return tag
@@ -0,0 +1,110 @@
+"""Optional NumPy tile engine: floors stored as a uint8 array.
+
+ArrayFloor is a drop-in replacement for engine.Floor that keeps its tiles
+in a 2-D uint8 array instead of a list of lists of one-character strings.
+Carving, wall outlining, room validity checks and free-cell queries are
+slice and mask operations, and each row is turned into text with a single
+bytes.translate() through the glyph table. A 40x20 floor is 800 bytes
+instead of 20 lists of 40 pointers, which is what makes maps thousands of
+cells across practical.
+
+Use it with engine.new_game(floor_class=ArrayFloor). Generation consumes
+the random generator exactly like engine.Floor, so a seed produces the same
+dungeon with either engine.
+"""
+try:
+    import numpy as np
+except ImportError:  # The tile engine is optional; engine.Floor needs nothing
+    np = None
+
+from rogue.engine import (Floor, ROCK, FLOOR, HALL, WALL, DOOR, STAIRS_UP, STAIRS_DOWN, WALKABLE,
+                          MONSTER, ITEM, PLAYER)
+
+# Tile id -> glyph. The index of each glyph is the byte stored in the array.
+TILE_GLYPHS = (ROCK, FLOOR, HALL, WALL, DOOR, STAIRS_UP, STAIRS_DOWN)
+TILE_IDS = {glyph: tile_id for tile_id, glyph in enumerate(TILE_GLYPHS)}
+GLYPH_TABLE = bytes.maketrans(bytes(range(len(TILE_GLYPHS))), ''.join(TILE_GLYPHS).encode('ascii'))
+ID_TABLE = bytes.maketrans(''.join(TILE_GLYPHS).encode('ascii'), bytes(range(len(TILE_GLYPHS))))
+
+ROCK_ID = TILE_IDS[ROCK]
+FLOOR_ID = TILE_IDS[FLOOR]
+HALL_ID = TILE_IDS[HALL]
+WALL_ID = TILE_IDS[WALL]
+DOOR_ID = TILE_IDS[DOOR]
+
+
+class ArrayFloor(Floor):
+    """A Floor whose grid is a (height, width) uint8 NumPy array of tile ids."""
+
+    walkable_tiles = frozenset(TILE_IDS[glyph] for glyph in WALKABLE)
+
+    def new_grid(self):
+        if np is None:
+            raise ImportError("the NumPy tile engine needs numpy installed")
+        return np.full((self.height, self.width), ROCK_ID, dtype=np.uint8)
+
+    def is_valid_room(self, room):
+        """A room (walls included) may only be carved out of solid rock."""
+        area = self.grid[room.y:room.y + room.height, room.x:room.x + room.width]
+        return (area == ROCK_ID).all()
+
+    def create_room(self, room):
+        """Carve a room: walls around the edge, floor inside."""
+        area = self.grid[room.y:room.y + room.height, room.x:room.x + room.width]
+        area[:] = WALL_ID
+        area[1:-1, 1:-1] = FLOOR_ID
+
+    def create_horiz_hallway(self, x1, x2, y):
+        self.dig_span(self.grid[y, min(x1, x2):max(x1, x2) + 1])
+
+    def create_vert_hallway(self, y1, y2, x):
+        self.dig_span(self.grid[min(y1, y2):max(y1, y2) + 1, x])
+
+    def dig_span(self, span):
+        """Carve a run of hallway, turning any walls it crosses into doors."""
+        span[span == WALL_ID] = DOOR_ID
+        span[span == ROCK_ID] = HALL_ID
+
+    def dig(self, x, y):
+        self.dig_span(self.grid[y:y + 1, x])
+
+    def tile(self, x, y):
+        return TILE_GLYPHS[self.grid[y, x]]
+
+    def write_tile(self, x, y, tile):
+        self.grid[y, x] = TILE_IDS[tile]
+
+    def is_walkable(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and self.grid[y, x] in self.walkable_tiles
+
+    def cells_of(self, tile):
+        """Return every cell made of the given tile."""
+        ys, xs = np.nonzero(self.grid == TILE_IDS[tile])
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def row(self, y):
+        """Return one row of tiles as text."""
+        return self.grid[y].tobytes().translate(GLYPH_TABLE).decode('ascii')
+
+    def load_row(self, y, text):
+        self.grid[y] = np.frombuffer(text.encode('ascii').translate(ID_TABLE), dtype=np.uint8)
+
+    def span(self, y, left, right):
+        return self.grid[y, left:right].tobytes().translate(GLYPH_TABLE).decode('ascii')
+
+    def rows(self, player=None):
+        """Return the floor as strings, with entities and the player drawn in."""
+        lines = [self.row(y) for y in range(self.height)]
+        marks = {}
+        for (x, y), bucket in self.occupancy.cells.items():
+            marks[x, y] = MONSTER if MONSTER in bucket.values() else ITEM
+        if player is not None:
+            marks[player.x, player.y] = PLAYER
+        patched = {}
+        for (x, y), glyph in marks.items():
+            if y not in patched:
+                patched[y] = list(lines[y])
+            patched[y][x] = glyph
+        for y, line in patched.items():
+            lines[y] = ''.join(line)
+        return lines
@@ -0,0 +1,39 @@
+"""A camera that shows the screen-sized part of a floor around the player.
+
+The camera does not move on every step. It scrolls only when the player
+gets within `margin` cells of an edge of the window, and then recentres
+on them, so walking around mostly leaves the picture still and the dirty
+renderer has little to send.
+"""
+CAMERA_MARGIN = 4  # Cells kept between the player and the edge of the window
+
+
+class Camera:
+    """The window of the map that is on screen: left, top, width, height."""
+
+    def __init__(self, width, height, margin=CAMERA_MARGIN):
+        self.width = width
+        self.height = height
+        self.margin = margin
+        self.left = 0
+        self.top = 0
+
+    def resize(self, width, height):
+        self.width = max(1, width)
+        self.height = max(1, height)
+
+    def follow(self, x, y, map_width, map_height):
+        """Scroll to keep (x, y) clear of the edges and return (left, top)."""
+        self.left = _scroll(self.left, x, self.width, map_width, self.margin)
+        self.top = _scroll(self.top, y, self.height, map_height, self.margin)
+        return self.left, self.top
+
+
+def _scroll(start, position, size, limit, margin):
+    """Return the new start of a window along one axis."""
+    if limit <= size:
+        return 0
+    margin = min(margin, (size - 1) // 2)
+    if position < start + margin or position >= start + size - margin:
+        start = position - size // 2
+    return max(0, min(start, limit - size))